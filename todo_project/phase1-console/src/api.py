@@ -4,12 +4,18 @@ FastAPI Todo Application - Main Entry Point
 This is the FastAPI web API for Phase 2.
 Phase 1 console functionality remains in main.py
 """
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from src.config import settings
-from src.database import create_db_and_tables
-from src.routes import auth, tasks
+from src.compression import CompressionMiddleware
+from src.database import create_db_and_tables, run_sqlite_maintenance, uses_sqlite
+from src.profiling import ProfilingMiddleware
+from src.ratelimit import AdmissionControlMiddleware
+from src.statements import statement_cache_stats
+from src.routes import auth, events, tasks
+from src.tracing import TracingMiddleware
 
 
 @asynccontextmanager
@@ -20,13 +26,31 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting FastAPI application...")
     print(f"Database URL: {settings.database_url}")
-    create_db_and_tables()
-    print("Database tables created successfully")
+    if settings.create_tables_on_startup:
+        create_db_and_tables()
+        print("Database tables created successfully")
+    else:
+        print("Skipping table creation (run `python -m src.manage create-tables`)")
+
+    maintenance = None
+    if settings.sqlite_maintenance_interval_seconds > 0 and uses_sqlite():
+        maintenance = asyncio.create_task(run_sqlite_maintenance(settings.sqlite_maintenance_interval_seconds))
+
+    scheduler = None
+    if settings.scheduler_enabled:
+        from src.scheduler import create_scheduler
+
+        scheduler = create_scheduler()
+        scheduler.start()
 
     yield
 
     # Shutdown
     print("Shutting down FastAPI application...")
+    if scheduler is not None:
+        await scheduler.stop()
+    if maintenance is not None:
+        maintenance.cancel()
 
 
 # Create FastAPI app
@@ -37,6 +61,24 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Profile requests on demand and tag slow queries with their route
+app.add_middleware(ProfilingMiddleware)
+
+# Compress large responses (innermost, so only real payloads are compressed)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
+
+# Shed excess load before it reaches the database (added before CORS so
+# rejections still carry CORS headers)
+app.add_middleware(AdmissionControlMiddleware)
+
+# Trace each request (outside admission control so rejections are traced too)
+app.add_middleware(TracingMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +90,7 @@ app.add_middleware(
 
 # Register routes
 app.include_router(auth.router)
+app.include_router(events.router)  # before tasks so /tasks/events is not read as a task id
 app.include_router(tasks.router)
 
 
@@ -64,10 +107,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint, with this worker's compiled statement cache use"""
     return {
         "status": "healthy",
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "statement_cache": statement_cache_stats(),
     }
 
 
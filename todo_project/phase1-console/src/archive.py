@@ -0,0 +1,80 @@
+"""
+Hot/Cold Task Archival
+
+Completed tasks that have not changed for ARCHIVE_AFTER_DAYS are moved from
+the tasks table into task_archive, partitioned by the month they were last
+updated. The hot table, its indexes and the search index then only hold
+live work, however much history accumulates.
+
+Archived tasks keep their ids (SQLite never reissues them, see
+Task.__table_args__) and are read-only. They are left out of queries unless
+a caller opts in with include_archived, which reads both tables through
+all_tasks(). Delta sync reports an archived task as deleted, since it has
+left the live list sync clients mirror.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import exists, union_all
+from sqlmodel import Session, delete, select
+from src.models import ArchivedTask, Task, TaskDeletion
+
+# Columns the two tables share, in TaskResponse order
+TASK_COLUMNS = [column.name for column in Task.__table__.columns]
+
+
+def archive_month(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+def archive_completed_tasks(session: Session, older_than_days: int, batch_size: int = 500,
+                            now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Move completed tasks last updated more than older_than_days ago to the archive
+
+    Works through the backlog batch_size tasks per transaction, so a large
+    first run never holds long locks. Each archived task leaves a tombstone
+    for delta sync. Returns the number of tasks archived per month.
+    """
+    archived_at = datetime.utcnow()
+    cutoff = (now or archived_at) - timedelta(days=older_than_days)
+    archived: Dict[str, int] = {}
+    while True:
+        # Uses ix_tasks_status_due_date for the status prefix
+        tasks = session.exec(
+            select(Task)
+            .where(Task.status == "completed", Task.updated_at < cutoff)
+            .order_by(Task.id)
+            .limit(batch_size)
+        ).all()
+        if not tasks:
+            return archived
+        for task in tasks:
+            month = archive_month(task.updated_at)
+            session.add(ArchivedTask(
+                **{name: getattr(task, name) for name in TASK_COLUMNS},
+                archive_month=month,
+                archived_at=archived_at,
+            ))
+            session.add(TaskDeletion(task_id=task.id, user_id=task.user_id, deleted_at=archived_at))
+            archived[month] = archived.get(month, 0) + 1
+        session.flush()
+        session.exec(delete(Task).where(Task.id.in_([task.id for task in tasks])))
+        session.commit()
+        session.expunge_all()
+
+
+def all_tasks(user_id: int):
+    """
+    One user's hot and archived tasks as a single subquery
+
+    Its columns are named like Task's, so `all_tasks(user_id).c.status` can
+    stand in for `Task.status`. Should an id still be in both tables (a
+    database archived to before add_sqlite_autoincrement ran), the live task
+    hides the archived one.
+    """
+    hot = select(*[Task.__table__.c[name] for name in TASK_COLUMNS]).where(Task.user_id == user_id)
+    cold = (
+        select(*[ArchivedTask.__table__.c[name] for name in TASK_COLUMNS])
+        .where(ArchivedTask.user_id == user_id, ~exists().where(Task.id == ArchivedTask.id))
+    )
+    return union_all(hot, cold).subquery("all_tasks")
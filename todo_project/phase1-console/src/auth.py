@@ -2,32 +2,105 @@
 Authentication and JWT Token Management
 """
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlmodel import Session, select
 from src.config import settings
 from src.models import User
-from src.database import get_session
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.database import engine, get_session, open_session, task_engine
+from src.statements import USER_BY_ID
+from src.tracing import span
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
+# python-jose and passlib/bcrypt are comparatively slow to import, so they are
+# loaded on first use rather than when a worker boots.
+
+# Schemes stored hashes may use; new hashes use PASSWORD_HASH_SCHEME
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_pwd_context(scheme: str, bcrypt_rounds: int = 12, argon2_time_cost: int = 2,
+                      argon2_memory_cost_kb: int = 19456, argon2_parallelism: int = 1):
+    """
+    Password hashing context that hashes with scheme at the given cost
+
+    Hashes made with the other scheme, or with a different cost, still
+    verify, but needs_update() reports them so they can be replaced.
+    """
+    from passlib.context import CryptContext
+
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown password hash scheme '{scheme}'. Use one of: {', '.join(PASSWORD_SCHEMES)}")
+    if scheme == "argon2":
+        from passlib.hash import argon2
+
+        if not argon2.has_backend():
+            raise RuntimeError("argon2 password hashing needs the argon2-cffi package")
+
+    return CryptContext(
+        schemes=list(PASSWORD_SCHEMES),
+        default=scheme,
+        deprecated="auto",  # every scheme but the default
+        # Pin the cost both ways, so lowering it takes effect too
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost_kb,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Password hashing context for the configured scheme and cost, created on first use"""
+    return build_pwd_context(
+        settings.password_hash_scheme,
+        bcrypt_rounds=settings.bcrypt_rounds,
+        argon2_time_cost=settings.argon2_time_cost,
+        argon2_memory_cost_kb=settings.argon2_memory_cost_kb,
+        argon2_parallelism=settings.argon2_parallelism,
+    )
+
+
+def __getattr__(name: str):
+    # Keep `from src.auth import pwd_context` working without an eager import
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    """Hash a password with the configured scheme and cost"""
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_rehash_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and upgrade its hash if needed
+
+    Returns whether the password matches and, when it does and the stored
+    hash uses an outdated scheme or cost (needs_update), a new hash to
+    store in its place.
+    """
+    context = get_pwd_context()
+    if not context.verify(plain_password, hashed_password):
+        return False, None
+    if context.needs_update(hashed_password):
+        return True, context.hash(plain_password)
+    return True, None
 
 
 def create_access_token(user_id: int, email: str) -> str:
@@ -39,6 +112,8 @@ def create_access_token(user_id: int, email: str) -> str:
     - email: user email
     - exp: expiration timestamp
     """
+    from jose import jwt
+
     expires_delta = timedelta(minutes=settings.jwt_expiration_minutes)
     expire = datetime.utcnow() + expires_delta
 
@@ -67,12 +142,15 @@ def decode_token(token: str) -> dict:
     Raises:
         HTTPException if token is invalid or expired
     """
+    from jose import JWTError, jwt
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.better_auth_secret,
-            algorithms=[settings.jwt_algorithm]
-        )
+        with span("decode_token"):
+            payload = jwt.decode(
+                token,
+                settings.better_auth_secret,
+                algorithms=[settings.jwt_algorithm]
+            )
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
 
@@ -94,6 +172,7 @@ def decode_token(token: str) -> dict:
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: Session = Depends(get_session)
 ) -> User:
@@ -108,11 +187,12 @@ async def get_current_user(
     async def protected_route(user: User = Depends(get_current_user)):
         ...
     """
-    token = credentials.credentials
-    token_data = decode_token(token)
+    # Already decoded by AdmissionControlMiddleware when rate limiting is on
+    token_data = getattr(request.state, "token_data", None) or decode_token(credentials.credentials)
 
     # Get user from database
-    user = session.get(User, token_data["user_id"])
+    with span("user_fetch"):
+        user = session.exec(USER_BY_ID, params={"user_id": token_data["user_id"]}).first()
 
     if user is None:
         raise HTTPException(
@@ -140,3 +220,25 @@ def verify_user_access(user: User, resource_user_id: int):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied: You can only access your own resources"
         )
+
+
+def get_task_session(
+    user_id: int,
+    response: Response,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Dependency for a session on the database holding user_id's tasks
+
+    Access is verified first, so a session on another user's shard is never
+    opened. When the tasks live on the primary (always, unsharded) this is
+    the request's get_session session; otherwise a session on the user's shard.
+    """
+    verify_user_access(user, user_id)
+    bind = task_engine(user_id)
+    if bind is engine:
+        yield session
+        return
+    with open_session(bind, response) as task_session:
+        yield task_session
@@ -0,0 +1,339 @@
+# Phase 1: Console Application - Scriptable Command Line
+
+# Non-interactive commands for automation. Each command prints one JSON
+# object per line to stdout; the manager's own messages go to stderr.
+#
+#   python -m src.main add "Write report" --priority high --tags work,urgent
+#   python -m src.main list --status pending --sort due_date
+#   python -m src.main batch --file ops.txt
+#
+# `batch` reads one command per line from a file or stdin, either in the
+# same form as the command line (`complete 12`) or as a JSON object
+# ({"op": "complete", "task_id": 12}). All commands in one run share a
+# single TaskManager batch, so the task file is written once at the end.
+
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import shlex
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+from src import tasks
+
+
+def _split_tags(value):
+    if isinstance(value, str):
+        return [tag.strip() for tag in value.split(',') if tag.strip()]
+    return list(value or [])
+
+
+def op_add(task_manager, description, priority='medium', tags=None, due_date=None, recurrence=None):
+    return task_manager.add_task(description, priority, _split_tags(tags), due_date, recurrence)
+
+
+def op_get(task_manager, task_id):
+    task = task_manager.find_task_by_id(task_id)
+    if task is None:
+        print(f"Error: Task ID {task_id} not found.")
+    return task.copy() if task else None
+
+
+def op_update(task_manager, task_id, description):
+    return task_manager.update_task(task_id, description)
+
+
+def op_delete(task_manager, task_id):
+    return task_manager.delete_task(task_id)
+
+
+def op_complete(task_manager, task_id):
+    return task_manager.mark_task_complete(task_id)
+
+
+def op_priority(task_manager, task_id, priority):
+    return task_manager.update_task_priority(task_id, priority)
+
+
+def op_tag(task_manager, task_id, tags):
+    return task_manager.add_tags_to_task(task_id, _split_tags(tags))
+
+
+def op_untag(task_manager, task_id, tags):
+    return task_manager.remove_tags_from_task(task_id, _split_tags(tags))
+
+
+def op_due(task_manager, task_id, due_date):
+    return task_manager.set_task_due_date(task_id, due_date)
+
+
+def op_repeat(task_manager, task_id, recurrence):
+    return task_manager.set_task_recurrence(task_id, None if recurrence == 'none' else recurrence)
+
+
+def op_list(task_manager, status=None, priority=None, tag=None, search=None,
+            sort=None, reverse=False, limit=None, include_archived=False):
+    results = task_manager.sort_tasks(sort or 'id', reverse)
+    if include_archived:
+        results += (task for task in task_manager.archived_tasks()
+                    if task_manager.find_task_by_id(task['id']) is None)
+        results.sort(key=tasks.SORT_KEYS[sort or 'id'], reverse=reverse)
+    if status or priority or tag:
+        matches = {task['id'] for task in task_manager.filter_tasks(status, priority, tag, include_archived)}
+        results = [task for task in results if task['id'] in matches]
+    if search:
+        matches = {task['id'] for task in task_manager.search_tasks(search, include_archived)}
+        results = [task for task in results if task['id'] in matches]
+    return results[:limit] if limit is not None else results
+
+
+def op_archive(task_manager, days=30):
+    return {'archived': task_manager.archive_completed(older_than_days=float(days))}
+
+
+def op_archived(task_manager, since=None, until=None):
+    return list(task_manager.archived_tasks(since, until))
+
+
+def op_occurrences(task_manager, start, end):
+    end_moment = datetime.fromisoformat(end)
+    if len(end) == 10:  # a date-only end includes that whole day
+        end_moment += timedelta(days=1)
+    return task_manager.get_occurrences(datetime.fromisoformat(start), end_moment)
+
+
+def op_overdue(task_manager):
+    return task_manager.get_overdue_tasks()
+
+
+def op_upcoming(task_manager, hours=24):
+    return task_manager.get_upcoming_tasks(hours=float(hours))
+
+
+# Command name -> handler. Handlers return the result, or None/False on failure
+OPERATIONS = {
+    'add': op_add,
+    'get': op_get,
+    'update': op_update,
+    'delete': op_delete,
+    'complete': op_complete,
+    'priority': op_priority,
+    'tag': op_tag,
+    'untag': op_untag,
+    'due': op_due,
+    'repeat': op_repeat,
+    'list': op_list,
+    'archive': op_archive,
+    'archived': op_archived,
+    'occurrences': op_occurrences,
+    'overdue': op_overdue,
+    'upcoming': op_upcoming,
+}
+
+
+class _LineParser(argparse.ArgumentParser):
+    """Parser for batch lines: reports errors instead of exiting."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def add_operation_parsers(commands):
+    """Register one subcommand per operation on an argparse subparsers object."""
+    add = commands.add_parser('add', help="Add a task")
+    add.add_argument('description')
+    add.add_argument('--priority', default='medium', choices=['high', 'medium', 'low'])
+    add.add_argument('--tags', default=None, help="Comma-separated tags")
+    add.add_argument('--due', dest='due_date', default=None, help="Due date (YYYY-MM-DD or ISO datetime)")
+    add.add_argument('--repeat', dest='recurrence', default=None,
+                     help="Recurrence rule, e.g. daily, weekdays, 'every 2 weeks on mon' (needs --due)")
+
+    commands.add_parser('get', help="Show one task").add_argument('task_id', type=int)
+
+    update = commands.add_parser('update', help="Change a task's description")
+    update.add_argument('task_id', type=int)
+    update.add_argument('description')
+
+    commands.add_parser('delete', help="Delete a task").add_argument('task_id', type=int)
+    commands.add_parser('complete', help="Mark a task complete").add_argument('task_id', type=int)
+
+    priority = commands.add_parser('priority', help="Set a task's priority")
+    priority.add_argument('task_id', type=int)
+    priority.add_argument('priority', choices=['high', 'medium', 'low'])
+
+    for name, help_text in (('tag', "Add tags to a task"), ('untag', "Remove tags from a task")):
+        tag = commands.add_parser(name, help=help_text)
+        tag.add_argument('task_id', type=int)
+        tag.add_argument('tags', help="Comma-separated tags")
+
+    due = commands.add_parser('due', help="Set a task's due date")
+    due.add_argument('task_id', type=int)
+    due.add_argument('due_date')
+
+    repeat = commands.add_parser('repeat', help="Make a task repeat")
+    repeat.add_argument('task_id', type=int)
+    repeat.add_argument('recurrence', help="Recurrence rule, or 'none' to stop repeating")
+
+    list_parser = commands.add_parser('list', help="List tasks as JSON")
+    list_parser.add_argument('--status', choices=['pending', 'completed'])
+    list_parser.add_argument('--priority', choices=['high', 'medium', 'low'])
+    list_parser.add_argument('--tag')
+    list_parser.add_argument('--search', help="Keyword in description or tags")
+    list_parser.add_argument('--sort', choices=sorted(tasks.SORT_KEYS))
+    list_parser.add_argument('--reverse', action='store_true')
+    list_parser.add_argument('--limit', type=int)
+    list_parser.add_argument('--include-archived', action='store_true', help="Also list archived tasks")
+
+    archive = commands.add_parser('archive', help="Move old completed tasks to the monthly archive")
+    archive.add_argument('--days', type=float, default=30, help="Archive tasks completed more than this many days ago")
+
+    archived = commands.add_parser('archived', help="List archived tasks")
+    archived.add_argument('--since', help="First month to read (YYYY-MM)")
+    archived.add_argument('--until', help="Last month to read (YYYY-MM)")
+
+    occurrences = commands.add_parser('occurrences', help="List tasks due in a date range, repeating tasks expanded")
+    occurrences.add_argument('--start', required=True, help="Window start (YYYY-MM-DD or ISO datetime)")
+    occurrences.add_argument('--end', required=True, help="Window end (YYYY-MM-DD or ISO datetime)")
+
+    commands.add_parser('overdue', help="List overdue tasks")
+    commands.add_parser('upcoming', help="List tasks due soon").add_argument('--hours', type=float, default=24)
+
+
+def run_operation(task_manager, op: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one operation and describe the outcome as a JSON-ready dict.
+
+    Messages the manager prints are captured; for a failed operation they
+    become the error text.
+    """
+    outcome: Dict[str, Any] = {'op': op}
+    if 'task_id' in arguments:
+        outcome['task_id'] = arguments['task_id']
+    handler = OPERATIONS.get(op)
+    if handler is None:
+        outcome.update(ok=False, error=f"Unknown operation '{op}'")
+        return outcome
+
+    messages = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(messages):
+            result = handler(task_manager, **arguments)
+    except (TypeError, ValueError) as e:
+        outcome.update(ok=False, error=str(e))
+        return outcome
+
+    if result is None or result is False:
+        outcome.update(ok=False, error=messages.getvalue().strip() or "Operation failed")
+    else:
+        outcome['ok'] = True
+        if result is not True:
+            outcome['result'] = result
+    return outcome
+
+
+def parse_line(parser: argparse.ArgumentParser, line: str):
+    """Turn a batch line into (op, arguments). Returns None for blank lines and comments."""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        arguments = json.loads(line)
+        if not isinstance(arguments, dict) or 'op' not in arguments:
+            raise ValueError("JSON commands need an 'op' field")
+        op = arguments.pop('op')
+        return op, arguments
+    args = parser.parse_args(shlex.split(line))
+    arguments = vars(args)
+    return arguments.pop('command'), arguments
+
+
+def build_line_parser() -> argparse.ArgumentParser:
+    parser = _LineParser(prog='batch', add_help=False)
+    add_operation_parsers(parser.add_subparsers(dest='command', required=True))
+    return parser
+
+
+class _BatchFailed(Exception):
+    def __init__(self, outcome):
+        super().__init__(outcome.get('error'))
+        self.outcome = outcome
+
+
+def run_batch(task_manager, lines: Iterable[str], atomic: bool = False) -> Iterator[Dict[str, Any]]:
+    """Run batch lines, yielding one outcome per command.
+
+    An unexpected error in an operation is reported as that line's failure
+    and the run continues. With atomic set, the first failure stops the run
+    and every change made by it is rolled back (the outcome reports this
+    with rolled_back: true).
+    """
+    parser = build_line_parser()
+    for number, line in enumerate(lines, start=1):
+        try:
+            parsed = parse_line(parser, line)
+        except ValueError as e:  # includes json.JSONDecodeError
+            parsed = None
+            outcome = {'ok': False, 'line': number, 'error': str(e)}
+        else:
+            if parsed is None:
+                continue
+            try:
+                outcome = {'line': number, **run_operation(task_manager, *parsed)}
+            except Exception as e:
+                outcome = {'ok': False, 'line': number, 'op': parsed[0], 'error': f"{type(e).__name__}: {e}"}
+                if atomic:
+                    outcome['rolled_back'] = True
+                    raise _BatchFailed(outcome) from e
+        if atomic and not outcome['ok']:
+            outcome['rolled_back'] = True
+            raise _BatchFailed(outcome)
+        yield outcome
+
+
+def _write(out: TextIO, outcome: Dict[str, Any]):
+    out.write(json.dumps(outcome, ensure_ascii=False) + "\n")
+
+
+def run(args, out: Optional[TextIO] = None) -> int:
+    """Run a parsed command line (see add_cli_arguments). Returns the exit status."""
+    out = out or sys.stdout
+    failures = 0
+    with contextlib.redirect_stdout(sys.stderr):
+        task_manager = tasks.TaskManager(storage_file=args.storage_file)
+    try:
+        if args.command == 'batch':
+            source = sys.stdin if args.file in (None, '-') else open(args.file, encoding='utf-8')
+            try:
+                with task_manager.batch():
+                    for outcome in run_batch(task_manager, source, atomic=args.atomic):
+                        failures += not outcome['ok']
+                        _write(out, outcome)
+            except _BatchFailed as e:
+                _write(out, e.outcome)
+                return 1
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+        else:
+            parameters = inspect.signature(OPERATIONS[args.command]).parameters
+            arguments = {name: getattr(args, name) for name in parameters if hasattr(args, name)}
+            with task_manager.batch():
+                outcome = run_operation(task_manager, args.command, arguments)
+            failures += not outcome['ok']
+            _write(out, outcome)
+    finally:
+        with contextlib.redirect_stdout(sys.stderr):
+            task_manager.close()
+    return 1 if failures else 0
+
+
+def add_cli_arguments(parser: argparse.ArgumentParser):
+    """Add the scriptable subcommands to the console's argument parser."""
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND',
+                                     help="Run one command and print JSON instead of starting the menu")
+    add_operation_parsers(commands)
+    batch = commands.add_parser('batch', help="Run commands read from a file or stdin, one per line")
+    batch.add_argument('--file', default=None, help="Command file (default: stdin)")
+    batch.add_argument('--atomic', action='store_true',
+                       help="Stop at the first failure and discard all changes")
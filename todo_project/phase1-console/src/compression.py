@@ -0,0 +1,135 @@
+"""
+Response Compression
+
+ASGI middleware that compresses complete response bodies larger than a
+threshold, using brotli when the client accepts it and the optional
+`brotli` package is installed, gzip otherwise.
+
+Streaming responses (e.g. the task event stream) are passed through
+untouched, since compressing them would hold events back in the buffer.
+"""
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Already-compressed or streamed content types are not worth compressing
+SKIP_CONTENT_TYPES = (b"text/event-stream", b"image/", b"video/", b"audio/")
+
+
+def quality(params: str) -> float:
+    """The q value among an Accept-Encoding entry's parameters (1 when absent or malformed)"""
+    for param in params.split(";"):
+        key, _, value = param.partition("=")
+        if key.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                break
+    return 1.0
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header, or None
+
+    A coding listed with q=0 is refused even when "*" would match it.
+    """
+    accepted, refused = set(), set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        (accepted if quality(params) > 0 else refused).add(name.strip())
+
+    def allowed(coding: str) -> bool:
+        return coding in accepted or ("*" in accepted and coding not in refused)
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    if brotli is not None and allowed("br"):
+        return "br"
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """Compress body with the given content encoding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level)
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of at least minimum_size bytes
+
+    gzip_level and brotli_quality trade CPU for size; the defaults favour
+    speed since task lists are small and generated per request.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", ()))
+                content_type = headers.get(b"content-type", b"")
+                if b"content-encoding" in headers or content_type.startswith(SKIP_CONTENT_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the headers until we know whether the body is complete
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.levels[encoding])
+            vary = b"Accept-Encoding"
+            headers = []
+            for name, value in start_message.get("headers", ()):
+                if name == b"vary":
+                    vary = value + b", " + vary
+                elif name != b"content-length":
+                    headers.append((name, value))
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary),
+            ]
+            await send({**start_message, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -9,19 +9,123 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str
+    # Create missing tables when the API starts. Disable for fast worker
+    # startup and manage the schema with `python -m src.manage create-tables`.
+    create_tables_on_startup: bool = True
+    # Comma-separated read replica URLs; GET requests are spread across them
+    database_replica_urls: str = ""
+    # After a user's write, keep their reads on the primary this long
+    read_your_writes_seconds: float = 5.0
+    # Comma-separated shard URLs for task data (users stay in DATABASE_URL).
+    # Only append: shards are identified by position.
+    database_shard_urls: str = ""
+    # Compiled SQL statements cached per engine (hit ratio: GET /health)
+    statement_cache_size: int = 500
+
+    # SQLite tuning, applied to every pooled connection (ignored for other databases)
+    sqlite_tuning: bool = True
+    sqlite_journal_mode: str = "wal"  # readers don't block the writer
+    sqlite_synchronous: str = "normal"  # "full" to fsync every commit
+    sqlite_busy_timeout_ms: int = 5000  # wait this long for a lock before failing
+    sqlite_cache_size_kb: int = 65536  # page cache per connection
+    sqlite_mmap_size: int = 268435456  # bytes of the file memory-mapped for reads
+    sqlite_pool_size: int = 10
+    sqlite_maintenance_interval_seconds: float = 300.0  # WAL checkpoint + PRAGMA optimize; 0 = off
 
     # JWT Configuration
     better_auth_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expiration_minutes: int = 60
 
+    # Password hashing (src/auth.py). Hashes made with another scheme or cost
+    # still verify and are rehashed with these settings at the next login.
+    password_hash_scheme: str = "bcrypt"  # "bcrypt" | "argon2" (memory-hard; needs argon2-cffi)
+    bcrypt_rounds: int = 12  # log2 work factor: each step doubles hash time
+    argon2_time_cost: int = 2  # passes over memory
+    argon2_memory_cost_kb: int = 19456  # memory per hash (19 MiB)
+    argon2_parallelism: int = 1  # threads per hash
+
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # Production server (python -m src.server)
+    workers: int = 0  # 0 = one worker per available CPU core
+    server_loop: str = "auto"  # "auto" (uvloop if installed) | "uvloop" | "asyncio"
+    server_http: str = "auto"  # "auto" (httptools if installed) | "httptools" | "h11"
+    keep_alive_timeout: int = 5  # seconds an idle keep-alive connection stays open
+    backlog: int = 2048  # pending connections the listening socket queues
+    graceful_shutdown_timeout: int = 30  # seconds to drain requests on SIGTERM
+    max_requests_per_worker: int = 0  # recycle a worker after this many requests (0 = never)
+    access_log: bool = True
+
+    # Delta sync: deletions are remembered this long; older watermarks get a full resync
+    tombstone_retention_days: int = 30
+
+    # Archival (python -m src.manage archive-tasks): completed tasks untouched
+    # this long move to the task_archive table
+    archive_after_days: int = 90
+    archive_batch_size: int = 500  # tasks moved per transaction
+
+    # Task change events
+    event_broker: str = "memory"  # see src/events.py BROKER_BACKENDS
+    event_queue_size: int = 100  # events buffered per subscriber before a resync
+    event_heartbeat_seconds: float = 15.0
+
+    # Due-date scheduler (src/scheduler.py); one worker at a time runs the sweeps
+    scheduler_enabled: bool = True
+    scheduler_interval_seconds: float = 60.0
+    scheduler_batch_size: int = 100  # max tasks per kind per tick
+    reminder_lead_minutes: int = 60  # notify this long before a task is due
+    overdue_lookback_hours: int = 24  # only tasks that became overdue this recently
+    notification_sinks: str = "log"  # comma-separated, see NOTIFICATION_SINKS
+    notification_webhook_url: str = ""
+
+    # Profiling (src/profiling.py)
+    profile_secret: str = ""  # signs X-Profile-Token headers; empty = header trigger off
+    profile_sample_rate: float = 0.0  # fraction of requests to profile (0.0-1.0)
+    profile_dir: str = "profiles"
+    slow_query_threshold_ms: float = 200.0  # log statements slower than this; 0 = off
+    slow_query_log_file: str = ""  # also append slow queries here (default: log only)
+
+    # Tracing (src/tracing.py)
+    server_timing: bool = True  # add Server-Timing response headers
+    trace_exporter: str = ""  # "" (off) | "file" | "otlp-http"
+    trace_export_file: str = "traces.jsonl"  # OTLP/JSON lines, for TRACE_EXPORTER=file
+    trace_collector_url: str = "http://localhost:4318/v1/traces"  # for TRACE_EXPORTER=otlp-http
+    trace_service_name: str = "todo-api"
+
+    # Admission control (src/ratelimit.py); limits are per worker with the memory backend
+    rate_limit_backend: str = "memory"  # see src/ratelimit.py RATE_LIMIT_BACKENDS
+    rate_limit_per_second: float = 20.0  # per user (or IP if unauthenticated); 0 = off
+    rate_limit_burst: int = 40
+    auth_rate_limit_per_second: float = 0.5  # per IP on login and register; 0 = off
+    auth_rate_limit_burst: int = 10
+    max_in_flight_requests: int = 200  # concurrent requests per worker before 503; 0 = off
+
+    # Response compression (gzip, or brotli if the `brotli` package is installed)
+    compression_minimum_size: int = 1024  # bytes; smaller responses are sent as is (0 = off)
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
     # CORS
     allowed_origins: str = "http://localhost:3000"
 
+    @property
+    def replica_urls(self) -> list[str]:
+        """Parse read replica URLs from comma-separated string"""
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+
+    @property
+    def shard_urls(self) -> list[str]:
+        """Parse task shard URLs from comma-separated string"""
+        return [url.strip() for url in self.database_shard_urls.split(",") if url.strip()]
+
+    @property
+    def notification_sink_names(self) -> list[str]:
+        """Parse notification sink names from comma-separated string"""
+        return [name.strip() for name in self.notification_sinks.split(",") if name.strip()]
+
     @property
     def cors_origins(self) -> list[str]:
         """Parse CORS origins from comma-separated string"""
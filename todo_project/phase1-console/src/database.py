@@ -1,26 +1,312 @@
 """
 Database Connection and Session Management
 """
+import asyncio
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlmodel import Session, create_engine, SQLModel
 from src.config import settings
+from src.profiling import install_slow_query_log
+from src.sharding import ShardRouter
+from src.statements import track_statement_cache
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=True,  # Log SQL queries (disable in production)
-    pool_pre_ping=True,  # Test connections before using
-)
+logger = logging.getLogger(__name__)
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection for concurrent use
+
+    WAL lets readers run alongside a writer, synchronous=NORMAL skips the
+    fsync on every commit (WAL stays consistent; only the last commits
+    can be lost on power failure), and busy_timeout makes writers wait for
+    the lock instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def make_engine(url: str):
+    """Create an engine with the project's standard options"""
+    new_engine = _create_engine(url)
+    track_statement_cache(new_engine)
+    if settings.slow_query_threshold_ms > 0:
+        install_slow_query_log(new_engine)
+    return new_engine
+
+
+def _create_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            echo=True,  # Log SQL queries (disable in production)
+            pool_pre_ping=True,  # Test connections before using
+            query_cache_size=settings.statement_cache_size,
+        )
+
+    # SQLite: the file is local, so no pre-ping. A file database keeps a pool
+    # of connections (each tuned once, readers in parallel under WAL); an
+    # in-memory database must share its single connection.
+    if make_url(url).database in (None, "", ":memory:"):
+        pool_options = {"poolclass": StaticPool}
+    else:
+        pool_options = {"poolclass": QueuePool, "pool_size": settings.sqlite_pool_size, "max_overflow": 10}
+    sqlite_engine = create_engine(
+        url,
+        echo=True,  # Log SQL queries (disable in production)
+        connect_args={"check_same_thread": False},
+        query_cache_size=settings.statement_cache_size,
+        **pool_options,
+    )
+    if settings.sqlite_tuning:
+        event.listen(sqlite_engine, "connect", apply_sqlite_pragmas)
+    return sqlite_engine
+
+
+# Create database engine (primary: all writes go here)
+engine = make_engine(settings.database_url)
+
+# Optional read replicas, used round-robin for GET requests
+replica_engines = [make_engine(url) for url in settings.replica_urls]
+_replica_cycle = itertools.cycle(replica_engines)
+_replica_lock = threading.Lock()
+
+# Optional task shards; a shard with the primary's URL reuses its engine
+shard_engines = [
+    engine if url == settings.database_url else make_engine(url)
+    for url in settings.shard_urls
+]
+shard_router = ShardRouter(len(shard_engines)) if shard_engines else None
+
+# Read-your-writes: after a commit the client gets this cookie holding the
+# (epoch) time until which its reads go to the primary. Being carried by the
+# client, it holds whichever worker serves the next read.
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Methods whose handlers only read, and may be served from a replica
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def dispose_engine_pool():
+    """
+    Drop pooled connections inherited from a parent process
+
+    Called in a child after os.fork(), so a pre-forking server that imports
+    the app before forking (gunicorn --preload with uvicorn workers) never
+    shares database sockets between workers. uvicorn --workers (and so
+    src.server) spawns fresh interpreters instead, which open their own
+    connections and never run this. close=False leaves the parent's
+    connections untouched.
+    """
+    for each_engine in {engine, *replica_engines, *shard_engines}:
+        each_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=dispose_engine_pool)
+
+
+def task_engine(user_id: int):
+    """Engine holding a user's tasks: their shard, or the primary when unsharded"""
+    if shard_router is None:
+        return engine
+    return shard_engines[shard_router.shard_for(user_id)]
+
+
+def task_engines() -> list:
+    """Every distinct engine that holds task data"""
+    return list(dict.fromkeys(shard_engines)) if shard_engines else [engine]
+
+
+def reads_primary(request: Request) -> bool:
+    """Whether the client committed a write within READ_YOUR_WRITES_SECONDS (per its cookie)"""
+    try:
+        until = float(request.cookies.get(READ_PRIMARY_COOKIE, 0))
+    except ValueError:
+        return False
+    now = time.time()
+    # A deadline further ahead than one window was not set by us; ignore it
+    return now < until <= now + settings.read_your_writes_seconds + 1
+
+
+def read_engine(request: Optional[Request] = None):
+    """
+    Engine to use for a read
+
+    Returns the next replica in round-robin order, or the primary when no
+    replicas are configured or the client wrote within the stickiness window.
+    """
+    if not replica_engines:
+        return engine
+    if request is not None and reads_primary(request):
+        return engine
+    with _replica_lock:
+        return next(_replica_cycle)
+
+
+def keep_reads_on_primary(session: Session, response: Response):
+    """
+    Once session commits, tell the client to read from the primary for a while
+
+    Sets the READ_PRIMARY_COOKIE on response from the session's after_commit
+    event, so only requests that really wrote (after authentication and
+    validation passed) send later reads to the primary.
+    """
+    def set_cookie(committed_session):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(round(time.time() + settings.read_your_writes_seconds, 3)),
+            max_age=max(1, math.ceil(settings.read_your_writes_seconds)),
+            httponly=True,
+            samesite="lax",
+        )
+
+    event.listen(session, "after_commit", set_cookie)
+
+
+def sqlite_maintenance():
+    """
+    Checkpoint the WAL and refresh query planner statistics on SQLite databases
+
+    Without checkpoints under steady traffic the -wal file keeps growing;
+    PRAGMA optimize re-analyzes tables whose statistics are stale.
+    """
+    for each_engine in dict.fromkeys([engine, *replica_engines, *shard_engines]):
+        if each_engine.dialect.name != "sqlite":
+            continue
+        with each_engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            connection.exec_driver_sql("PRAGMA optimize")
+
+
+def uses_sqlite() -> bool:
+    """Whether any configured database is SQLite"""
+    return any(each_engine.dialect.name == "sqlite" for each_engine in [engine, *replica_engines, *shard_engines])
+
+
+async def run_sqlite_maintenance(interval: float):
+    """Run sqlite_maintenance every interval seconds, off the event loop"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(sqlite_maintenance)
+        except Exception:
+            logger.exception("SQLite maintenance failed")
 
 
 def create_db_and_tables():
-    """Create database tables if they don't exist"""
-    SQLModel.metadata.create_all(engine)
+    """Create database tables and indexes if they don't exist, on the primary and every shard"""
+    from src.search import create_search_index
+
+    for each_engine in dict.fromkeys([engine, *shard_engines]):
+        SQLModel.metadata.create_all(each_engine)
+        # create_all only adds indexes together with a new table, so add any
+        # indexes declared since an existing table was created
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(each_engine, checkfirst=True)
+        add_missing_columns(each_engine)
+        add_sqlite_autoincrement(each_engine)
+        create_search_index(each_engine)
 
 
-def get_session():
+def add_missing_columns(target) -> None:
+    """
+    Add nullable columns declared since an existing table was created
+
+    create_all never alters tables, so new optional fields (like
+    Task.recurrence) are added here. Anything more involved needs a real
+    migration.
+    """
+    inspector = inspect(target)
+    existing_tables = set(inspector.get_table_names())
+    with target.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+
+
+def add_sqlite_autoincrement(target) -> None:
+    """
+    Rebuild a SQLite tasks table created without AUTOINCREMENT
+
+    Without it SQLite hands out max(id) + 1, so a new task would take the id
+    of an archived task that had the highest id. The rows keep their ids
+    (and so their search index entries), and the sequence starts above the
+    archive's ids. create_search_index restores the search triggers.
+    """
+    if target.dialect.name != "sqlite":
+        return
+    table = SQLModel.metadata.tables["tasks"]
+    with target.begin() as connection:
+        sql = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+        ).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            return
+        columns = ", ".join(f'"{column.name}"' for column in table.columns)
+        connection.exec_driver_sql("ALTER TABLE tasks RENAME TO tasks_old")
+        for index in table.indexes:
+            connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{index.name}"')
+        table.create(connection)
+        connection.exec_driver_sql(f"INSERT INTO tasks ({columns}) SELECT {columns} FROM tasks_old")
+        connection.exec_driver_sql("DROP TABLE tasks_old")
+        last_archived = connection.exec_driver_sql("SELECT max(id) FROM task_archive").scalar()
+        last_task = connection.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").scalar()
+        if last_archived is not None and last_task is None:
+            connection.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (last_archived,))
+        elif last_archived is not None and last_archived > last_task:
+            connection.exec_driver_sql("UPDATE sqlite_sequence SET seq = ? WHERE name = 'tasks'", (last_archived,))
+        logger.info("Rebuilt the tasks table with AUTOINCREMENT")
+
+
+def request_engine(request: Request):
+    """Primary database engine for a request: a replica for reads when configured, else the primary"""
+    return read_engine(request) if request.method in READ_METHODS else engine
+
+
+def open_session(bind, response: Response) -> Session:
+    """Session on bind; writes committed on the primary keep the client's reads there"""
+    session = Session(bind)
+    if replica_engines and bind is engine:
+        keep_reads_on_primary(session, response)
+    return session
+
+
+def get_session(request: Request, response: Response):
     """
     Dependency for getting database session
     Use this in FastAPI route dependencies
+
+    The session is on the primary database, which holds the users directory
+    (and all tasks when unsharded). With read replicas configured, GET
+    requests get a session on a replica and everything else uses the
+    primary. After a request commits, the client's reads stay on the primary
+    for READ_YOUR_WRITES_SECONDS (see keep_reads_on_primary).
+
+    Routes under /api/{user_id}/ use src.auth.get_task_session, which only
+    opens a session on the user's shard once access is verified.
     """
-    with Session(engine) as session:
+    with open_session(request_engine(request), response) as session:
         yield session
@@ -0,0 +1,114 @@
+"""
+Task Change Events
+
+Publish/subscribe channel used to push task changes to connected clients.
+
+Routes publish an event after every create/update/delete/toggle, and the
+event stream endpoint subscribes per user. The default broker is in-process,
+so events only reach clients connected to the same worker. A cross-worker
+backend (e.g. Redis pub/sub or Postgres LISTEN/NOTIFY) can be added by
+subclassing EventBroker and registering it in BROKER_BACKENDS.
+"""
+import asyncio
+import itertools
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from src.config import settings
+from src.models import TaskResponse
+
+
+class EventBroker(ABC):
+    """Interface for delivering task events to a user's subscribers"""
+
+    @abstractmethod
+    async def publish(self, user_id: int, event: dict) -> None:
+        """Deliver an event to every current subscriber of user_id"""
+
+    @abstractmethod
+    def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Async context manager yielding a queue of events for user_id
+
+        The queue receives event dicts until the context exits.
+        """
+
+
+class InMemoryBroker(EventBroker):
+    """
+    Single-process broker backed by one bounded asyncio.Queue per subscriber
+
+    Publishing never blocks: if a subscriber falls queue_size events behind,
+    its backlog is replaced by a single "resync" event telling the client to
+    reload its task list.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._event_ids = itertools.count(1)
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        event = {"id": next(self._event_ids), **event}
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": event["id"], "type": "resync"})
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id: Optional[int] = None) -> int:
+        """Number of open subscriptions, for one user or overall"""
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+# Broker name (EVENT_BROKER setting) -> factory
+BROKER_BACKENDS = {
+    "memory": lambda: InMemoryBroker(queue_size=settings.event_queue_size),
+}
+
+
+def create_broker(backend: str) -> EventBroker:
+    """Instantiate the configured broker backend"""
+    if backend not in BROKER_BACKENDS:
+        raise ValueError(
+            f"Unknown event broker '{backend}'. Available: {', '.join(BROKER_BACKENDS)}"
+        )
+    return BROKER_BACKENDS[backend]()
+
+
+# Global broker instance
+broker = create_broker(settings.event_broker)
+
+
+async def publish_task_event(user_id: int, event_type: str, task: Optional[TaskResponse] = None,
+                             task_id: Optional[int] = None) -> None:
+    """
+    Publish a task change
+
+    event_type is "created", "updated", "deleted" or "toggled". Deletions
+    carry only the task id; other events carry the full task.
+    """
+    event = {
+        "type": event_type,
+        "task_id": task.id if task is not None else task_id,
+        "task": task.model_dump(mode="json") if task is not None else None,
+    }
+    await broker.publish(user_id, event)
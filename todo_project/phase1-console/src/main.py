@@ -10,8 +10,11 @@ if __name__ == "__main__":
     if parent_dir not in sys.path:
         sys.path.insert(0, parent_dir)
 
-from src import tasks
+from src import cli, recurrence, tasks
 from datetime import datetime
+import argparse
+
+DEFAULT_PAGE_SIZE = 20
 
 def get_priority_input():
     """Get priority input from user with validation."""
@@ -43,11 +46,75 @@ def get_due_date_input():
         print("Invalid date format. Use YYYY-MM-DD.")
         return None
 
-def main():
+def get_recurrence_input():
+    """Get an optional recurrence rule from user with validation."""
+    while True:
+        rule = input("Repeat (daily/weekly/monthly/weekdays/every N days) [no]: ").strip()
+        if not rule:
+            return None
+        try:
+            recurrence.parse_rule(rule)
+            return rule
+        except ValueError as e:
+            print(e)
+
+def browse_tasks(task_manager, tasks_to_show=None, page_size=DEFAULT_PAGE_SIZE):
+    """Show tasks one page at a time with next/prev/jump navigation."""
+    page = 1
+    while True:
+        text, page, total_pages = task_manager.render_task_page(page, page_size, tasks_to_show)
+        sys.stdout.write(text)
+        if total_pages == 1:
+            return
+        command = input("[n]ext, [p]rev, [j]ump <page>, [s]ize <n>, [q]uit: ").strip().lower()
+        if command in ('', 'n'):
+            if page == total_pages:
+                return
+            page += 1
+        elif command == 'p':
+            page -= 1
+        elif command.startswith(('j', 's')):
+            try:
+                value = int(command[1:].strip() or input("Enter number: "))
+            except ValueError:
+                print("Error: Please enter a number.")
+                continue
+            if command.startswith('j'):
+                page = value
+            elif value > 0:
+                first_task = (page - 1) * page_size
+                page_size = value
+                page = first_task // page_size + 1
+            else:
+                print("Error: Page size must be positive.")
+        elif command == 'q':
+            return
+        else:
+            print("Invalid command.")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Console Task Manager")
+    parser.add_argument("--storage-file", default="tasks.json",
+                        help="Task storage file (.snap/.bin for binary snapshots)")
+    parser.add_argument("--list", action="store_true",
+                        help="Print every task to stdout and exit instead of starting the menu")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help="Tasks per page in the interactive list view")
+    cli.add_cli_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command:
+        return cli.run(args)
+    if args.list:
+        tasks.TaskManager(storage_file=args.storage_file).stream_tasks()
+        return
+
     print("="*80)
     print("Welcome to Task Manager!")
     print("="*80)
-    task_manager = tasks.TaskManager()
+    task_manager = tasks.TaskManager(storage_file=args.storage_file)
 
     while True:
         print("\n" + "="*80)
@@ -65,7 +132,8 @@ def main():
         print("10. Search tasks")
         print("11. Filter tasks")
         print("12. Sort tasks")
-        print("13. Exit")
+        print("13. Show overdue and upcoming tasks")
+        print("14. Exit")
         print("="*80)
 
         choice = input("Enter your choice: ").strip()
@@ -78,10 +146,11 @@ def main():
             priority = get_priority_input()
             tags = get_tags_input()
             due_date = get_due_date_input()
-            task_manager.add_task(description, priority, tags, due_date)
+            rule = get_recurrence_input() if due_date else None
+            task_manager.add_task(description, priority, tags, due_date, rule)
             print("✓ Task added successfully!")
         elif choice == '2':
-            task_manager.list_tasks()
+            browse_tasks(task_manager, page_size=args.page_size)
         elif choice == '3':
             task_manager.list_tasks() # Show tasks to user first
             try:
@@ -225,10 +294,32 @@ def main():
             print(f"\nTasks sorted by {sort_by}:")
             task_manager.list_tasks(sorted_tasks)
         elif choice == '13':
+            hours_input = input("Show tasks due within how many hours? [24]: ").strip()
+            try:
+                hours = float(hours_input) if hours_input else 24
+                upcoming = task_manager.get_upcoming_tasks(hours=hours)
+            except ValueError as e:
+                print(f"Error: Invalid number of hours ({e}).")
+                continue
+
+            overdue = task_manager.get_overdue_tasks()
+            if overdue:
+                print(f"\n{len(overdue)} overdue task(s):")
+                task_manager.list_tasks(overdue)
+            else:
+                print("\nNo overdue tasks.")
+
+            if upcoming:
+                print(f"\n{len(upcoming)} task(s) due in the next {hours:g} hours:")
+                task_manager.list_tasks(upcoming)
+            else:
+                print(f"No tasks due in the next {hours:g} hours.")
+        elif choice == '14':
+            task_manager.close()
             print("\nThank you for using the Console Todo App! Goodbye!")
             break
         else:
-            print("Invalid choice. Please enter a number between 1-13.")
+            print("Invalid choice. Please enter a number between 1-14.")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Management Commands
+
+Operational tasks that should not run on every API worker boot.
+
+Usage:
+    python -m src.manage create-tables
+    python -m src.manage purge-tombstones [--older-than-days N]
+    python -m src.manage archive-tasks [--older-than-days N]
+    python -m src.manage rebalance-shards [--dry-run]
+    python -m src.manage import-report [--top 25] [--json]
+    python -m src.manage profile-token [--minutes 10]
+    python -m src.manage hash-benchmark [--scheme bcrypt|argon2] [--costs 10,11,12] [--runs 3] [--json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+
+def create_tables(args):
+    """Create any missing database tables"""
+    from src.database import create_db_and_tables
+
+    create_db_and_tables()
+    print("Database tables created successfully")
+
+
+def purge_tombstones(args):
+    """Delete task deletion and notification records older than the sync retention window"""
+    from datetime import datetime, timedelta
+    from sqlmodel import Session, delete
+    from src.config import settings
+    from src.database import task_engines
+    from src.models import TaskDeletion, TaskNotification
+
+    days = args.older_than_days if args.older_than_days is not None else settings.tombstone_retention_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    tombstones = notifications = 0
+    for shard in task_engines():
+        with Session(shard) as session:
+            tombstones += session.exec(delete(TaskDeletion).where(TaskDeletion.deleted_at < cutoff)).rowcount
+            notifications += session.exec(delete(TaskNotification).where(TaskNotification.sent_at < cutoff)).rowcount
+            session.commit()
+    print(f"Purged {tombstones} tombstone(s) and {notifications} notification record(s) "
+          f"older than {days} day(s)")
+
+
+def archive_tasks(args):
+    """Move long-completed tasks out of the tasks table into the monthly archive"""
+    from sqlmodel import Session
+    from src.archive import archive_completed_tasks
+    from src.config import settings
+    from src.database import task_engines
+
+    days = args.older_than_days if args.older_than_days is not None else settings.archive_after_days
+    months: dict[str, int] = {}
+    for shard in task_engines():
+        with Session(shard) as session:
+            for month, count in archive_completed_tasks(session, days, settings.archive_batch_size).items():
+                months[month] = months.get(month, 0) + count
+    for month in sorted(months):
+        print(f"  {month}: {months[month]} task(s)")
+    print(f"Archived {sum(months.values())} task(s) completed more than {days} day(s) ago")
+
+
+def rebalance_shards(args):
+    """Copy user rows to their shards and move users whose data is on the wrong shard"""
+    from sqlmodel import Session, select
+    from src.database import engine, shard_engines, shard_router
+    from src.models import User
+    from src.sharding import copy_user, move_user, shard_user_ids
+
+    if shard_router is None:
+        print("Sharding is not configured (set DATABASE_SHARD_URLS)")
+        return
+
+    # Every user in the directory needs a copy on their shard
+    with Session(engine) as session:
+        users = session.exec(select(User)).all()
+    copied = 0
+    for shard_number, shard in enumerate(shard_engines):
+        if shard is engine:
+            continue
+        with Session(shard) as shard_session:
+            present = set(shard_session.exec(select(User.id)).all())
+            for user in users:
+                if shard_router.shard_for(user.id) == shard_number and user.id not in present:
+                    copied += 1
+                    if not args.dry_run:
+                        copy_user(user, shard_session)
+            shard_session.commit()
+
+    # Task data may also sit on the primary from before sharding was enabled
+    sources = list(enumerate(shard_engines))
+    if engine not in shard_engines:
+        sources.append(("primary", engine))
+
+    moved_users = moved_tasks = renumbered = 0
+    for shard_number, shard in sources:
+        with Session(shard) as session:
+            user_ids = shard_user_ids(session, include_user_rows=shard is not engine)
+        for user_id in user_ids:
+            target_number = shard_router.shard_for(user_id)
+            if target_number == shard_number:
+                continue
+            moved_users += 1
+            if args.dry_run:
+                print(f"Would move user {user_id}: shard {shard_number} -> {target_number}")
+                continue
+            tasks, renamed = move_user(user_id, shard, shard_engines[target_number],
+                                       keep_user_row=shard is engine)
+            moved_tasks += tasks
+            renumbered += renamed
+            print(f"Moved user {user_id}: shard {shard_number} -> {target_number} ({tasks} task(s))")
+
+    verb = "Would copy" if args.dry_run else "Copied"
+    print(f"{verb} {copied} user row(s); {moved_users} user(s) on the wrong shard, "
+          f"{moved_tasks} task(s) moved, {renumbered} renumbered")
+
+
+def parse_importtime(output: str) -> list[dict]:
+    """
+    Parse `python -X importtime` output
+
+    Returns one entry per imported module with self/cumulative time in
+    microseconds and its nesting depth (0 = imported directly).
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        entries.append({
+            "module": stripped,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return entries
+
+
+def run_importtime(code: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter with -X importtime (timings on stderr)"""
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+
+
+def import_report(args):
+    """Report how long importing the API module takes, and what dominates it"""
+    result = run_importtime(f"import {args.module}")
+    entries = parse_importtime(result.stderr)
+    if result.returncode != 0 or not entries:
+        print(result.stderr, file=sys.stderr)
+        sys.exit(result.returncode or 1)
+
+    # Interpreter startup (site, encodings, ...) is timed too; an empty
+    # program imports exactly those modules, so leave them out
+    startup = {entry["module"] for entry in parse_importtime(run_importtime("pass").stderr)}
+    startup_us = sum(entry["cumulative_us"] for entry in entries if entry["depth"] == 0 and entry["module"] in startup)
+    entries = [entry for entry in entries if entry["module"] not in startup]
+
+    total_us = sum(entry["cumulative_us"] for entry in entries if entry["depth"] == 0)
+    project = [entry for entry in entries if entry["module"].split(".")[0] == "src"]
+    slowest = sorted(entries, key=lambda entry: entry["self_us"], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "total_ms": round(total_us / 1000, 1),
+            "startup_ms": round(startup_us / 1000, 1),
+            "project_modules": project,
+            "slowest_modules": slowest,
+        }, indent=2))
+        return
+
+    print(f"Importing {args.module} took {total_us / 1000:.1f} ms ({len(entries)} modules; "
+          f"interpreter startup, {startup_us / 1000:.1f} ms, not included)")
+    print("\nProject modules (cumulative):")
+    for entry in project:
+        print(f"  {entry['cumulative_us'] / 1000:8.1f} ms  {entry['module']}")
+    print(f"\nTop {len(slowest)} modules by self time:")
+    for entry in slowest:
+        print(f"  {entry['self_us'] / 1000:8.1f} ms  {entry['module']}")
+
+
+def profile_token(args):
+    """Print a signed X-Profile-Token header value"""
+    from src.profiling import make_profile_token
+
+    try:
+        token = make_profile_token(args.minutes * 60)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(token)
+
+
+def hash_benchmark(args):
+    """Report how long one password hash takes at each cost, to size login capacity"""
+    import statistics
+    import time
+    from src.auth import build_pwd_context
+    from src.config import settings
+
+    scheme = args.scheme or settings.password_hash_scheme
+    configured = {
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "argon2_time_cost": settings.argon2_time_cost,
+        "argon2_memory_cost_kb": settings.argon2_memory_cost_kb,
+        "argon2_parallelism": settings.argon2_parallelism,
+    }
+    # The cost varied: bcrypt rounds, or argon2 time cost at the configured memory and parallelism
+    cost_option, default_costs = ("bcrypt_rounds", range(10, 15)) if scheme == "bcrypt" else ("argon2_time_cost", range(1, 5))
+    # Only the configured scheme has a cost in use
+    current = configured[cost_option] if scheme == settings.password_hash_scheme else None
+    if args.costs:
+        costs = sorted({int(cost) for cost in args.costs.split(",")})
+    else:
+        costs = sorted({*default_costs, current} - {None})
+
+    results = []
+    for cost in costs:
+        try:
+            context = build_pwd_context(scheme, **{**configured, cost_option: cost})
+            context.hash("warm-up")
+        except (ValueError, RuntimeError) as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        timings = []
+        for run in range(args.runs):
+            started = time.perf_counter()
+            context.hash(f"benchmark-password-{run}")
+            timings.append(time.perf_counter() - started)
+        seconds = statistics.median(timings)
+        results.append({
+            "cost": cost,
+            "ms_per_hash": round(seconds * 1000, 1),
+            "logins_per_second_per_core": round(1 / seconds, 1),
+            "current": cost == current,
+        })
+
+    if args.json:
+        print(json.dumps({"scheme": scheme, "results": results}, indent=2))
+        return
+
+    cost_name = "rounds" if scheme == "bcrypt" else (
+        f"time cost (memory {settings.argon2_memory_cost_kb} KiB, parallelism {settings.argon2_parallelism})"
+    )
+    print(f"{scheme} {cost_name}, median of {args.runs} hashes:")
+    for result in results:
+        marker = "  <- current" if result["current"] else ""
+        print(f"  {result['cost']:>3}  {result['ms_per_hash']:8.1f} ms  "
+              f"{result['logins_per_second_per_core']:7.1f} logins/s per core{marker}")
+    print("Each login and registration computes one hash; size workers for peak logins accordingly.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.manage", description="Todo API management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("create-tables", help="Create missing database tables").set_defaults(func=create_tables)
+
+    purge = commands.add_parser("purge-tombstones", help="Delete old task deletion and notification records")
+    purge.add_argument("--older-than-days", type=int, default=None,
+                       help="Retention in days (default: TOMBSTONE_RETENTION_DAYS)")
+    purge.set_defaults(func=purge_tombstones)
+
+    archive = commands.add_parser("archive-tasks", help="Move old completed tasks to the archive table")
+    archive.add_argument("--older-than-days", type=int, default=None,
+                         help="Archive tasks completed longer ago than this (default: ARCHIVE_AFTER_DAYS)")
+    archive.set_defaults(func=archive_tasks)
+
+    rebalance = commands.add_parser("rebalance-shards", help="Move users' task data to the shard they map to")
+    rebalance.add_argument("--dry-run", action="store_true", help="Only report what would move")
+    rebalance.set_defaults(func=rebalance_shards)
+
+    report = commands.add_parser("import-report", help="Profile API import time")
+    report.add_argument("--module", default="src.api", help="Module to import (default: src.api)")
+    report.add_argument("--top", type=int, default=20, help="Number of slowest modules to list")
+    report.add_argument("--json", action="store_true", help="Emit the report as JSON")
+    report.set_defaults(func=import_report)
+
+    token = commands.add_parser("profile-token", help="Create a header value that profiles requests")
+    token.add_argument("--minutes", type=int, default=10, help="How long the token is valid (default: 10)")
+    token.set_defaults(func=profile_token)
+
+    benchmark = commands.add_parser("hash-benchmark", help="Time password hashing at each cost setting")
+    benchmark.add_argument("--scheme", choices=["bcrypt", "argon2"], default=None,
+                           help="Scheme to time (default: PASSWORD_HASH_SCHEME)")
+    benchmark.add_argument("--costs", default=None,
+                           help="Comma-separated costs: bcrypt rounds or argon2 time cost (default: a range around the current one)")
+    benchmark.add_argument("--runs", type=int, default=3, help="Hashes timed per cost (default: 3)")
+    benchmark.add_argument("--json", action="store_true", help="Emit the results as JSON")
+    benchmark.set_defaults(func=hash_benchmark)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ Database Models using SQLModel
 """
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship, Column, JSON
 
 
@@ -24,6 +25,14 @@ class User(SQLModel, table=True):
 class Task(SQLModel, table=True):
     """Task model for todo items"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Delta sync: a user's tasks changed since a watermark
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at"),
+        # Scheduler sweeps: pending tasks by due date
+        Index("ix_tasks_status_due_date", "status", "due_date"),
+        # Never reissue the id of a task moved to the archive
+        {"sqlite_autoincrement": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -33,6 +42,8 @@ class Task(SQLModel, table=True):
     priority: str = Field(default="medium")  # "high" | "medium" | "low"
     tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
     due_date: Optional[datetime] = None
+    # Repeating tasks (src/recurrence.py): the row is the next occurrence
+    recurrence: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -40,6 +51,67 @@ class Task(SQLModel, table=True):
     user: Optional[User] = Relationship(back_populates="tasks")
 
 
+class ArchivedTask(SQLModel, table=True):
+    """Completed task moved out of the hot tasks table (see src/archive.py)"""
+    __tablename__ = "task_archive"
+    __table_args__ = (
+        # Monthly partitions: a user's archive, one month at a time
+        Index("ix_task_archive_user_id_archive_month", "user_id", "archive_month"),
+    )
+
+    id: int = Field(primary_key=True)  # the task's original id
+    user_id: int = Field(foreign_key="users.id")
+    title: str
+    description: Optional[str] = None
+    status: str = Field(default="completed")
+    priority: str = Field(default="medium")
+    tags: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    due_date: Optional[datetime] = None
+    recurrence: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    archive_month: str  # "YYYY-MM" the task was completed (last updated)
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskDeletion(SQLModel, table=True):
+    """Tombstone recorded when a task is deleted, so delta sync can report it"""
+    __tablename__ = "task_deletions"
+    __table_args__ = (
+        Index("ix_task_deletions_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    user_id: int = Field(foreign_key="users.id")
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskNotification(SQLModel, table=True):
+    """Record of a due-soon/overdue notification, so each is sent only once"""
+    __tablename__ = "task_notifications"
+    __table_args__ = (
+        # One notification per task, kind and due date (a new due date notifies again)
+        Index("ix_task_notifications_task_id_kind_due_date", "task_id", "kind", "due_date", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    user_id: int = Field(foreign_key="users.id")
+    kind: str  # "due_soon" | "overdue"
+    due_date: datetime
+    sent_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class SchedulerLease(SQLModel, table=True):
+    """Lease naming the worker currently allowed to run a scheduled job"""
+    __tablename__ = "scheduler_leases"
+
+    name: str = Field(primary_key=True)
+    holder: str
+    expires_at: datetime
+
+
 # Pydantic models for API requests/responses
 
 class UserCreate(SQLModel):
@@ -66,6 +138,7 @@ class TaskCreate(SQLModel):
     priority: Optional[str] = "medium"
     tags: Optional[List[str]] = []
     due_date: Optional[datetime] = None
+    recurrence: Optional[str] = None
 
 
 class TaskUpdate(SQLModel):
@@ -75,6 +148,7 @@ class TaskUpdate(SQLModel):
     priority: Optional[str] = None
     tags: Optional[List[str]] = None
     due_date: Optional[datetime] = None
+    recurrence: Optional[str] = None  # "" stops the task repeating
     status: Optional[str] = None
 
 
@@ -88,10 +162,25 @@ class TaskResponse(SQLModel):
     priority: str
     tags: List[str]
     due_date: Optional[datetime]
+    recurrence: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
 
+class TaskOccurrenceResponse(TaskResponse):
+    """One occurrence of a task in a date window (GET /tasks/occurrences)"""
+    occurrence: bool = False  # true for later occurrences of a repeating task, computed on the fly
+
+
+class TaskSyncResponse(SQLModel):
+    """Delta sync response: changes since the client's watermark"""
+    tasks: List[TaskResponse]  # created or updated tasks
+    deleted: List[int]  # ids of deleted tasks (apply before upserting tasks)
+    watermark: Optional[str]  # opaque cursor; pass as `since` on the next sync
+    has_more: bool  # more changes are waiting; sync again immediately
+    reset: bool = False  # watermark too old: tasks is a full list, drop local state
+
+
 class LoginRequest(SQLModel):
     """Login request"""
     email: str
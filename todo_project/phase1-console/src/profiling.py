@@ -0,0 +1,179 @@
+"""
+Request Profiling and Slow Query Log
+
+- ProfilingMiddleware runs selected requests under cProfile and writes the
+  stats to PROFILE_DIR (open with `python -m pstats` or snakeviz). A request
+  is profiled when it carries a valid X-Profile-Token header (see
+  make_profile_token / `python -m src.manage profile-token`) or is picked by
+  PROFILE_SAMPLE_RATE.
+- install_slow_query_log adds SQLAlchemy cursor events to an engine and logs
+  every statement slower than SLOW_QUERY_THRESHOLD_MS with its duration, the
+  shape of its parameters (types only, never values) and the route that ran it.
+
+cProfile follows the event loop thread, so it covers async route handlers
+and the queries they run, plus whatever other requests the loop interleaves
+meanwhile. Only one request per worker is profiled at a time.
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("src.slow_queries")
+
+PROFILE_HEADER = b"x-profile-token"
+
+# ASGI scope of the request being handled, for attributing queries to routes
+current_request: ContextVar[Optional[dict]] = ContextVar("current_request", default=None)
+
+_profile_lock = threading.Lock()
+
+
+def make_profile_token(valid_seconds: int = 600, now: Optional[float] = None) -> str:
+    """Create an X-Profile-Token value: '<expiry>.<hmac>' signed with PROFILE_SECRET"""
+    if not settings.profile_secret:
+        raise ValueError("Set PROFILE_SECRET to sign profiling tokens")
+    expires = int((now or time.time()) + valid_seconds)
+    signature = hmac.new(settings.profile_secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(token: str, now: Optional[float] = None) -> bool:
+    """Check an X-Profile-Token value's signature and expiry"""
+    if not settings.profile_secret:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < (now or time.time()):
+        return False
+    expected = hmac.new(settings.profile_secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
+def route_name(scope: Optional[dict]) -> Optional[str]:
+    """'GET /api/{user_id}/tasks' style name for a request, using the route template once routed"""
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it (signed header) or are sampled"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return verify_profile_token(value.decode("latin-1"))
+        return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context_token = current_request.set(scope)
+        try:
+            if not self._wants_profile(scope) or not _profile_lock.acquire(blocking=False):
+                await self.app(scope, receive, send)
+                return
+            try:
+                await self._profile(scope, receive, send)
+            finally:
+                _profile_lock.release()
+        finally:
+            current_request.reset(context_token)
+
+    async def _profile(self, scope, receive, send):
+        # Name the file up front so the response can point to it
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope.get("path", "")).strip("_") or "root"
+        filename = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{scope.get('method', '')}-{slug}.prof"
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", ()), (b"x-profile-file", filename.encode())]}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            profiler.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            path = os.path.join(settings.profile_dir, filename)
+            try:
+                await asyncio.to_thread(self._save, profiler, path)
+                logger.info("Profiled %s in %.1f ms -> %s", route_name(scope), elapsed_ms, path)
+            except OSError:
+                logger.exception("Could not write profile %s", path)
+
+    @staticmethod
+    def _save(profiler: cProfile.Profile, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profiler.dump_stats(path)
+
+
+def parameter_shape(parameters, executemany: bool):
+    """Describe statement parameters by type only, so values (emails, hashes) are never logged"""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "each": parameter_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.slow_query_threshold_ms:
+        return
+    slow_query_logger.warning(json.dumps({
+        "duration_ms": round(duration_ms, 2),
+        "statement": " ".join(statement.split()),
+        "parameters": parameter_shape(parameters, executemany),
+        "route": route_name(current_request.get()),
+        "database": conn.engine.url.render_as_string(hide_password=True),
+    }))
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def install_slow_query_log(engine):
+    """Log statements on engine slower than SLOW_QUERY_THRESHOLD_MS"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    if settings.slow_query_log_file and not slow_query_logger.handlers:
+        handler = logging.FileHandler(settings.slow_query_log_file)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_query_logger.addHandler(handler)
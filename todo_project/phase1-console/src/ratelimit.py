@@ -0,0 +1,196 @@
+"""
+Admission Control and Rate Limiting
+
+ASGI middleware that sheds load before it reaches the database:
+- A token bucket per client. Login and register get their own, stricter
+  bucket per IP address because they hash passwords. Requests whose bearer
+  token verifies are limited per user, so one user's traffic never uses up
+  another's (or a whole office's, behind one NAT); everything else, bad
+  tokens included, shares a bucket per IP. The decoded token is handed on
+  to get_current_user, so it is still decoded once. Over the limit,
+  requests get 429 with a Retry-After header.
+- A global cap on requests in flight in this worker. Once reached, new
+  requests get 503 immediately instead of queueing behind slow ones.
+
+Bucket state is in-process by default, so limits apply per worker. A shared
+backend (e.g. Redis) can be added by subclassing RateLimitBackend and
+registering it in RATE_LIMIT_BACKENDS.
+"""
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from fastapi import HTTPException
+from src.config import settings
+
+# Paths never limited (load balancer health checks must keep working)
+EXEMPT_PATHS = {"/", "/health"}
+
+# Paths that hash a password, limited per IP with the stricter auth bucket
+AUTH_LIMITED_PATHS = {"/api/auth/login", "/api/auth/register"}
+
+# Long-lived streams would hold an in-flight slot for their whole lifetime,
+# so they are rate limited when they connect but not counted as in flight
+STREAMING_PATH_SUFFIXES = ("/tasks/events",)
+
+
+class RateLimitBackend(ABC):
+    """Interface for token bucket storage"""
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from key's bucket
+
+        Buckets refill at `rate` tokens per second up to `burst`. Returns 0
+        if a token was taken, otherwise the seconds until one is available.
+        """
+
+
+class InMemoryRateLimiter(RateLimitBackend):
+    """
+    Token buckets in a dict, for a single worker
+
+    At most max_keys buckets are kept; the least recently used are dropped
+    first (a dropped bucket simply starts full again).
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Backend name (RATE_LIMIT_BACKEND setting) -> factory
+RATE_LIMIT_BACKENDS = {
+    "memory": lambda: InMemoryRateLimiter(),
+}
+
+
+def create_rate_limiter(backend: str) -> RateLimitBackend:
+    """Instantiate the configured rate limit backend"""
+    if backend not in RATE_LIMIT_BACKENDS:
+        raise ValueError(
+            f"Unknown rate limit backend '{backend}'. Available: {', '.join(RATE_LIMIT_BACKENDS)}"
+        )
+    return RATE_LIMIT_BACKENDS[backend]()
+
+
+_shared_limiter: Optional[RateLimitBackend] = None
+
+
+def get_rate_limiter() -> RateLimitBackend:
+    """The worker's rate limiter, shared by the middleware and get_current_user"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = create_rate_limiter(settings.rate_limit_backend)
+    return _shared_limiter
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" and token else None
+    return None
+
+
+def verified_user_id(scope) -> Optional[int]:
+    """
+    The user id in the request's bearer token if the token verifies, else None
+
+    The decoded token is kept in the request state for get_current_user.
+    """
+    from src.auth import decode_token  # src.auth imports this module
+
+    token = _bearer_token(scope)
+    if token is None:
+        return None
+    try:
+        token_data = decode_token(token)
+    except HTTPException:
+        return None
+    scope.setdefault("state", {})["token_data"] = token_data
+    return token_data["user_id"]
+
+
+async def _send_error(send, status_code: int, detail: str, retry_after: float):
+    """Send a FastAPI-style JSON error response"""
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """
+    Reject requests over the rate limit (429) or concurrency cap (503)
+
+    Checks are cheap and happen before routing, so a rejected request never
+    touches the database or hashes a password.
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimitBackend] = None):
+        self.app = app
+        self._limiter = limiter
+        self.in_flight = 0
+
+    @property
+    def limiter(self) -> RateLimitBackend:
+        return self._limiter or get_rate_limiter()
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        if path in AUTH_LIMITED_PATHS:
+            key = f"auth:{client_ip}"
+            rate, burst = settings.auth_rate_limit_per_second, settings.auth_rate_limit_burst
+        else:
+            rate, burst = settings.rate_limit_per_second, settings.rate_limit_burst
+            user_id = verified_user_id(scope) if rate > 0 else None
+            key = f"ip:{client_ip}" if user_id is None else f"user:{user_id}"
+
+        if rate > 0:
+            wait = await self.limiter.acquire(key, rate, burst)
+            if wait > 0:
+                await _send_error(send, 429, "Too many requests", wait)
+                return
+
+        if path.endswith(STREAMING_PATH_SUFFIXES) or settings.max_in_flight_requests <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= settings.max_in_flight_requests:
+            await _send_error(send, 503, "Server busy, try again shortly", 1)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,214 @@
+"""
+Recurrence Rules for Repeating Tasks
+
+Shared by the console app and the API. A repeating task is stored once,
+as its next occurrence: its due date is the next time it is due and its
+rule says how later occurrences follow. Completing it moves the due date
+on to the following occurrence instead of creating a new task, and
+listings expand occurrences inside the requested window on the fly.
+
+Rules are short strings:
+
+    daily, weekly, monthly, yearly, weekdays
+    every 3 days, every 2 weeks, every 6 months
+    weekly on mon,thu / every 2 weeks on fri
+    monthly on day 31 / every 3 months on day 15
+    any of the above + " until 2025-12-31"
+
+Intervals are capped (MAX_INTERVAL), and a rule simply ends where its
+occurrences would pass the last representable date (year 9999).
+
+Monthly and yearly occurrences fall on the day of the month of the first
+occurrence, or the rule's day, moved back to the last day of shorter
+months. Use anchored() before storing a rule so that a task due on the
+31st returns to the 31st after February.
+"""
+import calendar
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional, Tuple
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+ALIASES = {
+    "daily": "every 1 day",
+    "weekly": "every 1 week",
+    "monthly": "every 1 month",
+    "yearly": "every 1 year",
+    "weekdays": "every 1 week on mon,tue,wed,thu,fri",
+}
+_SHORT_NAMES = {expansion: alias for alias, expansion in ALIASES.items()}
+
+# Guard against runaway expansion of wide windows
+MAX_OCCURRENCES = 1000
+
+# Longest interval per unit, about a century at most
+MAX_INTERVAL = {"day": 1000, "week": 520, "month": 120, "year": 100}
+
+# Stepping past datetime.max raises one of these; the rule has ended there
+_OUT_OF_RANGE = (OverflowError, ValueError)
+
+_RULE = re.compile(
+    r"^every\s+(?P<interval>\d+)\s+(?P<unit>day|week|month|year)s?"
+    r"(?:\s+on\s+(?:day\s+(?P<month_day>\d{1,2})|(?P<days>[a-z]{3}(?:\s*,\s*[a-z]{3})*)))?"
+    r"(?:\s+until\s+(?P<until>\d{4}-\d{2}-\d{2}))?$"
+)
+
+
+def _add_months(moment: datetime, months: int, day: Optional[int] = None) -> datetime:
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(day or moment.day, calendar.monthrange(year, month)[1]))
+
+
+class Recurrence:
+    """A parsed recurrence rule (see parse_rule)"""
+
+    __slots__ = ("unit", "interval", "weekdays", "month_day", "until")
+
+    def __init__(self, unit: str, interval: int = 1, weekdays: Tuple[int, ...] = (),
+                 month_day: Optional[int] = None, until: Optional[date] = None):
+        self.unit = unit
+        self.interval = interval
+        self.weekdays = weekdays
+        self.month_day = month_day
+        self.until = until
+
+    def __str__(self) -> str:
+        text = f"every {self.interval} {self.unit}{'s' if self.interval != 1 else ''}"
+        if self.weekdays:
+            text += " on " + ",".join(WEEKDAYS[day] for day in self.weekdays)
+        text = _SHORT_NAMES.get(text, text)
+        if self.month_day:
+            text += f" on day {self.month_day}"
+        if self.until:
+            text += f" until {self.until.isoformat()}"
+        return text
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Recurrence) and str(self) == str(other)
+
+    def _nth(self, start: datetime, n: int) -> datetime:
+        """The n-th occurrence counted from start (rules without weekdays)"""
+        if self.unit == "day":
+            return start + timedelta(days=n * self.interval)
+        if self.unit == "week":
+            return start + timedelta(weeks=n * self.interval)
+        return _add_months(start, n * self.interval * (12 if self.unit == "year" else 1), self.month_day)
+
+    def anchored(self, start: datetime) -> "Recurrence":
+        """
+        This rule with its day of the month pinned to start's, if that matters
+
+        Only monthly and yearly rules starting after the 28th need it: without
+        a pinned day, counting on from a clamped occurrence (Feb 29) would
+        stay on that earlier day.
+        """
+        if self.unit in ("month", "year") and not self.month_day and start.day > 28:
+            return Recurrence(self.unit, self.interval, self.weekdays, start.day, self.until)
+        return self
+
+    def _first_index(self, start: datetime, after: datetime) -> int:
+        """Index of roughly the first occurrence at or after `after`, without walking from start"""
+        if after <= start:
+            return 0
+        if self.unit in ("day", "week"):
+            step = timedelta(days=self.interval * (7 if self.unit == "week" else 1))
+            return (after - start) // step
+        months = (after.year - start.year) * 12 + after.month - start.month
+        return max(0, months // (self.interval * (12 if self.unit == "year" else 1)) - 1)
+
+    def occurrences(self, start: datetime, window_start: Optional[datetime] = None,
+                    window_end: Optional[datetime] = None) -> Iterator[datetime]:
+        """
+        Occurrences of a task first due at `start` within [window_start, window_end]
+
+        start itself is always the first occurrence, even if the rule names
+        other days. Generated lazily in order; the window start is reached by
+        arithmetic, not by stepping through every earlier occurrence.
+        """
+        window_start = max(start, window_start or start)
+        last = datetime.combine(self.until, time.max) if self.until else None
+        if window_end is not None:
+            last = min(last, window_end) if last else window_end
+        if last is not None and window_start > last:
+            return
+        if window_start == start:
+            yield start
+            window_start += timedelta(microseconds=1)
+
+        if self.weekdays:
+            week_start = start - timedelta(days=start.weekday())
+            period = timedelta(weeks=self.interval)
+            week = week_start + max(0, (window_start - week_start) // period) * period
+            while last is None or week <= last:
+                for day in self.weekdays:
+                    try:
+                        moment = week + timedelta(days=day)
+                    except _OUT_OF_RANGE:
+                        return
+                    if last is not None and moment > last:
+                        return
+                    if moment >= window_start:
+                        yield moment
+                try:
+                    week += period
+                except _OUT_OF_RANGE:
+                    return
+            return
+
+        n = self._first_index(start, window_start)
+        while True:
+            try:
+                moment = self._nth(start, n)
+            except _OUT_OF_RANGE:
+                return
+            if last is not None and moment > last:
+                return
+            if moment >= window_start:
+                yield moment
+            n += 1
+
+    def next_after(self, start: datetime, moment: datetime) -> Optional[datetime]:
+        """First occurrence strictly after `moment`, or None once the rule has ended"""
+        for occurrence in self.occurrences(start, moment):
+            if occurrence > moment:
+                return occurrence
+        return None
+
+
+def parse_rule(text: str) -> Recurrence:
+    """Parse a rule string, raising ValueError with a readable message if it is invalid"""
+    first, _, rest = " ".join(text.strip().lower().split()).partition(" ")
+    normalized = " ".join(filter(None, [ALIASES.get(first, first), rest]))
+    match = _RULE.match(normalized)
+    if not match:
+        raise ValueError(
+            f"Invalid recurrence '{text}'. Use daily, weekly, monthly, yearly, weekdays or "
+            "'every N days|weeks|months|years', optionally with 'on mon,wed' (weekly) "
+            "and 'until YYYY-MM-DD'."
+        )
+    interval = int(match["interval"])
+    if interval < 1:
+        raise ValueError("Recurrence interval must be at least 1")
+    if interval > MAX_INTERVAL[match["unit"]]:
+        raise ValueError(f"Recurrence interval can be at most {MAX_INTERVAL[match['unit']]} {match['unit']}s")
+    weekdays: Tuple[int, ...] = ()
+    if match["days"]:
+        if match["unit"] != "week":
+            raise ValueError("Only weekly recurrences can name days ('every 2 weeks on mon,fri')")
+        names = [name.strip() for name in match["days"].split(",")]
+        unknown = [name for name in names if name not in WEEKDAYS]
+        if unknown:
+            raise ValueError(f"Unknown weekday(s): {', '.join(unknown)}. Use {', '.join(WEEKDAYS)}.")
+        weekdays = tuple(sorted({WEEKDAYS.index(name) for name in names}))
+    month_day = int(match["month_day"]) if match["month_day"] else None
+    if month_day is not None:
+        if match["unit"] not in ("month", "year"):
+            raise ValueError("Only monthly and yearly recurrences can name a day ('monthly on day 15')")
+        if not 1 <= month_day <= 31:
+            raise ValueError("Recurrence day must be between 1 and 31")
+    try:
+        until_date = date.fromisoformat(match["until"]) if match["until"] else None
+    except ValueError:
+        raise ValueError(f"Invalid recurrence end date '{match['until']}'. Use YYYY-MM-DD.")
+    return Recurrence(match["unit"], interval, weekdays, month_day, until_date)
@@ -2,10 +2,12 @@
 Authentication API Routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from src.database import get_session
+from sqlmodel import Session
+from src.sharding import copy_user
+from src.database import engine, get_session, task_engine
 from src.models import User, UserCreate, UserResponse, LoginRequest, AuthResponse
-from src.auth import hash_password, verify_password, create_access_token, get_current_user
+from src.auth import hash_password, verify_and_rehash_password, create_access_token, get_current_user
+from src.statements import USER_BY_EMAIL
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -20,8 +22,7 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
     - Returns JWT token and user info
     """
     # Check if user already exists
-    statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement).first()
+    existing_user = session.exec(USER_BY_EMAIL, params={"email": user_data.email}).first()
 
     if existing_user:
         raise HTTPException(
@@ -42,6 +43,13 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
     session.commit()
     session.refresh(new_user)
 
+    # With sharding, the user's shard keeps its own copy of the user row
+    shard = task_engine(new_user.id)
+    if shard is not engine:
+        with Session(shard) as shard_session:
+            copy_user(new_user, shard_session)
+            shard_session.commit()
+
     # Generate JWT token
     access_token = create_access_token(new_user.id, new_user.email)
 
@@ -64,19 +72,27 @@ async def login(login_data: LoginRequest, session: Session = Depends(get_session
     Login user
 
     - Validates email and password
+    - Rehashes the password if its hash uses an outdated scheme or cost
     - Returns JWT token and user info
     """
     # Find user by email
-    statement = select(User).where(User.email == login_data.email)
-    user = session.exec(statement).first()
+    user = session.exec(USER_BY_EMAIL, params={"email": login_data.email}).first()
 
-    if not user or not verify_password(login_data.password, user.password_hash):
+    valid, new_hash = verify_and_rehash_password(login_data.password, user.password_hash) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # The hash predates the current scheme or cost: store an upgraded one
+    if new_hash:
+        user.password_hash = new_hash
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+
     # Generate JWT token
     access_token = create_access_token(user.id, user.email)
 
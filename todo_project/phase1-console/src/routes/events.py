@@ -0,0 +1,63 @@
+"""
+Task Change Stream (Server-Sent Events)
+"""
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from src.config import settings
+from src.events import broker
+from src.models import User
+from src.auth import get_current_user, get_task_session, verify_user_access
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+
+def format_sse(event: dict) -> str:
+    """Encode an event dict as a Server-Sent Events message"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(user_id: int, request: Request):
+    """Yield SSE messages for user_id until the client disconnects"""
+    async with broker.subscribe(user_id) as queue:
+        yield "event: ready\ndata: {}\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.event_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies and load balancers from closing the idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+
+
+@router.get("/{user_id}/tasks/events")
+async def stream_task_events(
+    user_id: int,
+    request: Request,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_task_session)
+):
+    """
+    Stream the user's task changes as Server-Sent Events
+
+    Sends a "ready" event once subscribed, then one event per change:
+    - created / updated / toggled: data.task holds the full task
+    - deleted: data.task_id holds the removed task's id
+    - resync: the client fell behind and should reload its task list
+
+    Requires the Authorization header, so browsers should read the stream
+    with fetch() rather than EventSource.
+    """
+    verify_user_access(user, user_id)
+
+    # Release the pooled database connection; the stream may stay open for hours
+    session.close()
+
+    return StreamingResponse(
+        event_stream(user_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
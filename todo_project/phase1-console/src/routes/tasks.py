@@ -1,16 +1,119 @@
 """
 Task CRUD API Routes
 """
-from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select
-from src.database import get_session
-from src.models import Task, TaskCreate, TaskUpdate, TaskResponse, User
-from src.auth import get_current_user, verify_user_access
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlmodel import Session, and_, or_, select
+from src.config import settings
+from src.models import (
+    Task, TaskCreate, TaskUpdate, TaskResponse, TaskOccurrenceResponse, TaskDeletion,
+    TaskSyncResponse, User,
+)
+from src.auth import get_current_user, get_task_session, verify_user_access
+from src.events import publish_task_event
+from src.recurrence import MAX_OCCURRENCES, parse_rule
+from src.search import search_tasks as run_search
+from src.statements import ARCHIVED_TASK_BY_ID, TASK_BY_ID, task_list_statement
+from src.tracing import span
 
 router = APIRouter(prefix="/api", tags=["tasks"])
 
+# Fields a client may request with `fields=`
+TASK_FIELDS = list(TaskResponse.model_fields)
+
+# Read endpoints validate and encode their response inside the "serialize"
+# span, so it times the JSON encoding too; a returned model would only be
+# encoded by FastAPI after the route (and the span) finished
+TASK_ADAPTER = TypeAdapter(TaskResponse)
+TASK_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
+OCCURRENCE_LIST_ADAPTER = TypeAdapter(List[TaskOccurrenceResponse])
+
+
+def json_response(adapter: TypeAdapter, value) -> Response:
+    """JSON response with value (models or ORM objects) validated and encoded as adapter's type"""
+    return Response(adapter.dump_json(adapter.validate_python(value, from_attributes=True)),
+                    media_type="application/json")
+
+# Widest window GET /tasks/occurrences expands
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
+# How far behind the request time a sync with no new tombstones moves the
+# deletion cursor; covers tombstones still being committed
+SYNC_DELETION_MARGIN = timedelta(minutes=5)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields` parameter into TaskResponse field names
+
+    Returns None when all fields are wanted. The id is always included so
+    clients can match rows to tasks.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(TASK_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(TASK_FIELDS)}"
+        )
+    requested.add("id")
+    return [name for name in TASK_FIELDS if name in requested]
+
+
+def as_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, as stored, for a possibly timezone-aware datetime"""
+    if moment is not None and moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def check_recurrence(rule: str, due_date: Optional[datetime]) -> str:
+    """
+    Validate a recurrence rule for a task due at due_date
+
+    Returns the normalized rule; raises 400 if it is invalid or the task has
+    no due date to count occurrences from.
+    """
+    if due_date is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A repeating task needs a due_date"
+        )
+    try:
+        return str(parse_rule(rule).anchored(as_utc(due_date)))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def advance_recurring(task: Task) -> bool:
+    """
+    Move a repeating task on to its next occurrence instead of completing it
+
+    Occurrences missed while it was overdue are skipped. Returns False when
+    the rule has ended, so the task should be completed normally.
+    """
+    if not task.recurrence or task.due_date is None:
+        return False
+    try:
+        rule = parse_rule(task.recurrence)
+    except ValueError:
+        return False
+    due = as_utc(task.due_date)
+    next_due = rule.next_after(due, max(due, datetime.utcnow()))
+    if next_due is None:
+        return False
+    task.due_date = next_due
+    return True
+
 
 @router.get("/{user_id}/tasks", response_model=List[TaskResponse])
 async def get_tasks(
@@ -20,8 +123,10 @@ async def get_tasks(
     tag_filter: Optional[str] = Query(None, alias="tag"),
     limit: Optional[int] = Query(100, ge=1, le=1000),
     offset: Optional[int] = Query(0, ge=0),
+    fields: Optional[str] = Query(None),
+    include_archived: bool = Query(False),
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_task_session)
 ):
     """
     Get all tasks for the authenticated user
@@ -32,31 +137,265 @@ async def get_tasks(
     - tag: filter by tag name
     - limit: max number of results (default 100)
     - offset: pagination offset (default 0)
+    - fields: comma-separated fields to return, e.g. "id,title,status"
+      (default: all fields; id is always included)
+    - include_archived: also return archived tasks (default false),
+      ordered by id with the live ones
     """
     # Verify user has access to this resource
     verify_user_access(user, user_id)
 
-    # Build query
-    statement = select(Task).where(Task.user_id == user_id)
+    selected_fields = parse_fields(fields)
+    if include_archived:
+        selected_fields = selected_fields or TASK_FIELDS
+
+    # Prebuilt per combination of options (see src/statements.py), loading
+    # only the requested columns for sparse fieldsets
+    statement = task_list_statement(
+        tuple(selected_fields) if selected_fields is not None else None,
+        status=bool(status_filter),
+        priority=bool(priority_filter),
+        tag=bool(tag_filter),
+        include_archived=include_archived,
+    )
+    params = {
+        "user_id": user_id,
+        "status": status_filter,
+        "priority": priority_filter,
+        "tag": [tag_filter],
+        "offset": offset,
+        "limit": limit,
+    }
 
-    # Apply filters
-    if status_filter:
-        statement = statement.where(Task.status == status_filter)
+    # Execute query
+    if selected_fields is not None:
+        with span("task_query"):
+            rows = session.exec(statement, params=params).all()
+        with span("serialize"):
+            if len(selected_fields) == 1:
+                # A single-column select yields plain values rather than rows
+                rows = [(value,) for value in rows]
+            return JSONResponse(jsonable_encoder([dict(zip(selected_fields, row)) for row in rows]))
 
-    if priority_filter:
-        statement = statement.where(Task.priority == priority_filter)
+    with span("task_query"):
+        tasks = session.exec(statement, params=params).all()
 
-    if tag_filter:
-        # SQLModel/SQLAlchemy JSON contains query
-        statement = statement.where(Task.tags.contains([tag_filter]))
+    with span("serialize"):
+        return json_response(TASK_LIST_ADAPTER, tasks)
 
-    # Apply pagination
-    statement = statement.offset(offset).limit(limit)
 
-    # Execute query
+def encode_sync_cursor(tasks_after: Optional[Tuple[datetime, int]], deletions_after: Tuple[datetime, Optional[int]]) -> str:
+    """
+    Opaque sync watermark: the last (updated_at, id) of tasks and (deleted_at, id) of deletions sent
+
+    Both parts include the id, so rows sharing a timestamp can be split
+    across pages without losing any.
+    """
+    payload = {
+        "t": [tasks_after[0].isoformat(), tasks_after[1]] if tasks_after else None,
+        "d": [deletions_after[0].isoformat(), deletions_after[1]],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(since: str) -> Tuple[Optional[Tuple[datetime, Optional[int]]], Tuple[datetime, Optional[int]]]:
+    """
+    Parse a watermark from encode_sync_cursor into (tasks_after, deletions_after)
+
+    A plain ISO datetime, as returned before watermarks became cursors, is
+    read as "everything after that moment". Raises 400 if neither.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(since + "=" * (-len(since) % 4)))
+        tasks_after = payload["t"] and (as_utc(datetime.fromisoformat(payload["t"][0])), int(payload["t"][1]))
+        deleted_at, deletion_id = payload["d"]
+        return tasks_after, (as_utc(datetime.fromisoformat(deleted_at)), None if deletion_id is None else int(deletion_id))
+    except (ValueError, TypeError, KeyError, IndexError):
+        pass
+    try:
+        moment = as_utc(datetime.fromisoformat(since))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync watermark")
+    return (moment, None), (moment, None)
+
+
+def after_cursor(timestamp_column, id_column, cursor: Tuple[datetime, Optional[int]]):
+    """Rows ordered after cursor by (timestamp, id); a cursor without an id skips its whole timestamp"""
+    moment, last_id = cursor
+    if last_id is None:
+        return timestamp_column > moment
+    # The >= bound keeps this a range scan on the (user_id, timestamp) index
+    return and_(timestamp_column >= moment, or_(timestamp_column > moment, id_column > last_id))
+
+
+@router.get("/{user_id}/tasks/sync", response_model=TaskSyncResponse)
+async def sync_tasks(
+    user_id: int,
+    since: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_task_session)
+):
+    """
+    Get task changes since a watermark
+
+    - since: watermark from the previous sync (omit for a full sync)
+    - limit: max number of changed tasks to return
+
+    Returns tasks created or updated after `since` and the ids of tasks
+    deleted after it. Clients should apply deletions first, then upsert the
+    tasks, store `watermark`, and sync again right away while `has_more` is
+    true. The watermark is opaque; pages end exactly after the last task
+    sent, even inside a run of tasks changed at the same moment. If `since`
+    is older than the tombstone retention window, a full list is returned
+    with `reset` set. A sync that finds no deletions still moves the
+    watermark along, so clients that sync regularly are never reset.
+    """
+    # Verify user has access to this resource
+    verify_user_access(user, user_id)
+
+    now = datetime.utcnow()
+    tasks_after = None
+    deletions_after = (now, None)  # a full sync needs only deletions from now on
+    reset = False
+    if since is not None:
+        tasks_after, deletions_after = decode_sync_cursor(since)
+        if deletions_after[0] < now - timedelta(days=settings.tombstone_retention_days):
+            tasks_after, deletions_after = None, (now, None)
+            reset = True
+
+    # Uses ix_tasks_user_id_updated_at
+    statement = select(Task).where(Task.user_id == user_id)
+    if tasks_after is not None:
+        statement = statement.where(after_cursor(Task.updated_at, Task.id, tasks_after))
+    statement = statement.order_by(Task.updated_at, Task.id).limit(limit + 1)
     tasks = session.exec(statement).all()
 
-    return [TaskResponse.model_validate(task) for task in tasks]
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+    if tasks:
+        tasks_after = (tasks[-1].updated_at, tasks[-1].id)
+
+    deleted: List[int] = []
+    if since is not None and not reset:
+        # Uses ix_task_deletions_user_id_deleted_at
+        deletion_statement = select(TaskDeletion).where(
+            TaskDeletion.user_id == user_id,
+            after_cursor(TaskDeletion.deleted_at, TaskDeletion.id, deletions_after),
+        )
+        if has_more:
+            # Deletions later than this page's tasks come with a later page
+            deletion_statement = deletion_statement.where(TaskDeletion.deleted_at <= tasks_after[0])
+        deletion_statement = deletion_statement.order_by(TaskDeletion.deleted_at, TaskDeletion.id)
+        deletions = session.exec(deletion_statement).all()
+        deleted = [deletion.task_id for deletion in deletions]
+        if deletions:
+            deletions_after = (deletions[-1].deleted_at, deletions[-1].id)
+        elif not has_more and deletions_after[0] < now - SYNC_DELETION_MARGIN:
+            # There were none up to now; only ones still being committed can appear before it
+            deletions_after = (now - SYNC_DELETION_MARGIN, None)
+
+    return TaskSyncResponse(
+        tasks=[TaskResponse.model_validate(task) for task in tasks],
+        deleted=deleted,
+        watermark=encode_sync_cursor(tasks_after, deletions_after),
+        has_more=has_more,
+        reset=reset,
+    )
+
+
+@router.get("/{user_id}/tasks/search", response_model=List[TaskResponse])
+async def search_tasks(
+    user_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_task_session)
+):
+    """
+    Search the authenticated user's tasks by title and description
+
+    - q: search words; every word must match, the last one as a prefix
+    - limit: max number of results (default 20)
+
+    Results are ranked by relevance, best match first.
+    """
+    # Verify user has access to this resource
+    verify_user_access(user, user_id)
+
+    with span("task_query"):
+        tasks = run_search(session, user_id, q, limit)
+
+    with span("serialize"):
+        return json_response(TASK_LIST_ADAPTER, tasks)
+
+
+@router.get("/{user_id}/tasks/occurrences", response_model=List[TaskOccurrenceResponse])
+async def get_task_occurrences(
+    user_id: int,
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    limit: int = Query(200, ge=1, le=1000),
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_task_session)
+):
+    """
+    Pending tasks due in a time window, with repeating tasks expanded
+
+    - start: window start (default: now)
+    - end: window end, exclusive (default: a week after start; at most 366 days after it)
+    - limit: max number of occurrences (default 200)
+
+    A repeating task is stored once, as its next occurrence; later
+    occurrences in the window are computed here and marked `occurrence: true`.
+    Results are ordered by due date.
+    """
+    # Verify user has access to this resource
+    verify_user_access(user, user_id)
+
+    start = as_utc(start) or datetime.utcnow()
+    end = as_utc(end) or start + timedelta(days=7)
+    if end <= start or end - start > MAX_OCCURRENCE_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"end must be after start and at most {MAX_OCCURRENCE_WINDOW.days} days later"
+        )
+
+    # One-off tasks due in the window, and repeating tasks whose next occurrence is before its end
+    statement = select(Task).where(
+        Task.user_id == user_id,
+        Task.status == "pending",
+        Task.due_date < end,
+        or_(Task.due_date >= start, Task.recurrence.is_not(None)),
+    )
+    with span("task_query"):
+        tasks = session.exec(statement).all()
+
+    with span("serialize"):
+        occurrences = []
+        for task in tasks:
+            due = as_utc(task.due_date)
+            if not task.recurrence:
+                occurrences.append((due, task.id, task, False))
+                continue
+            try:
+                rule = parse_rule(task.recurrence)
+            except ValueError:
+                continue
+            window = rule.occurrences(due, start, end - timedelta(microseconds=1))
+            occurrences.extend(
+                (moment, task.id, task, moment != due)
+                for moment in islice(window, min(limit, MAX_OCCURRENCES))
+            )
+        occurrences.sort(key=lambda entry: entry[:2])
+        return json_response(OCCURRENCE_LIST_ADAPTER, [
+            TaskOccurrenceResponse(
+                **TaskResponse.model_validate(task).model_dump(exclude={"due_date"}),
+                due_date=moment,
+                occurrence=computed,
+            )
+            for moment, _, task, computed in occurrences[:limit]
+        ])
 
 
 @router.post("/{user_id}/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -64,7 +403,7 @@ async def create_task(
     user_id: int,
     task_data: TaskCreate,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_task_session)
 ):
     """
     Create a new task for the authenticated user
@@ -76,6 +415,8 @@ async def create_task(
     - priority: "high", "medium", or "low" (default: "medium")
     - tags: List of tags
     - due_date: ISO datetime string
+    - recurrence: repeat rule, e.g. "daily", "weekdays", "every 2 weeks on mon"
+      (needs due_date; see src/recurrence.py)
     """
     # Verify user has access to this resource
     verify_user_access(user, user_id)
@@ -95,32 +436,40 @@ async def create_task(
         priority=task_data.priority or "medium",
         tags=task_data.tags or [],
         due_date=task_data.due_date,
+        recurrence=check_recurrence(task_data.recurrence, task_data.due_date) if task_data.recurrence else None,
     )
 
     session.add(new_task)
     session.commit()
     session.refresh(new_task)
 
-    return TaskResponse.model_validate(new_task)
+    response = TaskResponse.model_validate(new_task)
+    await publish_task_event(user_id, "created", response)
+    return response
 
 
 @router.get("/{user_id}/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(
     user_id: int,
     task_id: int,
+    include_archived: bool = Query(False),
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_task_session)
 ):
     """
     Get a single task by ID
 
-    Verifies that the task belongs to the authenticated user
+    Verifies that the task belongs to the authenticated user. With
+    include_archived, tasks moved to the archive are found too.
     """
     # Verify user has access to this resource
     verify_user_access(user, user_id)
 
     # Get task
-    task = session.get(Task, task_id)
+    with span("task_query"):
+        task = session.exec(TASK_BY_ID, params={"task_id": task_id}).first()
+        if include_archived and (task is None or task.user_id != user_id):
+            task = session.exec(ARCHIVED_TASK_BY_ID, params={"task_id": task_id}).first() or task
 
     if not task:
         raise HTTPException(
@@ -135,7 +484,8 @@ async def get_task(
             detail="Access denied: Task does not belong to you"
         )
 
-    return TaskResponse.model_validate(task)
+    with span("serialize"):
+        return json_response(TASK_ADAPTER, task)
 
 
 @router.put("/{user_id}/tasks/{task_id}", response_model=TaskResponse)
@@ -144,7 +494,7 @@ async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_task_session)
 ):
     """
     Update an existing task
@@ -157,12 +507,16 @@ async def update_task(
     - priority: "high", "medium", or "low"
     - tags: List of tags
     - due_date: ISO datetime string (null to remove)
+    - recurrence: repeat rule ("" to stop repeating)
+
+    Completing a repeating task moves its due date to the next occurrence
+    and leaves it pending, until the rule ends.
     """
     # Verify user has access to this resource
     verify_user_access(user, user_id)
 
     # Get task
-    task = session.get(Task, task_id)
+    task = session.exec(TASK_BY_ID, params={"task_id": task_id}).first()
 
     if not task:
         raise HTTPException(
@@ -199,7 +553,10 @@ async def update_task(
         task.description = task_data.description
 
     if task_data.status is not None:
-        task.status = task_data.status
+        if task_data.status == "completed" and task.status == "pending" and advance_recurring(task):
+            pass  # a repeating task moves on to its next occurrence instead
+        else:
+            task.status = task_data.status
 
     if task_data.priority is not None:
         task.priority = task_data.priority
@@ -210,6 +567,9 @@ async def update_task(
     if task_data.due_date is not None:
         task.due_date = task_data.due_date
 
+    if task_data.recurrence is not None:
+        task.recurrence = check_recurrence(task_data.recurrence, task.due_date) if task_data.recurrence else None
+
     # Update timestamp
     task.updated_at = datetime.utcnow()
 
@@ -217,7 +577,9 @@ async def update_task(
     session.commit()
     session.refresh(task)
 
-    return TaskResponse.model_validate(task)
+    response = TaskResponse.model_validate(task)
+    await publish_task_event(user_id, "updated", response)
+    return response
 
 
 @router.delete("/{user_id}/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -225,18 +587,19 @@ async def delete_task(
     user_id: int,
     task_id: int,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_task_session)
 ):
     """
     Delete a task
 
-    Permanently removes the task from the database
+    Permanently removes the task from the database and records the
+    deletion so GET /tasks/sync can report it
     """
     # Verify user has access to this resource
     verify_user_access(user, user_id)
 
     # Get task
-    task = session.get(Task, task_id)
+    task = session.exec(TASK_BY_ID, params={"task_id": task_id}).first()
 
     if not task:
         raise HTTPException(
@@ -251,10 +614,12 @@ async def delete_task(
             detail="Access denied: Task does not belong to you"
         )
 
-    # Delete task
+    # Delete task, leaving a tombstone for delta sync
     session.delete(task)
+    session.add(TaskDeletion(task_id=task.id, user_id=user_id))
     session.commit()
 
+    await publish_task_event(user_id, "deleted", task_id=task_id)
     return None
 
 
@@ -263,19 +628,20 @@ async def toggle_task_complete(
     user_id: int,
     task_id: int,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_task_session)
 ):
     """
     Toggle task completion status
 
-    - If task is pending, marks it as completed
+    - If task is pending, marks it as completed (a repeating task instead
+      moves on to its next occurrence and stays pending)
     - If task is completed, marks it as pending
     """
     # Verify user has access to this resource
     verify_user_access(user, user_id)
 
     # Get task
-    task = session.get(Task, task_id)
+    task = session.exec(TASK_BY_ID, params={"task_id": task_id}).first()
 
     if not task:
         raise HTTPException(
@@ -291,11 +657,14 @@ async def toggle_task_complete(
         )
 
     # Toggle status
-    task.status = "completed" if task.status == "pending" else "pending"
+    if task.status == "completed" or not advance_recurring(task):
+        task.status = "completed" if task.status == "pending" else "pending"
     task.updated_at = datetime.utcnow()
 
     session.add(task)
     session.commit()
     session.refresh(task)
 
-    return TaskResponse.model_validate(task)
+    response = TaskResponse.model_validate(task)
+    await publish_task_event(user_id, "toggled", response)
+    return response
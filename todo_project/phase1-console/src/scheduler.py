@@ -0,0 +1,265 @@
+"""
+Background Scheduler for Due-Date Notifications
+
+An asyncio loop started from the API lifespan. Every tick it:
+1. Takes or renews a lease row in scheduler_leases, so only one worker
+   (across processes and hosts sharing the database) runs the sweeps.
+2. Sweeps pending tasks that are due within REMINDER_LEAD_MINUTES
+   ("due_soon") or became overdue within OVERDUE_LOOKBACK_HOURS ("overdue"),
+   at most SCHEDULER_BATCH_SIZE tasks of each kind per tick, oldest due
+   date first. The batch takes tasks from the shards in turn, starting one
+   shard further each tick, so a backlog on one shard never starves the
+   others while shards with little due keep the rest of the batch for it.
+3. Sends them to the configured notification sinks and records them in
+   task_notifications so they are not sent again.
+
+Database work runs in a thread so request handling on the event loop is not
+blocked, and the batch size bounds the work per tick. Anything left over is
+picked up on the next tick. Notifications are delivered at least once: if
+recording fails after a sink accepted them, they are sent again.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from itertools import zip_longest
+from typing import List, Optional
+from sqlalchemy import and_, exists, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from src.config import settings
+from src.database import engine, task_engine, task_engines
+from src.models import SchedulerLease, Task, TaskNotification
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "due-date-sweep"
+
+
+class NotificationSink(ABC):
+    """Destination for due-date notifications"""
+
+    @abstractmethod
+    async def send(self, notifications: List[dict]) -> None:
+        """
+        Deliver a batch of notifications
+
+        Each notification has kind, task_id, user_id, title and due_date.
+        Raise to have the batch retried on the next tick.
+        """
+
+
+class LogSink(NotificationSink):
+    """Write notifications to the application log"""
+
+    async def send(self, notifications: List[dict]) -> None:
+        for notification in notifications:
+            logger.info(
+                "Task %s for user %s is %s (due %s): %s",
+                notification["task_id"], notification["user_id"],
+                notification["kind"].replace("_", " "), notification["due_date"], notification["title"],
+            )
+
+
+class WebhookSink(NotificationSink):
+    """POST each batch as JSON ({"notifications": [...]}) to a URL"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        if not url:
+            raise ValueError("The webhook notification sink needs NOTIFICATION_WEBHOOK_URL")
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes) -> None:
+        request = urllib.request.Request(
+            self.url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, notifications: List[dict]) -> None:
+        body = json.dumps({"notifications": notifications}).encode()
+        await asyncio.to_thread(self._post, body)
+
+
+# Sink name (NOTIFICATION_SINKS setting) -> factory
+NOTIFICATION_SINKS = {
+    "log": lambda: LogSink(),
+    "webhook": lambda: WebhookSink(settings.notification_webhook_url),
+}
+
+
+def create_sinks(names: List[str]) -> List[NotificationSink]:
+    """Instantiate the configured notification sinks"""
+    unknown = [name for name in names if name not in NOTIFICATION_SINKS]
+    if unknown:
+        raise ValueError(
+            f"Unknown notification sink(s) {', '.join(unknown)}. Available: {', '.join(NOTIFICATION_SINKS)}"
+        )
+    return [NOTIFICATION_SINKS[name]() for name in names]
+
+
+def acquire_lease(session: Session, name: str, holder: str, ttl: timedelta, now: Optional[datetime] = None) -> bool:
+    """
+    Take or renew the named lease for holder
+
+    Succeeds if the lease is free, expired or already held by holder. The
+    conditional UPDATE / INSERT keeps this safe between processes.
+    """
+    now = now or datetime.utcnow()
+    result = session.exec(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name)
+        .where((SchedulerLease.holder == holder) | (SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=now + ttl)
+    )
+    if result.rowcount:
+        session.commit()
+        return True
+    session.rollback()
+    if session.get(SchedulerLease, name) is not None:
+        return False
+    try:
+        session.add(SchedulerLease(name=name, holder=holder, expires_at=now + ttl))
+        session.commit()
+        return True
+    except IntegrityError:
+        session.rollback()
+        return False
+
+
+def find_due_tasks(session: Session, kind: str, start: datetime, end: datetime, limit: int) -> List[Task]:
+    """
+    Pending tasks due in (start, end] not yet notified for this kind and due date
+
+    Uses ix_tasks_status_due_date for the range and the unique notification
+    index for the NOT EXISTS check.
+    """
+    already_sent = exists().where(and_(
+        TaskNotification.task_id == Task.id,
+        TaskNotification.kind == kind,
+        TaskNotification.due_date == Task.due_date,
+    ))
+    statement = (
+        select(Task)
+        .where(Task.status == "pending", Task.due_date > start, Task.due_date <= end)
+        .where(~already_sent)
+        .order_by(Task.due_date, Task.id)
+        .limit(limit)
+    )
+    return list(session.exec(statement).all())
+
+
+class TaskScheduler:
+    """Runs the due-date sweeps on a fixed interval while this worker holds the lease"""
+
+    def __init__(self, sinks: List[NotificationSink], interval: float, batch_size: int,
+                 reminder_lead: timedelta, overdue_lookback: timedelta):
+        self.sinks = sinks
+        self.interval = interval
+        self.batch_size = batch_size
+        self.reminder_lead = reminder_lead
+        self.overdue_lookback = overdue_lookback
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._first_shard = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the scheduler loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop, waiting for a tick in progress to be cancelled"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(self.interval)
+
+    def _collect(self, now: datetime) -> Optional[List[dict]]:
+        """Take the lease and gather one bounded batch per kind (runs in a thread)"""
+        with Session(engine) as session:
+            # A lease outlives a few missed ticks before another worker takes over
+            if not acquire_lease(session, LEASE_NAME, self.holder, timedelta(seconds=self.interval * 3), now):
+                return None
+        windows = {
+            "due_soon": (now, now + self.reminder_lead),
+            "overdue": (now - self.overdue_lookback, now),
+        }
+        shards = task_engines()
+        first = self._first_shard % len(shards)
+        self._first_shard = first + 1
+        shards = shards[first:] + shards[:first]
+        notifications = []
+        for kind, (start, end) in windows.items():
+            per_shard = []
+            for shard in shards:
+                with Session(shard) as session:
+                    per_shard.append(find_due_tasks(session, kind, start, end, self.batch_size))
+            # One task from each shard in turn, oldest due first within a shard
+            tasks = [task for turn in zip_longest(*per_shard) for task in turn if task is not None]
+            for task in tasks[:self.batch_size]:
+                notifications.append({
+                    "kind": kind,
+                    "task_id": task.id,
+                    "user_id": task.user_id,
+                    "title": task.title,
+                    "due_date": task.due_date.isoformat(),
+                })
+        return notifications
+
+    def _record(self, notifications: List[dict]) -> None:
+        """Remember sent notifications on each task's shard (runs in a thread)"""
+        by_shard = {}
+        for notification in notifications:
+            by_shard.setdefault(task_engine(notification["user_id"]), []).append(notification)
+        for shard, shard_notifications in by_shard.items():
+            with Session(shard) as session:
+                for notification in shard_notifications:
+                    session.add(TaskNotification(
+                        task_id=notification["task_id"],
+                        user_id=notification["user_id"],
+                        kind=notification["kind"],
+                        due_date=datetime.fromisoformat(notification["due_date"]),
+                    ))
+                session.commit()
+
+    async def tick(self, now: Optional[datetime] = None) -> int:
+        """Run one sweep if this worker is the leader. Returns the number of notifications sent."""
+        now = now or datetime.utcnow()
+        notifications = await asyncio.to_thread(self._collect, now)
+        if not notifications:
+            return 0
+        for sink in self.sinks:
+            await sink.send(notifications)
+        await asyncio.to_thread(self._record, notifications)
+        return len(notifications)
+
+
+def create_scheduler() -> TaskScheduler:
+    """Build the scheduler from settings"""
+    return TaskScheduler(
+        sinks=create_sinks(settings.notification_sink_names),
+        interval=settings.scheduler_interval_seconds,
+        batch_size=settings.scheduler_batch_size,
+        reminder_lead=timedelta(minutes=settings.reminder_lead_minutes),
+        overdue_lookback=timedelta(hours=settings.overdue_lookback_hours),
+    )
@@ -0,0 +1,120 @@
+"""
+Full-Text Search over Task Title and Description
+
+Uses the database's own full-text engine:
+- SQLite: an FTS5 table (tasks_fts) mirroring tasks, kept in sync by triggers
+- PostgreSQL: a GIN index on a tsvector expression, maintained by Postgres
+
+Either way the index is updated in the same transaction as the task
+insert/update/delete, so the routes don't need to touch it. Other databases
+fall back to an unranked LIKE match.
+"""
+import re
+from typing import List
+from sqlalchemy import text
+from sqlmodel import Session, select
+from src.models import Task
+
+# Text search configuration for PostgreSQL (stemming and stop words)
+POSTGRES_SEARCH_CONFIG = "english"
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description,
+        content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+# The query must use this exact expression for Postgres to pick the index
+_POSTGRES_DOCUMENT = (
+    f"to_tsvector('{POSTGRES_SEARCH_CONFIG}', "
+    "coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+_POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN ({_POSTGRES_DOCUMENT})",
+]
+
+
+def create_search_index(engine):
+    """Create the full-text index for the engine's dialect if it doesn't exist"""
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        if dialect == "sqlite":
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+            ).first()
+            for statement in _SQLITE_DDL:
+                connection.execute(text(statement))
+            if not exists:
+                # Index tasks that were created before search existed
+                connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            for statement in _POSTGRES_DDL:
+                connection.execute(text(statement))
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a user's query into words, dropping search operators and punctuation"""
+    return re.findall(r"\w+", query)
+
+
+def search_tasks(session: Session, user_id: int, query: str, limit: int = 20) -> List[Task]:
+    """
+    Find a user's tasks matching every word of the query, best match first
+
+    The last word also matches as a prefix, so results update while typing.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Quote each term so FTS5 treats it as a plain word, not syntax
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        statement = text(
+            "SELECT tasks.* FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid "
+            "WHERE tasks_fts MATCH :match AND tasks.user_id = :user_id "
+            "ORDER BY bm25(tasks_fts), tasks.id LIMIT :limit"
+        ).bindparams(match=match, user_id=user_id, limit=limit)
+    elif dialect == "postgresql":
+        match = " & ".join(terms) + ":*"
+        statement = text(
+            "SELECT tasks.* FROM tasks, "
+            f"to_tsquery('{POSTGRES_SEARCH_CONFIG}', :match) AS query "
+            f"WHERE tasks.user_id = :user_id AND {_POSTGRES_DOCUMENT} @@ query "
+            f"ORDER BY ts_rank({_POSTGRES_DOCUMENT}, query) DESC, tasks.id LIMIT :limit"
+        ).bindparams(match=match, user_id=user_id, limit=limit)
+    else:
+        statement = select(Task).where(Task.user_id == user_id)
+        for term in terms:
+            pattern = f"%{term}%"
+            statement = statement.where(
+                Task.title.ilike(pattern) | Task.description.ilike(pattern)
+            )
+        return list(session.exec(statement.order_by(Task.id).limit(limit)).all())
+
+    return list(session.scalars(select(Task).from_statement(statement)).all())
@@ -0,0 +1,68 @@
+"""
+Production Server Entry Point
+
+Runs the API under uvicorn with settings tuned for production:
+multiple worker processes, uvloop/httptools when available, and
+keep-alive, backlog and graceful shutdown taken from Settings.
+
+Usage:
+    python -m src.server
+
+For development with auto-reload use `python -m src.api` instead.
+"""
+import importlib.util
+import os
+import uvicorn
+from src.config import settings
+
+
+def available_cpus() -> int:
+    """Number of CPU cores this process may run on (respects CPU affinity)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def resolve_workers(configured: int) -> int:
+    """Worker count from settings, or one per available core when 0"""
+    return configured if configured > 0 else available_cpus()
+
+
+def resolve_loop(configured: str) -> str:
+    """Event loop implementation, preferring uvloop when set to auto"""
+    if configured == "auto":
+        return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    return configured
+
+
+def resolve_http(configured: str) -> str:
+    """HTTP parser implementation, preferring httptools when set to auto"""
+    if configured == "auto":
+        return "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return configured
+
+
+def main():
+    workers = resolve_workers(settings.workers)
+    loop = resolve_loop(settings.server_loop)
+    http = resolve_http(settings.server_http)
+    print(f"Starting {workers} worker(s) on {settings.host}:{settings.port} (loop={loop}, http={http})")
+
+    uvicorn.run(
+        "src.api:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keep_alive_timeout,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+        limit_max_requests=settings.max_requests_per_worker or None,
+        access_log=settings.access_log,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
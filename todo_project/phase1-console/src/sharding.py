@@ -0,0 +1,178 @@
+"""
+User-Based Sharding of Task Data
+
+With DATABASE_SHARD_URLS set, each user's tasks (and their archive, deletion and
+notification records) live in one shard database chosen by consistent
+hashing of the user id. The users table stays in the primary database
+(DATABASE_URL), which acts as the directory for login and registration;
+each shard keeps a copy of the user rows it serves so authentication and
+foreign keys work there too.
+
+Shards are identified by their position in DATABASE_SHARD_URLS, so new shards
+must be appended. Adding one moves only about 1/N of the users, after which
+`python -m src.manage rebalance-shards` moves their data.
+"""
+import bisect
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import func, text
+from sqlmodel import Session, delete, select
+from src.models import ArchivedTask, Task, TaskDeletion, TaskNotification, User
+
+
+def _hash(key: str) -> int:
+    """Stable 64-bit hash (Python's hash() differs between processes)"""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class ShardRouter:
+    """
+    Consistent hash ring mapping user ids to shard numbers
+
+    Each shard owns `virtual_nodes` points on the ring, which evens out the
+    share of users per shard.
+    """
+
+    def __init__(self, shard_count: int, virtual_nodes: int = 64):
+        if shard_count < 1:
+            raise ValueError("ShardRouter needs at least one shard")
+        self.shard_count = shard_count
+        ring = sorted(
+            (_hash(f"shard-{shard}#{node}"), shard)
+            for shard in range(shard_count)
+            for node in range(virtual_nodes)
+        )
+        self._points = [point for point, _ in ring]
+        self._shards = [shard for _, shard in ring]
+
+    def shard_for(self, user_id: int) -> int:
+        """Shard number holding user_id's tasks"""
+        position = bisect.bisect(self._points, _hash(f"user-{user_id}")) % len(self._points)
+        return self._shards[position]
+
+
+def copy_user(user: User, session: Session) -> None:
+    """Add a copy of user to a shard's session unless it is already there"""
+    if session.get(User, user.id) is None:
+        session.add(User(**user.model_dump()))
+
+
+def _sync_sequence(session: Session, table: str) -> None:
+    """Move a PostgreSQL id sequence past rows inserted with explicit ids"""
+    if session.get_bind().dialect.name == "postgresql":
+        session.exec(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def move_user(user_id: int, source, target, keep_user_row: bool = False) -> Tuple[int, int]:
+    """
+    Move a user's tasks, archived tasks, tombstones and notification records between shards
+
+    Task ids are kept unless the id is already used on the target. Then the
+    task gets a new id, a tombstone for the old id and a fresh updated_at,
+    so delta sync clients replace it. The user row copy is removed from the
+    source unless keep_user_row is set (e.g. when the source also holds the
+    users directory).
+
+    The copy is committed on the target before the source is cleaned up, so
+    an interruption leaves the data on both shards rather than losing it.
+    Returns (tasks moved, tasks renumbered).
+    """
+    now = datetime.utcnow()
+    with Session(source) as source_session, Session(target) as target_session:
+        user = source_session.get(User, user_id)
+        if user is not None:
+            copy_user(user, target_session)
+            target_session.flush()
+
+        tasks = source_session.exec(select(Task).where(Task.user_id == user_id)).all()
+        task_ids = [task.id for task in tasks]
+        existing = {
+            task.id: task for task in target_session.exec(select(Task).where(Task.id.in_(task_ids))).all()
+        } if task_ids else {}
+
+        id_map: Dict[int, int] = {}
+        renumbered = 0
+        # Tasks keeping their ids go first, so a new id can't take one of theirs
+        for task in sorted(tasks, key=lambda task: task.id in existing and existing[task.id].user_id != user_id):
+            data = task.model_dump()
+            current = existing.get(task.id)
+            if current is not None and current.user_id == user_id:
+                # Already copied by an interrupted earlier move
+                id_map[task.id] = task.id
+                continue
+            if current is not None:
+                data.pop("id")
+                data["updated_at"] = now
+                renumbered += 1
+            moved = Task(**data)
+            target_session.add(moved)
+            target_session.flush()
+            id_map[task.id] = moved.id
+            if moved.id != task.id:
+                target_session.add(TaskDeletion(task_id=task.id, user_id=user_id, deleted_at=now))
+
+        # Archived tasks are read-only, so a clashing id just gets a new one
+        archived = source_session.exec(select(ArchivedTask).where(ArchivedTask.user_id == user_id)).all()
+        if archived:
+            archived_ids = [task.id for task in archived]
+            hot_ids = set(target_session.exec(select(Task.id).where(Task.id.in_(archived_ids))).all())
+            existing_archive = {
+                task.id: task
+                for task in target_session.exec(select(ArchivedTask).where(ArchivedTask.id.in_(archived_ids))).all()
+            }
+            next_id = None
+            for task in archived:
+                current = existing_archive.get(task.id)
+                if current is not None and current.user_id == user_id:
+                    continue
+                data = task.model_dump()
+                if current is not None or task.id in hot_ids:
+                    if next_id is None:
+                        next_id = 1 + max(target_session.exec(select(func.max(Task.id))).one() or 0,
+                                          target_session.exec(select(func.max(ArchivedTask.id))).one() or 0)
+                    data["id"] = next_id
+                    next_id += 1
+                    renumbered += 1
+                target_session.add(ArchivedTask(**data))
+
+        for deletion in source_session.exec(select(TaskDeletion).where(TaskDeletion.user_id == user_id)).all():
+            target_session.add(TaskDeletion(task_id=deletion.task_id, user_id=user_id, deleted_at=deletion.deleted_at))
+        for notification in source_session.exec(
+            select(TaskNotification).where(TaskNotification.user_id == user_id)
+        ).all():
+            if notification.task_id in id_map:
+                data = notification.model_dump(exclude={"id"})
+                data["task_id"] = id_map[notification.task_id]
+                target_session.add(TaskNotification(**data))
+
+        _sync_sequence(target_session, "tasks")
+        target_session.commit()
+
+        source_session.exec(delete(TaskNotification).where(TaskNotification.user_id == user_id))
+        source_session.exec(delete(TaskDeletion).where(TaskDeletion.user_id == user_id))
+        source_session.exec(delete(Task).where(Task.user_id == user_id))
+        source_session.exec(delete(ArchivedTask).where(ArchivedTask.user_id == user_id))
+        if user is not None and not keep_user_row:
+            source_session.delete(user)
+        source_session.commit()
+
+    return len(tasks), renumbered
+
+
+def shard_user_ids(session: Session, include_user_rows: bool = True) -> List[int]:
+    """
+    Ids of users with any data in a shard
+
+    include_user_rows also counts bare user row copies; leave it off for the
+    primary database, whose users table is the directory of every user.
+    """
+    user_ids = set(session.exec(select(Task.user_id).distinct()).all())
+    user_ids.update(session.exec(select(TaskDeletion.user_id).distinct()).all())
+    user_ids.update(session.exec(select(ArchivedTask.user_id).distinct()).all())
+    if include_user_rows:
+        user_ids.update(session.exec(select(User.id)).all())
+    return sorted(user_ids)
@@ -1,7 +1,371 @@
-# Phase 1: Console Application - Storage Handling (Placeholder)
+# Phase 1: Console Application - Storage Handling
+
+# Task persistence for the console app. Tasks are stored either as the
+# original pretty-printed JSON list or as a compact binary snapshot; the
+# format is picked from the file extension unless given explicitly.
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+JSON_FORMAT = 'json'
+BINARY_FORMAT = 'binary'
+STORAGE_FORMATS = (JSON_FORMAT, BINARY_FORMAT)
+
+# Files ending in one of these extensions are read and written as snapshots
+SNAPSHOT_EXTENSIONS = ('.snap', '.bin')
+
+# Archived tasks live beside the store in <name>-archive/, one file per month
+# of completion (tasks-archive/2024-05.json) in the store's own format, plus
+# an index.json recording each month's size and the highest id ever issued.
+ARCHIVE_INDEX = 'index.json'
+
+# Snapshot layout (all integers big-endian):
+#   header   magic(8s) version(H) flags(H) string_count(I) string_bytes(I)
+#            tag_ref_count(I) record_count(I)
+#   strings  string_count x character length(I), then one utf-8 blob
+#   tags     tag_ref_count x string index(I)
+#   records  record_count x fixed-width record (see _RECORD)
+# Every text value (descriptions, dates, statuses, tags) lives once in the
+# string table and records refer to it by index, so loading a snapshot is a
+# single utf-8 decode plus one struct.iter_unpack pass over the records. Keys
+# the fixed layout cannot represent are kept in a per-record JSON blob.
+SNAPSHOT_MAGIC = b'TODOSNAP'
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct('>8sHHIIII')
+# mask, id, status, priority, description, due_date, created_at, tag_start, tag_count, extras
+_RECORD = struct.Struct('>BqIIIIIIHI')
+_NO_STRING = 0xFFFFFFFF
+
+_HAS_ID = 0x01
+_HAS_DESCRIPTION = 0x02
+_HAS_STATUS = 0x04
+_HAS_PRIORITY = 0x08
+_HAS_TAGS = 0x10
+_HAS_DUE_DATE = 0x20
+_HAS_CREATED_AT = 0x40
+
+_FIELD_ORDER = ('id', 'description', 'status', 'priority', 'tags', 'due_date', 'created_at')
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class SnapshotError(ValueError):
+    """Raised when a binary snapshot is truncated, corrupt or of an unknown version."""
+
+
+def detect_format(path: str) -> str:
+    """Return the storage format implied by a file's extension."""
+    if path.lower().endswith(SNAPSHOT_EXTENSIONS):
+        return BINARY_FORMAT
+    return JSON_FORMAT
+
+
+def encode_snapshot(tasks: List[Dict[str, Any]]) -> bytes:
+    """Encode a list of task dicts into the binary snapshot format."""
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = string_ids.get(value)
+        if index is None:
+            index = string_ids[value] = len(strings)
+            strings.append(value)
+        return index
+
+    tag_refs: List[int] = []
+    records = []
+    for task in tasks:
+        mask = 0
+        task_id = 0
+        refs = {'status': 0, 'priority': 0, 'description': 0, 'due_date': _NO_STRING, 'created_at': 0}
+        tag_start = tag_count = 0
+        extras = {key: value for key, value in task.items() if key not in _FIELD_ORDER}
+
+        value = task.get('id')
+        if type(value) is int and _INT64_MIN <= value <= _INT64_MAX:
+            mask |= _HAS_ID
+            task_id = value
+        elif 'id' in task:
+            extras['id'] = value
+
+        for key, flag in (('description', _HAS_DESCRIPTION), ('status', _HAS_STATUS),
+                          ('priority', _HAS_PRIORITY), ('created_at', _HAS_CREATED_AT)):
+            value = task.get(key)
+            if isinstance(value, str):
+                mask |= flag
+                refs[key] = intern(value)
+            elif key in task:
+                extras[key] = value
+
+        # A due_date of None is common, so it is stored as a present key with no string
+        value = task.get('due_date')
+        if isinstance(value, str) or ('due_date' in task and value is None):
+            mask |= _HAS_DUE_DATE
+            if value is not None:
+                refs['due_date'] = intern(value)
+        elif 'due_date' in task:
+            extras['due_date'] = value
+
+        value = task.get('tags')
+        if isinstance(value, list) and len(value) <= 0xFFFF and all(isinstance(tag, str) for tag in value):
+            mask |= _HAS_TAGS
+            tag_start, tag_count = len(tag_refs), len(value)
+            tag_refs.extend(intern(tag) for tag in value)
+        elif 'tags' in task:
+            extras['tags'] = value
+
+        extras_ref = intern(json.dumps(extras)) if extras else _NO_STRING
+        records.append(_RECORD.pack(mask, task_id, refs['status'], refs['priority'], refs['description'],
+                                    refs['due_date'], refs['created_at'], tag_start, tag_count, extras_ref))
+
+    blob = ''.join(strings).encode('utf-8')
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(strings), len(blob),
+                          len(tag_refs), len(records))
+    return b''.join([
+        header,
+        struct.pack(f'>{len(strings)}I', *(len(s) for s in strings)),
+        blob,
+        struct.pack(f'>{len(tag_refs)}I', *tag_refs),
+        b''.join(records),
+    ])
+
+
+def decode_snapshot(data: bytes) -> List[Dict[str, Any]]:
+    """Decode bytes produced by encode_snapshot back into task dicts."""
+    view = memoryview(data)
+    try:
+        magic, version, _flags, string_count, string_bytes, tag_ref_count, record_count = \
+            _HEADER.unpack_from(view, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Not a task snapshot (bad magic bytes)")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}")
+
+        offset = _HEADER.size
+        lengths = struct.unpack_from(f'>{string_count}I', view, offset)
+        offset += 4 * string_count
+        blob = str(view[offset:offset + string_bytes], 'utf-8')
+        offset += string_bytes
+        strings = []
+        position = 0
+        for length in lengths:
+            strings.append(blob[position:position + length])
+            position += length
+        if position != len(blob):
+            raise SnapshotError("Snapshot string table length mismatch")
+
+        tag_refs = struct.unpack_from(f'>{tag_ref_count}I', view, offset)
+        offset += 4 * tag_ref_count
+        if len(view) - offset != record_count * _RECORD.size:
+            raise SnapshotError("Snapshot is truncated or has trailing data")
+
+        tasks = []
+        for (mask, task_id, status, priority, description, due_date, created_at,
+             tag_start, tag_count, extras_ref) in _RECORD.iter_unpack(view[offset:]):
+            task = {}
+            if mask & _HAS_ID:
+                task['id'] = task_id
+            if mask & _HAS_DESCRIPTION:
+                task['description'] = strings[description]
+            if mask & _HAS_STATUS:
+                task['status'] = strings[status]
+            if mask & _HAS_PRIORITY:
+                task['priority'] = strings[priority]
+            if mask & _HAS_TAGS:
+                task['tags'] = [strings[ref] for ref in tag_refs[tag_start:tag_start + tag_count]]
+            if mask & _HAS_DUE_DATE:
+                task['due_date'] = None if due_date == _NO_STRING else strings[due_date]
+            if mask & _HAS_CREATED_AT:
+                task['created_at'] = strings[created_at]
+            if extras_ref != _NO_STRING:
+                extras = json.loads(strings[extras_ref])
+                ordered = {key: extras.pop(key) if key in extras else task[key]
+                           for key in _FIELD_ORDER if key in extras or key in task}
+                ordered.update(extras)
+                task = ordered
+            tasks.append(task)
+    except (struct.error, IndexError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise SnapshotError(f"Corrupt task snapshot: {e}") from e
+    return tasks
+
+
+def read_tasks(path: str, storage_format: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read the raw task list from a JSON file or binary snapshot."""
+    storage_format = storage_format or detect_format(path)
+    if storage_format == BINARY_FORMAT:
+        with open(path, 'rb') as f:
+            return decode_snapshot(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_tasks(path: str, tasks: List[Dict[str, Any]], storage_format: Optional[str] = None):
+    """Atomically write the task list as a JSON file or binary snapshot.
+
+    The data goes to a temporary file in the same directory which is then
+    renamed over path, so readers only ever see a complete old or new file.
+    """
+    storage_format = storage_format or detect_format(path)
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory)
+    try:
+        if storage_format == BINARY_FORMAT:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encode_snapshot(tasks))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tasks, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def archive_dir(path: str) -> str:
+    """Directory holding the monthly archive partitions for a store."""
+    return os.path.splitext(path)[0] + '-archive'
+
+
+def archive_partition(path: str, month: str) -> str:
+    """Archive file for a YYYY-MM month, using the store's extension."""
+    extension = os.path.splitext(path)[1] or '.json'
+    return os.path.join(archive_dir(path), month + extension)
+
+
+def read_archive_index(path: str) -> Dict[str, Any]:
+    """Return {'next_id': int, 'months': {month: task count}} for a store's archive."""
+    try:
+        with open(os.path.join(archive_dir(path), ARCHIVE_INDEX), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'next_id': 1, 'months': {}}
+
+
+def archive_tasks(path: str, tasks_by_month: Dict[str, List[Dict[str, Any]]], next_id: int,
+                  storage_format: Optional[str] = None):
+    """Append tasks to their monthly archive partitions and update the index.
+
+    Partitions are merged by task id, so archiving the same task twice (say,
+    after a crash before the store itself was saved) leaves one copy.
+    """
+    os.makedirs(archive_dir(path), exist_ok=True)
+    index = read_archive_index(path)
+    for month, tasks in sorted(tasks_by_month.items()):
+        partition = archive_partition(path, month)
+        try:
+            merged = {task['id']: task for task in read_tasks(partition, storage_format)}
+        except FileNotFoundError:
+            merged = {}
+        merged.update((task['id'], task) for task in tasks)
+        write_tasks(partition, sorted(merged.values(), key=lambda task: task['id']), storage_format)
+        index['months'][month] = len(merged)
+    index['next_id'] = max(index['next_id'], next_id)
+    # The index is plain JSON whatever the store's format
+    write_tasks(os.path.join(archive_dir(path), ARCHIVE_INDEX), index, JSON_FORMAT)
+
+
+def read_archive(path: str, months: Optional[Iterable[str]] = None,
+                 storage_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield archived tasks, oldest month first, reading only the given months (default all)."""
+    available = read_archive_index(path)['months']
+    wanted = available if months is None else set(months) & available.keys()
+    for month in sorted(wanted):
+        try:
+            yield from read_tasks(archive_partition(path, month), storage_format)
+        except FileNotFoundError:
+            continue
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """Cheap fingerprint of a storage file, or None if it does not exist.
+
+    Atomic saves replace the file, so the inode changes on every write even
+    when the mtime and size happen to match.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class FileLock:
+    """Advisory inter-process lock on '<path>.lock'.
+
+    Re-entrant within one process: nested acquires only take the OS lock once.
+    If the lock file cannot be created (e.g. a read-only directory) the lock is
+    skipped and callers proceed unlocked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path + '.lock'
+        self._file = None
+        self._depth = 0
+
+    def acquire(self):
+        if self._depth == 0:
+            try:
+                lock_file = open(self.path, 'a+b')
+            except OSError:
+                lock_file = None
+            if lock_file is not None:
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                except BaseException:
+                    lock_file.close()
+                    raise
+            self._file = lock_file
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def convert_storage(source: str, destination: str,
+                    source_format: Optional[str] = None, destination_format: Optional[str] = None) -> int:
+    """Convert a task store between JSON and snapshot formats. Returns the number of tasks copied."""
+    tasks = read_tasks(source, source_format)
+    write_tasks(destination, tasks, destination_format)
+    return len(tasks)
 
-# This module is intended for future storage implementations (e.g., database, cloud storage).
-# Currently, task persistence is handled directly in tasks.py using JSON.
 
 def save_to_database(tasks):
     print("Saving tasks to database (not implemented yet).")
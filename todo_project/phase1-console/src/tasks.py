@@ -1,41 +1,430 @@
 # Phase 1: Console Application - Task Management Logic
 
+import copy
 import json
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any, TextIO, Tuple
+from src import recurrence, storage
+
+PRIORITY_ORDER = {'high': 3, 'medium': 2, 'low': 1}
+PRIORITY_ICONS = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}
+RULE = "=" * 80
+
+# Longest look-ahead for get_upcoming_tasks; repeating tasks are expanded over it
+MAX_UPCOMING_HOURS = 24 * 366
+
+
+def _parse_due_date(value: Any) -> Optional[datetime]:
+    """Parse an ISO due date, returning None if it is missing or invalid.
+
+    Timezone-aware values are normalised to naive UTC so they compare with plain
+    dates. Parsed values are cached, so each distinct date string is parsed once.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    return _parse_iso(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@lru_cache(maxsize=4096)
+def _format_due_date(value: str) -> str:
+    try:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%d')
+    except ValueError:
+        return value
+
+
+def format_task(task: Dict[str, Any]) -> str:
+    """Render one task as a single list line (without trailing newline)."""
+    status_icon = "✓" if task.get('status') == 'completed' else "○"
+    priority_icon = PRIORITY_ICONS.get(task.get('priority', 'medium'), "🟡")
+    tags = task.get('tags')
+    tags_str = f" [{', '.join(tags)}]" if tags else ""
+    due_date = task.get('due_date')
+    if not due_date:
+        due_date_str = ""
+    elif isinstance(due_date, str):
+        due_date_str = f" | Due: {_format_due_date(due_date)}"
+    else:
+        due_date_str = f" | Due: {due_date}"
+    repeat_str = f" | Repeats: {task['recurrence']}" if task.get('recurrence') else ""
+    return f"  {status_icon} {priority_icon} ID: {task['id']:3d} | {task['description']}{tags_str}{due_date_str}{repeat_str}"
+
+
+def _due_deadline(task: Dict[str, Any]) -> Optional[datetime]:
+    """Moment a pending task becomes overdue, or None if it has no deadline.
+
+    A date-only due date (YYYY-MM-DD) is due by the end of that day.
+    """
+    if task.get('status') == 'completed':
+        return None
+    due = _parse_due_date(task.get('due_date'))
+    if due is not None and len(task['due_date']) == 10:
+        due += timedelta(days=1, microseconds=-1)
+    return due
+
+
+@lru_cache(maxsize=1024)
+def _parse_recurrence(rule: str) -> Optional[recurrence.Recurrence]:
+    try:
+        return recurrence.parse_rule(rule)
+    except ValueError:
+        return None
+
+
+def _recurring_deadline(task: Dict[str, Any]) -> Optional[datetime]:
+    """Deadline of a pending repeating task's stored (next) occurrence, else None."""
+    if not task.get('recurrence') or _parse_recurrence(task['recurrence']) is None:
+        return None
+    return _due_deadline(task)
+
+
+def _occurrence(task: Dict[str, Any], deadline: datetime) -> Dict[str, Any]:
+    """Copy of a repeating task as the occurrence with the given deadline."""
+    occurrence = task.copy()
+    if len(task['due_date']) == 10:
+        occurrence['due_date'] = deadline.date().isoformat()
+    else:
+        occurrence['due_date'] = deadline.isoformat()
+    return occurrence
+
+
+SORT_KEYS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'id': lambda task: task.get('id', 0),
+    'description': lambda task: task.get('description', '').lower(),
+    'priority': lambda task: PRIORITY_ORDER.get(task.get('priority', 'medium'), 2),
+    'due_date': lambda task: _parse_due_date(task.get('due_date')) or datetime.max,
+    'status': lambda task: task.get('status', 'pending'),
+}
+
+# Indexes the manager can maintain: the sort orders plus pending tasks (and
+# pending repeating tasks) by deadline
+INDEX_KEYS = dict(SORT_KEYS, deadline=_due_deadline, recurring=_recurring_deadline)
+
+
+class SortedIndex:
+    """Task ids kept ordered by a key, maintained with bisect inserts and removes.
+
+    Entries are (key, task_id) pairs so equal keys stay ordered by id. A key
+    function returning None leaves the task out of the index.
+    """
+
+    def __init__(self, key_func: Callable[[Dict[str, Any]], Any]):
+        self.key_func = key_func
+        self._entries: List[Tuple[Any, int]] = []
+        self._keys: Dict[int, Any] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, tasks: List[Dict[str, Any]]):
+        """Index every task from scratch."""
+        self._keys = {}
+        for task in tasks:
+            key = self.key_func(task)
+            if key is not None:
+                self._keys[task['id']] = key
+        self._entries = sorted((key, task_id) for task_id, key in self._keys.items())
+
+    def add(self, task: Dict[str, Any]):
+        """Insert a task, or move it if its key changed."""
+        self.discard(task['id'])
+        key = self.key_func(task)
+        if key is not None:
+            self._keys[task['id']] = key
+            insort(self._entries, (key, task['id']))
+
+    def discard(self, task_id: int):
+        """Remove a task from the index if present."""
+        if task_id not in self._keys:
+            return
+        key = self._keys.pop(task_id)
+        del self._entries[bisect_left(self._entries, (key, task_id))]
+
+    def ids(self, reverse: bool = False) -> Iterator[int]:
+        """Yield task ids in key order. Ties stay in ascending id order when reversed."""
+        entries = self._entries
+        if not reverse:
+            for _, task_id in entries:
+                yield task_id
+            return
+        end = len(entries)
+        while end > 0:
+            start = bisect_left(entries, (entries[end - 1][0],), 0, end)
+            for _, task_id in entries[start:end]:
+                yield task_id
+            end = start
+
+    def ids_between(self, low: Any = None, high: Any = None) -> Iterator[int]:
+        """Yield ids with low <= key < high in key order, in O(log n + k)."""
+        entries = self._entries
+        start = bisect_left(entries, (low,)) if low is not None else 0
+        end = bisect_left(entries, (high,)) if high is not None else len(entries)
+        for _, task_id in entries[start:end]:
+            yield task_id
+
+
+def _mutation(method):
+    """Run a TaskManager method that changes tasks under the manager's locks.
+
+    The storage file lock is held from the change until it is saved, and any
+    changes made by other processes are loaded first.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock, self._file_lock:
+            self.refresh()
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class TaskManager:
-    def __init__(self, storage_file='tasks.json'):
+    def __init__(self, storage_file='tasks.json', storage_format: Optional[str] = None,
+                 autosave_interval: Optional[float] = None):
+        """Create a manager for storage_file.
+
+        storage_format is 'json' or 'binary'; when omitted it is inferred from the
+        file extension (.snap/.bin are binary snapshots, anything else is JSON).
+
+        By default every change is saved immediately. With autosave_interval set,
+        changes are written at most once per that many seconds (call flush() or
+        close() to write pending changes straight away). Other processes may
+        save in the meantime; their changes are merged in when this manager
+        saves (see _merge_stored_changes).
+        """
+        if storage_format is not None and storage_format not in storage.STORAGE_FORMATS:
+            raise ValueError(f"Unknown storage format '{storage_format}'. Use 'json' or 'binary'.")
         self.storage_file = storage_file
+        self.storage_format = storage_format or storage.detect_format(storage_file)
+        self.autosave_interval = autosave_interval
+        self._lock = threading.RLock()
+        self._file_lock = storage.FileLock(storage_file)
+        self._signature = None
+        self._batch_depth = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self._autosave_timer: Optional[threading.Timer] = None
+        self._saved_tasks: Optional[Dict[int, Dict[str, Any]]] = None
         self.tasks = self.load_tasks()
         self.next_id = self.get_next_id()
+        self._remember_saved()
+
+    @property
+    def tasks(self) -> List[Dict[str, Any]]:
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, value: List[Dict[str, Any]]):
+        """Replace the task list and reset the id lookup and indexes."""
+        self._tasks = value
+        self._tasks_by_id = {task['id']: task for task in value}
+        self._indexes: Dict[str, SortedIndex] = {}
+
+    def _index_task(self, task: Dict[str, Any]):
+        """Bring the indexes up to date after a task was added or changed."""
+        for index in self._indexes.values():
+            index.add(task)
+
+    def _unindex_task(self, task_id: int):
+        for index in self._indexes.values():
+            index.discard(task_id)
+
+    def _remove_from_list(self, task: Dict[str, Any]):
+        """Drop a task from the task list.
+
+        New tasks are appended with increasing ids, so the list is normally in
+        id order and the task is found by bisection; otherwise fall back to an
+        identity scan (never dict equality, which compares every field).
+        """
+        position = bisect_left(self.tasks, task['id'], key=lambda t: t['id'])
+        if position < len(self.tasks) and self.tasks[position] is task:
+            del self.tasks[position]
+            return
+        for position, candidate in enumerate(self.tasks):
+            if candidate is task:
+                del self.tasks[position]
+                return
+
+    def _index(self, name: str) -> SortedIndex:
+        """Return the index called name (see INDEX_KEYS), building it on first use."""
+        index = self._indexes.get(name)
+        if index is None:
+            index = SortedIndex(INDEX_KEYS[name])
+            index.rebuild(self.tasks)
+            self._indexes[name] = index
+        return index
 
     def load_tasks(self):
-        """Load tasks from JSON file and ensure all tasks have required fields."""
+        """Load tasks from the storage file and ensure all tasks have required fields."""
+        self._signature = storage.file_signature(self.storage_file)
         try:
-            with open(self.storage_file, 'r') as f:
-                loaded_tasks = json.load(f)
-                # Ensure backward compatibility - add default fields to existing tasks
-                for task in loaded_tasks:
-                    self._ensure_task_fields(task)
-                return loaded_tasks
+            loaded_tasks = storage.read_tasks(self.storage_file, self.storage_format)
+            # Ensure backward compatibility - add default fields to existing tasks
+            for task in loaded_tasks:
+                self._ensure_task_fields(task)
+            return loaded_tasks
         except FileNotFoundError:
             return []
         except json.JSONDecodeError:
             print(f"Warning: Could not decode JSON from {self.storage_file}. Starting with an empty task list.")
             return []
+        except storage.SnapshotError as e:
+            print(f"Warning: Could not read snapshot {self.storage_file} ({e}). Starting with an empty task list.")
+            return []
 
     def save_tasks(self):
-        try:
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.tasks, f, indent=4)
-        except IOError as e:
-            print(f"Error: Could not save tasks to {self.storage_file}: {e}")
+        with self._lock, self._file_lock:
+            self._cancel_autosave()
+            if self._saved_tasks is not None and storage.file_signature(self.storage_file) != self._signature:
+                self._merge_stored_changes()
+            try:
+                storage.write_tasks(self.storage_file, self.tasks, self.storage_format)
+                self._signature = storage.file_signature(self.storage_file)
+                self._dirty = False
+                self._last_save = time.monotonic()
+                self._remember_saved()
+            except IOError as e:
+                print(f"Error: Could not save tasks to {self.storage_file}: {e}")
+
+    def _remember_saved(self):
+        """With autosave, keep a copy of the stored tasks to tell this manager's changes apart."""
+        if self.autosave_interval:
+            self._saved_tasks = copy.deepcopy(self._tasks_by_id)
+
+    def _merge_stored_changes(self):
+        """Apply this manager's unsaved changes on top of what another process saved.
+
+        Changes waiting for autosave were made without the file lock held to
+        the save, so the file may have changed since. Tasks this manager added,
+        changed or deleted win; everything else comes from the file. A task
+        added here under an id another process also used gets a new id.
+        """
+        saved = self._saved_tasks
+        local = self._tasks_by_id
+        stored = {task['id']: task for task in self.load_tasks()}
+        next_id = max(self.next_id, max(stored, default=0) + 1)
+        for task_id in saved.keys() - local.keys():
+            stored.pop(task_id, None)
+        for task in self._tasks:
+            if saved.get(task['id']) == task:
+                continue
+            if task['id'] not in saved and task['id'] in stored:
+                task['id'] = next_id
+                next_id += 1
+            stored[task['id']] = task
+        self.tasks = sorted(stored.values(), key=lambda task: task['id'])
+        self.next_id = next_id
+
+    def refresh(self) -> bool:
+        """Reload tasks if another process changed the storage file.
+
+        Checking costs one stat() call. Only tasks that actually differ are
+        re-indexed. Unsaved local changes (inside a batch or waiting for
+        autosave) take precedence, so no reload happens while there are any.
+        Returns True if tasks were reloaded.
+        """
+        with self._lock:
+            if self._dirty or self._batch_depth:
+                return False
+            if storage.file_signature(self.storage_file) == self._signature:
+                return False
+            loaded_tasks = self.load_tasks()
+            old_tasks = self._tasks_by_id
+            self._tasks = loaded_tasks
+            self._tasks_by_id = {task['id']: task for task in loaded_tasks}
+            for task_id in old_tasks.keys() - self._tasks_by_id.keys():
+                self._unindex_task(task_id)
+            for task in loaded_tasks:
+                if old_tasks.get(task['id']) != task:
+                    self._index_task(task)
+            self.next_id = max(self.next_id, self.get_next_id())
+            self._remember_saved()
+            return True
+
+    def _persist(self):
+        """Record a change, saving now unless a batch or autosave interval defers it."""
+        self._dirty = True
+        if self._batch_depth:
+            return
+        if self.autosave_interval:
+            delay = self._last_save + self.autosave_interval - time.monotonic()
+            if delay > 0:
+                if self._autosave_timer is None:
+                    self._autosave_timer = threading.Timer(delay, self.flush)
+                    self._autosave_timer.daemon = True
+                    self._autosave_timer.start()
+                return
+        self.save_tasks()
+
+    def _cancel_autosave(self):
+        if self._autosave_timer is not None:
+            self._autosave_timer.cancel()
+            self._autosave_timer = None
+
+    def flush(self):
+        """Write pending changes to storage, if there are any."""
+        with self._lock:
+            if self._dirty and not self._batch_depth:
+                self.save_tasks()
+
+    def close(self):
+        """Flush pending changes and stop the autosave timer."""
+        self.flush()
+        with self._lock:
+            self._cancel_autosave()
+
+    @contextmanager
+    def batch(self):
+        """Group many changes into a single save.
+
+        Changes made inside the block are written once when the outermost batch
+        exits. If the block raises, every in-memory change made inside it is
+        rolled back and nothing is written. Batches may be nested; an inner
+        batch that raises only rolls back its own changes. The storage file
+        lock is held for the whole batch.
+
+            with task_manager.batch():
+                for task_id in ids:
+                    task_manager.add_tags_to_task(task_id, ['archived'])
+        """
+        with self._lock, self._file_lock:
+            self.refresh()
+            saved_state = (copy.deepcopy(self.tasks), self.next_id, self._dirty)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                tasks, self.next_id, self._dirty = saved_state
+                self.tasks = tasks
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self.save_tasks()
 
     def get_next_id(self):
+        """Next unused id, counting archived tasks so their ids are never reissued."""
+        archived_next_id = storage.read_archive_index(self.storage_file)['next_id']
         if not self.tasks:
-            return 1
-        return max(task['id'] for task in self.tasks) + 1
+            return archived_next_id
+        return max(max(task['id'] for task in self.tasks) + 1, archived_next_id)
 
     def _ensure_task_fields(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Ensure task has all required fields with defaults for backward compatibility."""
@@ -48,11 +437,22 @@ class TaskManager:
         task.update(defaults)
         return task
 
-    def add_task(self, description: str, priority: str = 'medium', tags: List[str] = None, due_date: Optional[str] = None):
-        """Add a new task with optional priority, tags, and due date."""
+    @_mutation
+    def add_task(self, description: str, priority: str = 'medium', tags: List[str] = None, due_date: Optional[str] = None,
+                 recurrence: Optional[str] = None):
+        """Add a new task with optional priority, tags, due date and recurrence rule.
+
+        A repeating task (see src/recurrence.py) needs a due date: it is stored
+        once, as its next occurrence. Returns a copy of the new task, or None if
+        the description is empty or the recurrence invalid.
+        """
         if not description:
             print("Error: Task description cannot be empty.")
-            return
+            return None
+        if recurrence:
+            recurrence = self._check_recurrence(recurrence, due_date)
+            if recurrence is None:
+                return None
         if priority not in ['high', 'medium', 'low']:
             print("Error: Priority must be 'high', 'medium', or 'low'. Using 'medium'.")
             priority = 'medium'
@@ -66,91 +466,198 @@ class TaskManager:
             'due_date': due_date,
             'created_at': datetime.now().isoformat()
         }
+        if recurrence:
+            task['recurrence'] = recurrence
         self.tasks.append(task)
+        self._tasks_by_id[task['id']] = task
+        self._index_task(task)
         self.next_id += 1
-        self.save_tasks()
+        self._persist()
+        return task.copy()
+
+    @staticmethod
+    def _check_recurrence(rule: str, due_date: Optional[str]) -> Optional[str]:
+        """Validate a rule for a task due at due_date, returning it normalized (or None after an error)."""
+        due = _parse_due_date(due_date)
+        if due is None:
+            print("Error: A repeating task needs a valid due date.")
+            return None
+        try:
+            return str(recurrence.parse_rule(rule).anchored(due))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
 
     def list_tasks(self, tasks_to_show: Optional[List[Dict[str, Any]]] = None):
         """List tasks with enhanced formatting showing priority, tags, and due date."""
+        self.refresh()
         tasks = tasks_to_show if tasks_to_show is not None else self.tasks
         if not tasks:
             print("No tasks found.")
             return
-        
-        print("\n" + "="*80)
-        print("Current Tasks:")
-        print("="*80)
-        for task in tasks:
-            task = self._ensure_task_fields(task)
-            status_icon = "✓" if task['status'] == 'completed' else "○"
-            priority_icon = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(task['priority'], "🟡")
-            
-            # Format tags
-            tags_str = ""
-            if task.get('tags'):
-                tags_str = f" [{', '.join(task['tags'])}]"
-            
-            # Format due date
-            due_date_str = ""
-            if task.get('due_date'):
-                try:
-                    due_date = datetime.fromisoformat(task['due_date'])
-                    due_date_str = f" | Due: {due_date.strftime('%Y-%m-%d')}"
-                except (ValueError, TypeError):
-                    due_date_str = f" | Due: {task['due_date']}"
-            
-            print(f"  {status_icon} {priority_icon} ID: {task['id']:3d} | {task['description']}{tags_str}{due_date_str}")
-        print("="*80)
+        sys.stdout.write(self.render_tasks(tasks))
+
+    def render_tasks(self, tasks: Iterable[Dict[str, Any]], title: str = "Current Tasks:") -> str:
+        """Render a block of tasks with header and footer as one string, ready for a single write."""
+        lines = ["", RULE, title, RULE]
+        lines.extend(map(format_task, tasks))
+        lines.append(RULE)
+        lines.append("")
+        return "\n".join(lines)
+
+    def get_task_page(self, page: int, page_size: int = 20,
+                      tasks: Optional[List[Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+        """Return (tasks on page, page number, total pages) for a 1-based page.
+
+        Out of range page numbers are clamped to the first or last page.
+        """
+        tasks = tasks if tasks is not None else self.tasks
+        page_size = max(1, page_size)
+        total_pages = max(1, -(-len(tasks) // page_size))
+        page = min(max(1, page), total_pages)
+        start = (page - 1) * page_size
+        return tasks[start:start + page_size], page, total_pages
+
+    def render_task_page(self, page: int, page_size: int = 20,
+                         tasks: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, int, int]:
+        """Render one page of tasks. Returns (text, page number, total pages)."""
+        self.refresh()
+        tasks = tasks if tasks is not None else self.tasks
+        if not tasks:
+            return "No tasks found.\n", 1, 1
+        page_tasks, page, total_pages = self.get_task_page(page, page_size, tasks)
+        title = f"Current Tasks (page {page} of {total_pages}, {len(tasks)} total):"
+        return self.render_tasks(page_tasks, title), page, total_pages
+
+    def iter_task_lines(self, tasks: Optional[Iterable[Dict[str, Any]]] = None) -> Iterator[str]:
+        """Yield one formatted line per task, newline included, without building the whole listing."""
+        for task in (tasks if tasks is not None else self.tasks):
+            yield format_task(task) + "\n"
+
+    def stream_tasks(self, out: Optional[TextIO] = None, tasks: Optional[Iterable[Dict[str, Any]]] = None,
+                     chunk_size: int = 1000) -> int:
+        """Write every task line to out (stdout by default) in chunks. Returns the number of tasks written."""
+        self.refresh()
+        out = out or sys.stdout
+        lines = self.iter_task_lines(tasks)
+        count = 0
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            out.write("".join(chunk))
+            count += len(chunk)
+        out.flush()
+        return count
 
     def find_task_by_id(self, task_id):
-        for task in self.tasks:
-            if task['id'] == task_id:
-                return task
-        return None
+        self.refresh()
+        return self._tasks_by_id.get(task_id)
 
+    @_mutation
     def update_task(self, task_id, new_description):
         task = self.find_task_by_id(task_id)
         if task:
             if not new_description:
                 print("Error: New task description cannot be empty.")
-                return
+                return False
             task['description'] = new_description
-            self.save_tasks()
+            self._index_task(task)
+            self._persist()
             print(f"Task ID {task_id} updated.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
 
+    @_mutation
     def delete_task(self, task_id):
         task = self.find_task_by_id(task_id)
         if task:
-            self.tasks.remove(task)
-            self.save_tasks()
+            self._remove_from_list(task)
+            del self._tasks_by_id[task_id]
+            self._unindex_task(task_id)
+            self._persist()
             print(f"Task ID {task_id} deleted.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
 
+    @_mutation
     def mark_task_complete(self, task_id):
         task = self.find_task_by_id(task_id)
         if task:
+            if task.get('recurrence') and self._advance_recurring(task):
+                print(f"Task ID {task_id} done; next due {_format_due_date(task['due_date'])}.")
+                return True
             task['status'] = 'completed'
-            self.save_tasks()
+            task['completed_at'] = datetime.now().isoformat()
+            self._index_task(task)
+            self._persist()
             print(f"Task ID {task_id} marked as complete.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
 
+    def _advance_recurring(self, task: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+        """Move a repeating task on to its next occurrence after now.
+
+        Occurrences missed while it was overdue are skipped. Returns False if
+        the rule has ended (or cannot be read), leaving the task unchanged.
+        """
+        rule = _parse_recurrence(task['recurrence'])
+        deadline = _due_deadline(task)
+        if rule is None or deadline is None:
+            return False
+        next_deadline = rule.next_after(deadline, max(deadline, now or datetime.now()))
+        if next_deadline is None:
+            return False
+        task['due_date'] = _occurrence(task, next_deadline)['due_date']
+        task['last_completed_at'] = datetime.now().isoformat()
+        self._index_task(task)
+        self._persist()
+        return True
+
+    @_mutation
+    def set_task_recurrence(self, task_id: int, rule: Optional[str]):
+        """Make a task repeat by a rule (see src/recurrence.py), or stop it repeating with None."""
+        task = self.find_task_by_id(task_id)
+        if not task:
+            print(f"Error: Task ID {task_id} not found.")
+            return False
+        if rule:
+            rule = self._check_recurrence(rule, task.get('due_date'))
+            if rule is None:
+                return False
+            task['recurrence'] = rule
+            print(f"Task ID {task_id} repeats {rule}.")
+        else:
+            task.pop('recurrence', None)
+            print(f"Task ID {task_id} no longer repeats.")
+        self._index_task(task)
+        self._persist()
+        return True
+
+    @_mutation
     def update_task_priority(self, task_id: int, priority: str):
         """Update task priority."""
         if priority not in ['high', 'medium', 'low']:
             print("Error: Priority must be 'high', 'medium', or 'low'.")
-            return
+            return False
         task = self.find_task_by_id(task_id)
         if task:
             task['priority'] = priority
-            self.save_tasks()
+            self._index_task(task)
+            self._persist()
             print(f"Task ID {task_id} priority updated to '{priority}'.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
 
+    @_mutation
     def add_tags_to_task(self, task_id: int, tags: List[str]):
         """Add tags to a task."""
         task = self.find_task_by_id(task_id)
@@ -159,11 +666,14 @@ class TaskManager:
             existing_tags = set(task.get('tags', []))
             new_tags = set(tag.strip() for tag in tags if tag.strip())
             task['tags'] = list(existing_tags | new_tags)
-            self.save_tasks()
+            self._persist()
             print(f"Tags added to task ID {task_id}.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
 
+    @_mutation
     def remove_tags_from_task(self, task_id: int, tags: List[str]):
         """Remove tags from a task."""
         task = self.find_task_by_id(task_id)
@@ -172,26 +682,79 @@ class TaskManager:
             existing_tags = set(task.get('tags', []))
             tags_to_remove = set(tag.strip() for tag in tags if tag.strip())
             task['tags'] = list(existing_tags - tags_to_remove)
-            self.save_tasks()
+            self._persist()
             print(f"Tags removed from task ID {task_id}.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
 
+    @_mutation
     def set_task_due_date(self, task_id: int, due_date: str):
         """Set due date for a task."""
         task = self.find_task_by_id(task_id)
         if task:
             task['due_date'] = due_date
-            self.save_tasks()
+            self._index_task(task)
+            self._persist()
             print(f"Due date set for task ID {task_id}.")
+            return True
         else:
             print(f"Error: Task ID {task_id} not found.")
+            return False
+
+    @_mutation
+    def archive_completed(self, older_than_days: float = 30, now: Optional[datetime] = None) -> int:
+        """Move tasks completed more than older_than_days ago into the monthly archive.
+
+        Archived tasks leave the task list and its indexes; they stay readable
+        through archived_tasks() and include_archived=True. Tasks completed
+        before completion times were recorded are aged by created_at.
+        Returns the number of tasks archived.
+        """
+        cutoff = (now or datetime.now()) - timedelta(days=older_than_days)
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for task in self.tasks:
+            if task.get('status') != 'completed':
+                continue
+            completed = _parse_due_date(task.get('completed_at') or task.get('created_at'))
+            if completed is not None and completed < cutoff:
+                by_month.setdefault(completed.strftime('%Y-%m'), []).append(task)
+        if not by_month:
+            return 0
+
+        # Archive first: if saving the store then fails, archiving again is harmless
+        storage.archive_tasks(self.storage_file, by_month, self.next_id, self.storage_format)
+        archived_ids = {task['id'] for tasks in by_month.values() for task in tasks}
+        self.tasks = [task for task in self.tasks if task['id'] not in archived_ids]
+        self._persist()
+        print(f"Archived {len(archived_ids)} completed task(s).")
+        return len(archived_ids)
 
-    def search_tasks(self, keyword: str) -> List[Dict[str, Any]]:
-        """Search tasks by keyword in description or tags."""
+    def archived_tasks(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield archived tasks completed in the months since..until (YYYY-MM, inclusive).
+
+        Only the matching monthly partitions are read.
+        """
+        months = [month for month in storage.read_archive_index(self.storage_file)['months']
+                  if (since is None or month >= since) and (until is None or month <= until)]
+        for task in storage.read_archive(self.storage_file, months, self.storage_format):
+            yield self._ensure_task_fields(task)
+
+    def _tasks_and_archive(self, include_archived: bool) -> Iterator[Dict[str, Any]]:
+        yield from self.tasks
+        if include_archived:
+            for task in self.archived_tasks():
+                # An archived copy of a task still in the store is stale
+                if task['id'] not in self._tasks_by_id:
+                    yield task
+
+    def search_tasks(self, keyword: str, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Search tasks by keyword in description or tags (and the archive, if asked)."""
+        self.refresh()
         keyword_lower = keyword.lower()
         results = []
-        for task in self.tasks:
+        for task in self._tasks_and_archive(include_archived):
             task = self._ensure_task_fields(task)
             description_match = keyword_lower in task['description'].lower()
             tags_match = any(keyword_lower in tag.lower() for tag in task.get('tags', []))
@@ -200,10 +763,11 @@ class TaskManager:
         return results
 
     def filter_tasks(self, status: Optional[str] = None, priority: Optional[str] = None, 
-                     tag: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Filter tasks by status, priority, or tag."""
+                     tag: Optional[str] = None, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """Filter tasks by status, priority, or tag (and the archive, if asked)."""
+        self.refresh()
         results = []
-        for task in self.tasks:
+        for task in self._tasks_and_archive(include_archived):
             task = self._ensure_task_fields(task)
             match = True
             
@@ -218,28 +782,60 @@ class TaskManager:
                 results.append(task)
         return results
 
-    def sort_tasks(self, sort_by: str = 'id', reverse: bool = False) -> List[Dict[str, Any]]:
-        """Sort tasks by id, description, priority, due_date, or status."""
-        tasks_copy = [self._ensure_task_fields(task.copy()) for task in self.tasks]
-        
-        priority_order = {'high': 3, 'medium': 2, 'low': 1}
-        
-        def get_sort_key(task):
-            if sort_by == 'priority':
-                return priority_order.get(task.get('priority', 'medium'), 2)
-            elif sort_by == 'due_date':
-                due_date = task.get('due_date')
-                if due_date:
-                    try:
-                        return datetime.fromisoformat(due_date)
-                    except (ValueError, TypeError):
-                        return datetime.max
-                return datetime.max
-            elif sort_by == 'description':
-                return task.get('description', '').lower()
-            elif sort_by == 'status':
-                return task.get('status', 'pending')
-            else:  # default to 'id'
-                return task.get('id', 0)
-        
-        return sorted(tasks_copy, key=get_sort_key, reverse=reverse)
+    def sort_tasks(self, sort_by: str = 'id', reverse: bool = False,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Sort tasks by id, description, priority, due_date, or status.
+
+        Reads from an incrementally maintained sorted view, so returning the
+        first `limit` tasks costs O(limit) once the view exists. Returned
+        tasks are copies.
+        """
+        self.refresh()
+        if sort_by not in SORT_KEYS:
+            sort_by = 'id'
+        task_ids = self._index(sort_by).ids(reverse)
+        if limit is not None:
+            task_ids = islice(task_ids, limit)
+        return [self._tasks_by_id[task_id].copy() for task_id in task_ids]
+
+    def get_overdue_tasks(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Pending tasks whose due date has passed, most overdue first. Returned tasks are copies."""
+        self.refresh()
+        now = now or datetime.now()
+        task_ids = self._index('deadline').ids_between(high=now)
+        return [self._tasks_by_id[task_id].copy() for task_id in task_ids]
+
+    def get_upcoming_tasks(self, hours: float = 24, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Pending tasks falling due within the next `hours`, soonest first.
+
+        Repeating tasks appear once per occurrence in that time. Returned tasks are copies.
+        Raises ValueError unless 0 <= hours <= MAX_UPCOMING_HOURS.
+        """
+        if not 0 <= hours <= MAX_UPCOMING_HOURS:
+            raise ValueError(f"hours must be between 0 and {MAX_UPCOMING_HOURS}")
+        now = now or datetime.now()
+        return self.get_occurrences(now, now + timedelta(hours=hours))
+
+    def get_occurrences(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Pending tasks falling due from start up to end, soonest first.
+
+        Repeating tasks are expanded on the fly: each occurrence in the window
+        is a copy of the task with that due date (at most
+        recurrence.MAX_OCCURRENCES per task). Only the stored, next occurrence
+        can be changed or completed. Returned tasks are copies.
+        """
+        self.refresh()
+        occurrences = []
+        for task_id in self._index('deadline').ids_between(start, end):
+            task = self._tasks_by_id[task_id]
+            if _recurring_deadline(task) is None:
+                occurrences.append((_due_deadline(task), task.copy()))
+        # Repeating tasks whose stored occurrence is due before the window ends
+        for task_id in self._index('recurring').ids_between(high=end):
+            task = self._tasks_by_id[task_id]
+            rule = _parse_recurrence(task['recurrence'])
+            deadlines = rule.occurrences(_due_deadline(task), start, end - timedelta(microseconds=1))
+            occurrences.extend((deadline, _occurrence(task, deadline))
+                               for deadline in islice(deadlines, recurrence.MAX_OCCURRENCES))
+        occurrences.sort(key=lambda entry: (entry[0], entry[1]['id']))
+        return [task for _, task in occurrences]
@@ -0,0 +1,313 @@
+"""
+Request Tracing
+
+Lightweight spans for the stages of a request (token decode, user fetch,
+task query, serialization). TracingMiddleware starts a trace per request,
+continuing the caller's trace when a W3C `traceparent` header is sent, and
+returns:
+- `traceparent` naming this request's server span, and
+- `Server-Timing` with the duration of each stage, visible in browser
+  devtools.
+
+Finished traces can be exported in OTLP/JSON, the OpenTelemetry wire format,
+to a JSON-lines file or an OTLP/HTTP collector (TRACE_EXPORTER). Export runs
+in a background thread in batches, off the request path.
+
+Instrument code with:
+    with span("task_query"):
+        ...
+Outside a traced request, span() does nothing.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+class Span:
+    """One timed stage of a request"""
+
+    __slots__ = ("name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: dict = {}
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self, trace_id: str) -> dict:
+        """Encode as an OTLP/JSON span"""
+        encoded = {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": {"intValue": str(value)} if isinstance(value, int) else {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_id:
+            encoded["parentSpanId"] = self.parent_id
+        return encoded
+
+
+class Trace:
+    """The spans recorded for one request"""
+
+    def __init__(self, trace_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span"""
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = current_span.get()
+    new_span = Span(name, parent.span_id if parent else None)
+    new_span.attributes.update(attributes)
+    trace.spans.append(new_span)
+    token = current_span.set(new_span)
+    try:
+        yield new_span
+    finally:
+        new_span.end_ns = time.time_ns()
+        current_span.reset(token)
+
+
+def parse_traceparent(value: str):
+    """Return (trace_id, parent_span_id, sampled) from a traceparent header, or None"""
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def server_timing(trace: Trace, root: Span) -> str:
+    """Server-Timing header value: total time per stage name, plus the whole request"""
+    totals: dict = {}
+    for each in trace.spans:
+        if each is not root and each.end_ns is not None:
+            totals[each.name] = totals.get(each.name, 0.0) + each.duration_ms
+    metrics = [f"{name};dur={duration:.2f}" for name, duration in totals.items()]
+    metrics.append(f"total;dur={root.duration_ms:.2f}")
+    return ", ".join(metrics)
+
+
+def otlp_payload(traces: List[Trace]) -> dict:
+    """Wrap finished traces in an OTLP/JSON ExportTraceServiceRequest"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": settings.trace_service_name}},
+        ]},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": [each.to_otlp(trace.trace_id) for trace in traces for each in trace.spans],
+        }],
+    }]}
+
+
+class TraceExporter(ABC):
+    """Destination for finished traces"""
+
+    @abstractmethod
+    def export(self, traces: List[Trace]) -> None:
+        """Send a batch of traces (called from the export thread)"""
+
+
+class FileExporter(TraceExporter):
+    """Append one OTLP/JSON payload per batch to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, traces: List[Trace]) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(otlp_payload(traces)) + "\n")
+
+
+class OTLPHttpExporter(TraceExporter):
+    """POST OTLP/JSON to a collector's /v1/traces endpoint"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def export(self, traces: List[Trace]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(otlp_payload(traces)).encode(),
+            method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# Exporter name (TRACE_EXPORTER setting) -> factory
+TRACE_EXPORTERS = {
+    "file": lambda: FileExporter(settings.trace_export_file),
+    "otlp-http": lambda: OTLPHttpExporter(settings.trace_collector_url),
+}
+
+
+class BatchExportQueue:
+    """
+    Hand traces to an exporter from a background thread
+
+    Flushes every `interval` seconds or `batch_size` traces. When the queue
+    is full, new traces are dropped rather than slowing requests down.
+    """
+
+    def __init__(self, exporter: TraceExporter, batch_size: int = 100, interval: float = 2.0,
+                 max_queue: int = 10000):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def put(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _take_batch(self, timeout: Optional[float]) -> List[Trace]:
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=timeout))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _export(self, batch: List[Trace]):
+        try:
+            self.exporter.export(batch)
+        except Exception:
+            logger.exception("Trace export failed; dropped %d trace(s)", len(batch))
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(self.interval)
+            if batch:
+                self._export(batch)
+
+    def flush(self):
+        """Export everything queued so far (used at shutdown)"""
+        while True:
+            batch = self._take_batch(0)
+            if not batch:
+                return
+            self._export(batch)
+
+
+_export_queue: Optional[BatchExportQueue] = None
+
+
+def get_export_queue() -> Optional[BatchExportQueue]:
+    """The configured export queue, created on first use, or None if exporting is off"""
+    global _export_queue
+    if _export_queue is None and settings.trace_exporter:
+        if settings.trace_exporter not in TRACE_EXPORTERS:
+            raise ValueError(
+                f"Unknown trace exporter '{settings.trace_exporter}'. Available: {', '.join(TRACE_EXPORTERS)}"
+            )
+        _export_queue = BatchExportQueue(TRACE_EXPORTERS[settings.trace_exporter]())
+    return _export_queue
+
+
+class TracingMiddleware:
+    """Start a trace per request and report it in headers and to the exporter"""
+
+    def __init__(self, app):
+        self.app = app
+        self.export_queue = get_export_queue()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        if parent is not None:
+            trace = Trace(parent[0], sampled=parent[2])
+            root = Span("http.request", parent[1], SPAN_KIND_SERVER)
+        else:
+            trace = Trace(os.urandom(16).hex())
+            root = Span("http.request", None, SPAN_KIND_SERVER)
+        root.attributes["http.method"] = scope.get("method", "")
+        root.attributes["url.path"] = scope.get("path", "")
+        trace.spans.append(root)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                headers = [
+                    *message.get("headers", ()),
+                    (b"traceparent", f"00-{trace.trace_id}-{root.span_id}-{'01' if trace.sampled else '00'}".encode()),
+                ]
+                if settings.server_timing:
+                    headers.append((b"server-timing", server_timing(trace, root).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        trace_token = current_trace.set(trace)
+        span_token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            root.end_ns = time.time_ns()
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope.get('method', '')} {route.path}"
+                root.attributes["http.route"] = route.path
+            current_span.reset(span_token)
+            current_trace.reset(trace_token)
+            if self.export_queue is not None and trace.sampled:
+                self.export_queue.put(trace)
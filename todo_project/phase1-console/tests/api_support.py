@@ -0,0 +1,58 @@
+# Phase 2: API - Shared Setup for API Tests
+
+# Settings, engines and middleware are configured from the environment when
+# src is first imported, so every API test module imports this module before
+# anything from src. All API tests in one run share one temporary SQLite
+# database; each test registers its own users.
+
+import os
+import tempfile
+import unittest
+import uuid
+
+try:
+    import fastapi  # noqa: F401
+    import httpx  # noqa: F401  (TestClient)
+    import sqlmodel  # noqa: F401
+except ImportError:  # the API dependencies are optional for the console app
+    raise unittest.SkipTest("API dependencies are not installed")
+
+_temp_dir = tempfile.TemporaryDirectory()
+TEMP_DIR = _temp_dir.name
+
+for name, value in {
+    'DATABASE_URL': f"sqlite:///{os.path.join(TEMP_DIR, 'api.db')}",
+    'BETTER_AUTH_SECRET': 'api-tests',
+    'SCHEDULER_ENABLED': 'false',
+    'SQLITE_MAINTENANCE_INTERVAL_SECONDS': '0',
+    'RATE_LIMIT_PER_SECOND': '0',
+    'AUTH_RATE_LIMIT_PER_SECOND': '0',
+    'MAX_IN_FLIGHT_REQUESTS': '0',
+    'SLOW_QUERY_THRESHOLD_MS': '0',
+    'BCRYPT_ROUNDS': '4',  # the cheapest cost, so registering users stays fast
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from src.api import app  # noqa: E402
+
+
+class ApiTestCase(unittest.TestCase):
+    """Runs the app (with its startup) once per test class"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def register(self, password='secret'):
+        """Register a new user; returns (user_id, auth headers, email)"""
+        email = f'{uuid.uuid4().hex[:12]}@example.com'
+        response = self.client.post('/api/auth/register', json={'email': email, 'password': password})
+        self.assertEqual(response.status_code, 201, response.text)
+        body = response.json()
+        return body['user']['id'], {'Authorization': f"Bearer {body['access_token']}"}, email
@@ -18,6 +18,8 @@ class TestAddTask(unittest.TestCase):
         # Clean up the temporary file after each test
         if os.path.exists(self.storage_file):
             os.remove(self.storage_file)
+        if os.path.exists(self.storage_file + '.lock'):
+            os.remove(self.storage_file + '.lock')
 
     def test_add_task_successfully(self):
         initial_task_count = len(self.task_manager.tasks)
@@ -0,0 +1,75 @@
+# Phase 1: Console Application - Test for Archiving Completed Tasks
+
+import unittest
+from datetime import datetime, timedelta
+from src import storage
+from src.tasks import TaskManager
+import os
+import shutil
+
+class TestArchive(unittest.TestCase):
+
+    storage_file = 'test_tasks_archive.json'
+
+    def setUp(self):
+        self.remove_files()
+        self.task_manager = TaskManager(storage_file=self.storage_file)
+        for i in range(6):
+            self.task_manager.add_task(f"Task {i}", tags=['work'] if i % 2 else [])
+        self.now = datetime(2024, 6, 20)
+        # Tasks 1-3 were completed in March, April and May; task 4 yesterday
+        for task_id, completed in ((1, '2024-03-05'), (2, '2024-04-10'), (3, '2024-05-15'), (4, '2024-06-19')):
+            self.task_manager.mark_task_complete(task_id)
+            self.task_manager.find_task_by_id(task_id)['completed_at'] = completed + 'T12:00:00'
+        self.task_manager.save_tasks()
+
+    def tearDown(self):
+        self.task_manager.close()
+        self.remove_files()
+
+    def remove_files(self, storage_file=storage_file):
+        for path in (storage_file, storage_file + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(storage.archive_dir(storage_file), ignore_errors=True)
+
+    def test_archive_moves_old_completed_tasks(self):
+        self.assertEqual(self.task_manager.archive_completed(older_than_days=30, now=self.now), 3)
+        self.assertEqual([task['id'] for task in self.task_manager.tasks], [4, 5, 6])
+        self.assertEqual(storage.read_archive_index(self.storage_file)['months'],
+                         {'2024-03': 1, '2024-04': 1, '2024-05': 1})
+
+        reloaded = TaskManager(storage_file=self.storage_file)
+        self.assertEqual([task['id'] for task in reloaded.tasks], [4, 5, 6])
+        self.assertEqual(self.task_manager.archive_completed(older_than_days=30, now=self.now), 0)
+
+    def test_archived_tasks_are_opt_in(self):
+        self.task_manager.archive_completed(older_than_days=30, now=self.now)
+        self.assertEqual([task['id'] for task in self.task_manager.filter_tasks(tag='work')], [4, 6])
+        self.assertEqual([task['id'] for task in self.task_manager.filter_tasks(tag='work', include_archived=True)],
+                         [4, 6, 2])
+        self.assertEqual(self.task_manager.search_tasks('Task 1'), [])
+        self.assertEqual(len(self.task_manager.search_tasks('Task 1', include_archived=True)), 1)
+        self.assertEqual([task['id'] for task in self.task_manager.archived_tasks(since='2024-04', until='2024-04')], [2])
+
+    def test_archived_ids_are_not_reused(self):
+        self.task_manager.archive_completed(older_than_days=0, now=self.now)
+        self.task_manager.delete_task(5)
+        self.task_manager.delete_task(6)
+        reloaded = TaskManager(storage_file=self.storage_file)
+        self.assertEqual(reloaded.tasks, [])
+        self.assertEqual(reloaded.add_task("New task")['id'], 7)
+
+    def test_binary_store_archive(self):
+        snapshot_file = 'test_tasks_archive.snap'
+        self.addCleanup(self.remove_files, snapshot_file)
+        storage.convert_storage(self.storage_file, snapshot_file)
+        task_manager = TaskManager(storage_file=snapshot_file)
+        self.assertEqual(task_manager.archive_completed(older_than_days=30, now=self.now), 3)
+        self.assertTrue(os.path.exists(storage.archive_partition(snapshot_file, '2024-03')))
+        archived = list(task_manager.archived_tasks())
+        self.assertEqual([task['completed_at'] for task in archived],
+                         ['2024-03-05T12:00:00', '2024-04-10T12:00:00', '2024-05-15T12:00:00'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# Phase 1: Console Application - Test for Batched Writes
+
+import unittest
+from unittest import mock
+from src.tasks import TaskManager
+import os
+import time
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_file = 'test_tasks_batch.json'
+        if os.path.exists(self.storage_file):
+            os.remove(self.storage_file)
+        self.task_manager = TaskManager(storage_file=self.storage_file)
+        self.task_manager.add_task("Existing task")
+
+    def tearDown(self):
+        self.task_manager.close()
+        for path in (self.storage_file, self.storage_file + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_batch_saves_once(self):
+        with mock.patch('src.storage.write_tasks') as write_tasks:
+            with self.task_manager.batch():
+                for i in range(100):
+                    self.task_manager.add_task(f"Task {i}")
+                self.task_manager.add_tags_to_task(1, ['work'])
+                self.task_manager.update_task_priority(1, 'high')
+                self.assertEqual(write_tasks.call_count, 0)
+            self.assertEqual(write_tasks.call_count, 1)
+
+        reloaded = TaskManager(storage_file=self.storage_file)
+        self.assertEqual(len(reloaded.tasks), 1)  # the write above was mocked
+        self.task_manager.save_tasks()
+        reloaded = TaskManager(storage_file=self.storage_file)
+        self.assertEqual(len(reloaded.tasks), 101)
+        self.assertEqual(reloaded.find_task_by_id(1)['priority'], 'high')
+
+    def test_batch_rolls_back_on_error(self):
+        self.task_manager.sort_tasks('priority')
+        with self.assertRaises(RuntimeError):
+            with self.task_manager.batch():
+                self.task_manager.add_task("Never saved")
+                self.task_manager.update_task_priority(1, 'high')
+                self.task_manager.delete_task(1)
+                raise RuntimeError("boom")
+
+        self.assertEqual([task['description'] for task in self.task_manager.tasks], ["Existing task"])
+        self.assertEqual(self.task_manager.find_task_by_id(1)['priority'], 'medium')
+        self.assertEqual(self.task_manager.next_id, 2)
+        self.assertEqual(len(self.task_manager.sort_tasks('priority')), 1)
+        reloaded = TaskManager(storage_file=self.storage_file)
+        self.assertEqual(len(reloaded.tasks), 1)
+
+    def test_nested_batch_rolls_back_inner_changes_only(self):
+        with self.task_manager.batch():
+            self.task_manager.add_task("Outer")
+            try:
+                with self.task_manager.batch():
+                    self.task_manager.add_task("Inner")
+                    raise ValueError
+            except ValueError:
+                pass
+        descriptions = [task['description'] for task in TaskManager(storage_file=self.storage_file).tasks]
+        self.assertEqual(descriptions, ["Existing task", "Outer"])
+
+    def test_autosave_interval_coalesces_writes(self):
+        task_manager = TaskManager(storage_file=self.storage_file, autosave_interval=0.2)
+        with mock.patch('src.storage.write_tasks') as write_tasks:
+            task_manager.add_task("First")   # first change saves straight away
+            task_manager.add_task("Second")
+            task_manager.add_task("Third")
+            self.assertEqual(write_tasks.call_count, 1)
+            time.sleep(0.4)
+            self.assertEqual(write_tasks.call_count, 2)
+            task_manager.close()
+            self.assertEqual(write_tasks.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
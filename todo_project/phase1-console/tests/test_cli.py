@@ -0,0 +1,106 @@
+# Phase 1: Console Application - Test for the Scriptable Command Line
+
+import unittest
+from unittest import mock
+from src import cli, main
+from src.tasks import TaskManager
+import io
+import json
+import os
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_file = 'test_tasks_cli.json'
+        self.commands_file = 'test_tasks_cli_commands.txt'
+        self.tearDown()
+
+    def tearDown(self):
+        for path in (self.storage_file, self.storage_file + '.lock', self.commands_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_cli(self, *argv, stdin=''):
+        out = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO(stdin)), mock.patch('sys.stdout', out):
+            status = main.main(['--storage-file', self.storage_file, *argv])
+        return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_single_command(self):
+        status, [outcome] = self.run_cli('add', 'Write report', '--priority', 'high',
+                                         '--tags', 'work,urgent', '--due', '2030-01-01')
+        self.assertEqual(status, 0)
+        self.assertTrue(outcome['ok'])
+        self.assertEqual(outcome['result']['id'], 1)
+        self.assertEqual(outcome['result']['tags'], ['work', 'urgent'])
+
+        status, [outcome] = self.run_cli('complete', '7')
+        self.assertEqual(status, 1)
+        self.assertFalse(outcome['ok'])
+        self.assertIn('not found', outcome['error'])
+
+    def test_batch_mixes_command_and_json_lines(self):
+        commands = "\n".join([
+            'add "Buy milk" --tags home',
+            '# comments and blank lines are skipped',
+            '',
+            '{"op": "add", "description": "Call mom", "priority": "low"}',
+            '{"op": "due", "task_id": 2, "due_date": "2030-05-01"}',
+            'complete 1',
+        ])
+        status, outcomes = self.run_cli('batch', stdin=commands)
+        self.assertEqual(status, 0)
+        self.assertEqual([o['op'] for o in outcomes], ['add', 'add', 'due', 'complete'])
+        self.assertEqual([o['line'] for o in outcomes], [1, 4, 5, 6])
+
+        status, [outcome] = self.run_cli('list', '--status', 'pending')
+        self.assertEqual([task['id'] for task in outcome['result']], [2])
+        self.assertEqual(outcome['result'][0]['due_date'], '2030-05-01')
+
+    def test_batch_reports_bad_lines_and_continues(self):
+        with open(self.commands_file, 'w') as f:
+            f.write('add one\nbogus 1\n{"op": "delete"}\ndelete 5\nadd two\n')
+        status, outcomes = self.run_cli('batch', '--file', self.commands_file)
+        self.assertEqual(status, 1)
+        self.assertEqual([o['ok'] for o in outcomes], [True, False, False, False, True])
+        self.assertEqual(len(TaskManager(storage_file=self.storage_file).tasks), 2)
+
+    def test_batch_writes_once(self):
+        commands = "\n".join(f'add "Task {i}"' for i in range(50))
+        with mock.patch('src.storage.write_tasks') as write_tasks:
+            self.run_cli('batch', stdin=commands)
+        self.assertEqual(write_tasks.call_count, 1)
+
+    def test_atomic_batch_rolls_back(self):
+        self.run_cli('add', 'Existing task')
+        status, outcomes = self.run_cli('batch', '--atomic', stdin='add new\ncomplete 1\ndelete 9\nadd never\n')
+        self.assertEqual(status, 1)
+        self.assertEqual(len(outcomes), 3)
+        self.assertTrue(outcomes[-1]['rolled_back'])
+
+        reloaded = TaskManager(storage_file=self.storage_file)
+        self.assertEqual(len(reloaded.tasks), 1)
+        self.assertEqual(reloaded.find_task_by_id(1)['status'], 'pending')
+
+    def test_batch_reports_unexpected_errors_and_continues(self):
+        failing = mock.Mock(side_effect=OSError("disk full"))
+        with mock.patch.dict(cli.OPERATIONS, {'complete': failing}):
+            status, outcomes = self.run_cli('batch', stdin='add one\ncomplete 1\nadd two\n')
+        self.assertEqual(status, 1)
+        self.assertEqual([o['ok'] for o in outcomes], [True, False, True])
+        self.assertEqual(outcomes[1]['line'], 2)
+        self.assertEqual(outcomes[1]['error'], "OSError: disk full")
+        self.assertEqual(len(TaskManager(storage_file=self.storage_file).tasks), 2)
+
+    def test_atomic_batch_rolls_back_on_unexpected_errors(self):
+        failing = mock.Mock(side_effect=OSError("disk full"))
+        with mock.patch.dict(cli.OPERATIONS, {'complete': failing}):
+            status, outcomes = self.run_cli('batch', '--atomic', stdin='add one\ncomplete 1\nadd two\n')
+        self.assertEqual(status, 1)
+        self.assertEqual(len(outcomes), 2)
+        self.assertEqual(outcomes[-1]['line'], 2)
+        self.assertTrue(outcomes[-1]['rolled_back'])
+        self.assertEqual(TaskManager(storage_file=self.storage_file).tasks, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# Phase 2: API - Test for Response Compression
+
+import unittest
+from unittest import mock
+
+from api_support import ApiTestCase
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from src import compression
+from src.compression import CompressionMiddleware, choose_encoding
+
+
+class TestCompressedResponses(ApiTestCase):
+    """The app compresses responses of COMPRESSION_MINIMUM_SIZE (1024) bytes or more"""
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def list_tasks(self, accept_encoding='gzip'):
+        return self.client.get(self.base, headers={**self.headers, 'Accept-Encoding': accept_encoding})
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.list_tasks()
+        self.assertEqual(response.json(), [])
+        self.assertNotIn('content-encoding', response.headers)
+
+    def test_large_responses_are_gzipped(self):
+        for n in range(10):
+            self.client.post(self.base, headers=self.headers, json={'title': f'Task {n}', 'description': 'x' * 100})
+        response = self.list_tasks()
+        self.assertEqual(response.headers['content-encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['vary'])
+        # Content-Length is the compressed size
+        self.assertEqual(int(response.headers['content-length']), response.num_bytes_downloaded)
+        self.assertLess(response.num_bytes_downloaded, len(response.content))
+        self.assertEqual(len(response.json()), 10)  # decoded by the client
+
+        plain = self.list_tasks(accept_encoding='identity')
+        self.assertNotIn('content-encoding', plain.headers)
+        self.assertEqual(plain.json(), response.json())
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+        body = b'data: ' + b'x' * 2000 + b'\n\n'
+
+        @app.get('/events')
+        async def events():
+            return Response(body, media_type='text/event-stream')
+
+        @app.get('/stream')
+        async def stream():
+            async def chunks():
+                yield b'a' * 2000
+                yield b'b' * 2000
+            return StreamingResponse(chunks(), media_type='application/json')
+
+        @app.get('/json')
+        async def large_json():
+            return Response(b'[' + b'0,' * 1000 + b'0]', media_type='application/json')
+
+        self.client = TestClient(CompressionMiddleware(app, minimum_size=1024))
+        self.body = body
+
+    def get(self, path, accept_encoding='gzip'):
+        return self.client.get(path, headers={'Accept-Encoding': accept_encoding})
+
+    def test_event_streams_pass_through(self):
+        response = self.get('/events')
+        self.assertNotIn('content-encoding', response.headers)
+        self.assertEqual(response.content, self.body)
+
+    def test_streamed_bodies_pass_through(self):
+        response = self.get('/stream')
+        self.assertNotIn('content-encoding', response.headers)
+        self.assertEqual(response.content, b'a' * 2000 + b'b' * 2000)
+
+    def test_refused_encodings_are_not_used(self):
+        self.assertNotIn('content-encoding', self.get('/json', accept_encoding='gzip;q=0').headers)
+        self.assertEqual(self.get('/json', accept_encoding='*').headers['content-encoding'], 'gzip')
+        # An explicit q=0 wins over the wildcard
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertIsNone(choose_encoding('gzip;q=0, *'))
+            self.assertIsNone(choose_encoding('gzip; q=0.000, *;q=0.5'))
+            self.assertNotIn('content-encoding', self.get('/json', accept_encoding='gzip;q=0, *').headers)
+        self.assertEqual(choose_encoding('*, identity;q=0'), 'gzip')
+        self.assertIsNone(choose_encoding('*;q=0'))
+
+    @unittest.skipIf(compression.brotli is None, "brotli is not installed")
+    def test_wildcard_falls_back_to_brotli_when_gzip_is_refused(self):
+        self.assertEqual(choose_encoding('gzip;q=0, *'), 'br')
+        self.assertIsNone(choose_encoding('gzip;q=0, br;q=0, *'))
+
+    @unittest.skipIf(compression.brotli is None, "brotli is not installed")
+    def test_prefers_brotli(self):
+        self.assertEqual(choose_encoding('gzip, br'), 'br')
+        self.assertEqual(self.get('/json', accept_encoding='gzip, br').headers['content-encoding'], 'br')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# Phase 1: Console Application - Test for Overdue and Upcoming Tasks
+
+import unittest
+from datetime import datetime
+from src.tasks import TaskManager
+import os
+
+class TestDueDates(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_file = 'test_tasks_due.json'
+        if os.path.exists(self.storage_file):
+            os.remove(self.storage_file)
+        self.task_manager = TaskManager(storage_file=self.storage_file)
+        self.now = datetime(2026, 3, 10, 12, 0)
+        self.task_manager.add_task("Long overdue", due_date='2026-03-01')
+        self.task_manager.add_task("Due today", due_date='2026-03-10')
+        self.task_manager.add_task("Due this afternoon", due_date='2026-03-10T15:00:00')
+        self.task_manager.add_task("Due next week", due_date='2026-03-17')
+        self.task_manager.add_task("No due date")
+        self.task_manager.add_task("Yesterday morning", due_date='2026-03-09T09:00:00')
+
+    def tearDown(self):
+        if os.path.exists(self.storage_file):
+            os.remove(self.storage_file)
+        if os.path.exists(self.storage_file + '.lock'):
+            os.remove(self.storage_file + '.lock')
+
+    def ids(self, tasks):
+        return [task['id'] for task in tasks]
+
+    def test_overdue_tasks(self):
+        self.assertEqual(self.ids(self.task_manager.get_overdue_tasks(now=self.now)), [1, 6])
+
+    def test_upcoming_tasks(self):
+        # A date-only due date is due by the end of that day
+        self.assertEqual(self.ids(self.task_manager.get_upcoming_tasks(hours=24, now=self.now)), [3, 2])
+        self.assertEqual(self.ids(self.task_manager.get_upcoming_tasks(hours=24 * 8, now=self.now)), [3, 2, 4])
+
+    def test_upcoming_hours_are_bounded(self):
+        self.assertEqual(self.ids(self.task_manager.get_upcoming_tasks(hours=24 * 366, now=self.now)), [3, 2, 4])
+        for hours in (-1, 24 * 366 + 1, 1e12, float('inf'), float('nan')):
+            with self.assertRaises(ValueError):
+                self.task_manager.get_upcoming_tasks(hours=hours, now=self.now)
+
+    def test_index_follows_due_date_completion_and_delete(self):
+        self.task_manager.get_overdue_tasks(now=self.now)
+        self.task_manager.mark_task_complete(1)
+        self.task_manager.set_task_due_date(4, '2026-03-02')
+        self.task_manager.delete_task(6)
+        self.task_manager.add_task("New and late", due_date='2026-02-01')
+        self.assertEqual(self.ids(self.task_manager.get_overdue_tasks(now=self.now)), [7, 4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# Phase 2: API - Test for Task Change Events
+
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from api_support import ApiTestCase
+from src import events
+from src.config import settings
+from src.events import InMemoryBroker
+from src.routes import events as event_routes
+from src.routes.events import event_stream, format_sse
+
+
+class FakeRequest:
+    """Stands in for the streaming request; disconnects after `polls` checks"""
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+class TestInMemoryBroker(unittest.TestCase):
+
+    def test_delivers_to_the_users_subscribers_only(self):
+        broker = InMemoryBroker()
+
+        async def run():
+            async with broker.subscribe(1) as first, broker.subscribe(1) as second, broker.subscribe(2) as other:
+                await broker.publish(1, {'type': 'created', 'task_id': 5})
+                return first.get_nowait(), second.get_nowait(), other.empty()
+
+        first, second, other_empty = asyncio.run(run())
+        self.assertEqual(first, {'id': 1, 'type': 'created', 'task_id': 5})
+        self.assertEqual(second, first)
+        self.assertTrue(other_empty)
+
+    def test_overflow_replaces_the_backlog_with_a_resync(self):
+        broker = InMemoryBroker(queue_size=3)
+
+        async def run():
+            async with broker.subscribe(1) as queue:
+                for task_id in range(4):
+                    await broker.publish(1, {'type': 'updated', 'task_id': task_id})
+                await broker.publish(1, {'type': 'deleted', 'task_id': 9})
+                return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        # The fourth event overflowed; later events queue up behind the resync
+        self.assertEqual(asyncio.run(run()), [
+            {'id': 4, 'type': 'resync'},
+            {'id': 5, 'type': 'deleted', 'task_id': 9},
+        ])
+
+    def test_unsubscribes_when_the_subscription_ends(self):
+        broker = InMemoryBroker()
+
+        async def run():
+            async with broker.subscribe(1):
+                async with broker.subscribe(1):
+                    self.assertEqual(broker.subscriber_count(1), 2)
+                self.assertEqual(broker.subscriber_count(), 1)
+            # Publishing with no subscribers is a no-op
+            await broker.publish(1, {'type': 'created', 'task_id': 1})
+
+        asyncio.run(run())
+        self.assertEqual(broker.subscriber_count(), 0)
+        self.assertNotIn(1, broker._subscribers)
+
+
+class TestEventStream(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = InMemoryBroker()
+        for patch in [
+            mock.patch.object(event_routes, 'broker', self.broker),
+            mock.patch.object(settings, 'event_heartbeat_seconds', 0.01),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_streams_events_then_unsubscribes_on_disconnect(self):
+        async def run():
+            stream = event_stream(7, FakeRequest(polls=2))
+            messages = [await stream.__anext__()]  # subscribed once "ready" is sent
+            await self.broker.publish(7, {'type': 'deleted', 'task_id': 3})
+            messages += [message async for message in stream]
+            return messages
+
+        self.assertEqual(asyncio.run(run()), [
+            'event: ready\ndata: {}\n\n',
+            format_sse({'id': 1, 'type': 'deleted', 'task_id': 3}),
+            ': keep-alive\n\n',
+        ])
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+    def test_format_sse(self):
+        message = format_sse({'id': 2, 'type': 'created', 'task_id': 1})
+        self.assertTrue(message.startswith('id: 2\nevent: created\ndata: '))
+        self.assertEqual(json.loads(message.split('data: ')[1]), {'id': 2, 'type': 'created', 'task_id': 1})
+
+
+class TestTaskRoutesPublish(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+        patch = mock.patch.object(events.broker, 'publish', new_callable=mock.AsyncMock)
+        self.publish = patch.start()
+        self.addCleanup(patch.stop)
+
+    def published(self):
+        return [(call.args[0], call.args[1]['type'], call.args[1]['task_id']) for call in self.publish.call_args_list]
+
+    def test_changes_publish_events(self):
+        task = self.client.post(self.base, headers=self.headers, json={'title': 'Watched'}).json()
+        self.client.put(f"{self.base}/{task['id']}", headers=self.headers, json={'title': 'Renamed'})
+        self.client.patch(f"{self.base}/{task['id']}/complete", headers=self.headers)
+        self.client.delete(f"{self.base}/{task['id']}", headers=self.headers)
+
+        self.assertEqual(self.published(), [
+            (self.user_id, event_type, task['id']) for event_type in ('created', 'updated', 'toggled', 'deleted')
+        ])
+        created = self.publish.call_args_list[0].args[1]
+        self.assertEqual(created['task']['title'], 'Watched')
+        self.assertIsNone(self.publish.call_args_list[-1].args[1]['task'])
+
+    def test_failed_changes_publish_nothing(self):
+        self.client.put(f'{self.base}/999999', headers=self.headers, json={'title': 'Missing'})
+        self.client.delete(f'{self.base}/999999', headers=self.headers)
+        self.assertEqual(self.published(), [])
+
+    def test_stream_is_only_for_the_owner(self):
+        other_id, _, _ = self.register()
+        response = self.client.get(f'/api/{other_id}/tasks/events', headers=self.headers)
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
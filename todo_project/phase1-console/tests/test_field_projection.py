@@ -0,0 +1,49 @@
+# Phase 2: API - Test for Sparse Fieldsets on the Task List
+
+import unittest
+
+from api_support import ApiTestCase
+
+
+class TestFieldProjection(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+        for title in ('First', 'Second'):
+            self.client.post(self.base, headers=self.headers, json={'title': title, 'priority': 'high'})
+
+    def list_tasks(self, **params):
+        return self.client.get(self.base, headers=self.headers, params=params)
+
+    def test_returns_only_the_requested_fields_and_the_id(self):
+        response = self.list_tasks(fields='title,status')
+        self.assertEqual(response.status_code, 200, response.text)
+        tasks = response.json()
+        self.assertEqual([set(task) for task in tasks], [{'id', 'title', 'status'}] * 2)
+        self.assertEqual([task['title'] for task in tasks], ['First', 'Second'])
+        self.assertEqual(tasks[0]['status'], 'pending')
+
+    def test_single_field(self):
+        tasks = self.list_tasks(fields='id').json()
+        self.assertEqual([set(task) for task in tasks], [{'id'}] * 2)
+        self.assertEqual([task['id'] for task in tasks], sorted(task['id'] for task in tasks))
+
+    def test_projection_combines_with_filters(self):
+        self.client.post(self.base, headers=self.headers, json={'title': 'Low', 'priority': 'low'})
+        tasks = self.list_tasks(fields='title', priority='low').json()
+        self.assertEqual([task['title'] for task in tasks], ['Low'])
+
+    def test_rejects_unknown_fields(self):
+        response = self.list_tasks(fields='title,password_hash,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown fields: password_hash, secret', response.json()['detail'])
+
+    def test_without_fields_returns_full_tasks(self):
+        tasks = self.list_tasks().json()
+        self.assertIn('description', tasks[0])
+        self.assertIn('created_at', tasks[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,8 @@ class TestListTasks(unittest.TestCase):
     def tearDown(self):
         if os.path.exists(self.storage_file):
             os.remove(self.storage_file)
+        if os.path.exists(self.storage_file + '.lock'):
+            os.remove(self.storage_file + '.lock')
 
     def test_list_tasks_with_tasks(self):
         # Capture standard output to verify the printed list
@@ -52,5 +54,28 @@ class TestListTasks(unittest.TestCase):
 
         self.assertIn("No tasks found.", output)
 
+    def test_task_pages(self):
+        for i in range(3, 8):
+            self.task_manager.add_task(f"Task {i} description")
+
+        page_tasks, page, total_pages = self.task_manager.get_task_page(2, page_size=3)
+        self.assertEqual([task['id'] for task in page_tasks], [4, 5, 6])
+        self.assertEqual((page, total_pages), (2, 3))
+
+        # Out of range pages are clamped to the last page
+        text, page, total_pages = self.task_manager.render_task_page(99, page_size=3)
+        self.assertEqual(page, 3)
+        self.assertIn("page 3 of 3, 7 total", text)
+        self.assertIn("Task 7 description", text)
+        self.assertNotIn("Task 6 description", text)
+
+    def test_stream_tasks(self):
+        output = StringIO()
+        count = self.task_manager.stream_tasks(out=output, chunk_size=1)
+        self.assertEqual(count, 2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Task 2 description", lines[1])
+
 if __name__ == '__main__':
     unittest.main()
@@ -17,6 +17,8 @@ class TestMarkComplete(unittest.TestCase):
     def tearDown(self):
         if os.path.exists(self.storage_file):
             os.remove(self.storage_file)
+        if os.path.exists(self.storage_file + '.lock'):
+            os.remove(self.storage_file + '.lock')
 
     def test_mark_task_complete_successfully(self):
         task_id_to_complete = 1
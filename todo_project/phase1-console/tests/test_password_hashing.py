@@ -0,0 +1,71 @@
+# Phase 2: API - Test for Password Hash Upgrades and the Hash Benchmark
+
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from api_support import ApiTestCase
+from sqlmodel import Session
+from src import manage
+from src.auth import get_pwd_context
+from src.config import settings
+from src.database import engine
+from src.models import User
+
+
+class TestRehashOnLogin(ApiTestCase):
+
+    def setUp(self):
+        # Registered at the test cost of 4 bcrypt rounds
+        self.user_id, _, self.email = self.register()
+        self.addCleanup(get_pwd_context.cache_clear)
+
+    def stored_hash(self):
+        with Session(engine) as session:
+            return session.get(User, self.user_id).password_hash
+
+    def login(self, password='secret'):
+        return self.client.post('/api/auth/login', json={'email': self.email, 'password': password})
+
+    def test_login_upgrades_an_outdated_hash(self):
+        self.assertTrue(self.stored_hash().startswith('$2b$04$'))
+        with mock.patch.object(settings, 'bcrypt_rounds', 5):
+            get_pwd_context.cache_clear()
+            self.assertEqual(self.login().status_code, 200)
+            upgraded = self.stored_hash()
+            self.assertTrue(upgraded.startswith('$2b$05$'))
+            # The new hash works and is current, so it is kept
+            self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(self.stored_hash(), upgraded)
+
+    def test_failed_login_keeps_the_hash(self):
+        original = self.stored_hash()
+        with mock.patch.object(settings, 'bcrypt_rounds', 5):
+            get_pwd_context.cache_clear()
+            self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertEqual(self.stored_hash(), original)
+
+
+class TestHashBenchmark(unittest.TestCase):
+
+    def run_benchmark(self, *args):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            manage.main(['hash-benchmark', '--runs', '1', '--json', *args])
+        return json.loads(output.getvalue())
+
+    def test_marks_the_configured_cost(self):
+        result = self.run_benchmark('--scheme', 'bcrypt', '--costs', '4,5')
+        self.assertEqual([(row['cost'], row['current']) for row in result['results']], [(4, True), (5, False)])
+
+    def test_other_schemes_have_no_current_cost(self):
+        with mock.patch.object(settings, 'password_hash_scheme', 'argon2'):
+            result = self.run_benchmark('--scheme', 'bcrypt', '--costs', '4,5')
+        self.assertEqual(result['scheme'], 'bcrypt')
+        self.assertFalse(any(row['current'] for row in result['results']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Phase 2: API - Test for Request Profiling Tokens
+
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from api_support import TEMP_DIR, ApiTestCase
+from src.config import settings
+from src.profiling import make_profile_token, verify_profile_token
+
+
+class TestProfileTokens(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.profile_dir = tempfile.mkdtemp(dir=TEMP_DIR)
+        for patch in [
+            mock.patch.object(settings, 'profile_secret', 'profile-tests'),
+            mock.patch.object(settings, 'profile_dir', self.profile_dir),
+            mock.patch.object(settings, 'profile_sample_rate', 0.0),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def get(self, token=None):
+        headers = dict(self.headers)
+        if token is not None:
+            headers['X-Profile-Token'] = token
+        response = self.client.get(f'/api/{self.user_id}/tasks', headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response
+
+    def assertNotProfiled(self, response):
+        self.assertNotIn('x-profile-file', response.headers)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_valid_token_writes_a_profile(self):
+        response = self.get(make_profile_token(60))
+        filename = response.headers['x-profile-file']
+        self.assertEqual(os.listdir(self.profile_dir), [filename])
+        self.assertIn('GET-api', filename)
+        stats = pstats.Stats(os.path.join(self.profile_dir, filename))
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_missing_token_is_not_profiled(self):
+        self.assertNotProfiled(self.get())
+
+    def test_expired_token_is_ignored(self):
+        token = make_profile_token(60, now=time.time() - 3600)
+        self.assertFalse(verify_profile_token(token))
+        self.assertNotProfiled(self.get(token))
+
+    def test_tampered_tokens_are_ignored(self):
+        expires, signature = make_profile_token(60).split('.')
+        forged_signature = f"{expires}.{signature[:-1]}{'0' if signature[-1] != '0' else '1'}"
+        extended_expiry = f"{int(expires) + 86400}.{signature}"
+        for token in (forged_signature, extended_expiry, 'not-a-token', ''):
+            with self.subTest(token=token):
+                self.assertNotProfiled(self.get(token))
+
+    def test_tokens_signed_with_another_secret_are_ignored(self):
+        with mock.patch.object(settings, 'profile_secret', 'other-secret'):
+            token = make_profile_token(60)
+        self.assertNotProfiled(self.get(token))
+
+    def test_header_trigger_is_off_without_a_secret(self):
+        token = make_profile_token(60)
+        with mock.patch.object(settings, 'profile_secret', ''):
+            self.assertNotProfiled(self.get(token))
+            with self.assertRaises(ValueError):
+                make_profile_token(60)
+
+    def test_sampled_requests_are_profiled_without_a_token(self):
+        with mock.patch.object(settings, 'profile_sample_rate', 1.0):
+            response = self.get()
+        self.assertEqual(os.listdir(self.profile_dir), [response.headers['x-profile-file']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+# Phase 2: API - Query Plan Regression Tests
+
+# Every task and auth route is called against a seeded database while its
+# SQL is captured; each statement is then run through EXPLAIN and the test
+# fails if the plan scans a whole hot table instead of using an index.
+#
+# Runs on a temporary SQLite database (EXPLAIN QUERY PLAN). Set
+# QUERY_PLAN_DATABASE_URL to check a PostgreSQL database instead; there the
+# planner is told to avoid sequential scans, so one only shows up when no
+# index can serve the query.
+
+import os
+import re
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+try:
+    import fastapi  # noqa: F401
+    import httpx  # noqa: F401  (TestClient)
+    import sqlmodel  # noqa: F401
+except ImportError:  # the API dependencies are optional for the console app
+    raise unittest.SkipTest("API dependencies are not installed")
+
+# Tables whose full scans grow with users and history
+HOT_TABLES = ('tasks', 'users', 'task_archive')
+USERS = 50
+TASKS_PER_USER = 40
+
+_temp_dir = tempfile.TemporaryDirectory()
+os.environ.update({
+    'DATABASE_URL': os.environ.get('QUERY_PLAN_DATABASE_URL')
+                    or f"sqlite:///{os.path.join(_temp_dir.name, 'plans.db')}",
+    'BETTER_AUTH_SECRET': 'query-plan-tests',
+    'SCHEDULER_ENABLED': 'false',
+    'SQLITE_MAINTENANCE_INTERVAL_SECONDS': '0',
+    'RATE_LIMIT_PER_SECOND': '0',
+    'AUTH_RATE_LIMIT_PER_SECOND': '0',
+    'SLOW_QUERY_THRESHOLD_MS': '0',
+})
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlmodel import Session
+from src.api import app
+from src.auth import hash_password
+from src.database import engine
+from src.models import ArchivedTask, Task, TaskDeletion, User
+
+# Older SQLite versions print "SCAN TABLE tasks"
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(%s)\b' % '|'.join(HOT_TABLES))
+POSTGRES_SCAN = re.compile(r'\bSeq Scan on (%s)\b' % '|'.join(HOT_TABLES))
+
+
+def explain(connection, statement, parameters):
+    """Return the plan lines for one captured statement."""
+    cursor = connection.cursor()
+    try:
+        if engine.dialect.name == 'postgresql':
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + statement, parameters)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class TestQueryPlans(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(app)
+        cls.client.__enter__()  # runs startup: creates tables and indexes
+        response = cls.client.post('/api/auth/register', json={'email': 'plans@example.com', 'password': 'secret'})
+        cls.user_id = response.json()['user']['id']
+        cls.headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+        cls.seed()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    @classmethod
+    def seed(cls):
+        """Enough users and tasks that an index is clearly better than a scan, then ANALYZE."""
+        now = datetime.utcnow()
+        password_hash = hash_password('secret')
+        with Session(engine) as session:
+            users = [User(email=f'user{n}@example.com', password_hash=password_hash) for n in range(USERS)]
+            session.add_all(users)
+            session.flush()
+            for user in [*users, session.get(User, cls.user_id)]:
+                for n in range(TASKS_PER_USER):
+                    session.add(Task(
+                        user_id=user.id, title=f'Task {n} for {user.email}', description='seeded task',
+                        status='completed' if n % 3 == 0 else 'pending', tags=['work'] if n % 2 else [],
+                        due_date=now + timedelta(days=n - 10),
+                        recurrence='weekly' if n % 10 == 0 else None,
+                        updated_at=now - timedelta(days=n),
+                    ))
+                for n in range(TASKS_PER_USER // 4):
+                    session.add(ArchivedTask(
+                        id=1_000_000 + user.id * 100 + n, user_id=user.id, title=f'Old task {n}', status='completed',
+                        created_at=now - timedelta(days=400), updated_at=now - timedelta(days=300),
+                        archive_month=(now - timedelta(days=300)).strftime('%Y-%m'),
+                    ))
+                    session.add(TaskDeletion(task_id=2_000_000 + n, user_id=user.id, deleted_at=now - timedelta(hours=n)))
+            session.commit()
+        with engine.begin() as connection:
+            connection.execute(text('ANALYZE'))
+        with Session(engine) as session:
+            cls.task_id = session.exec(
+                sqlmodel.select(Task.id).where(Task.user_id == cls.user_id).limit(1)
+            ).first()
+
+    def capture(self, method, path, **kwargs):
+        """Call a route and return the SQL statements (with parameters) it ran."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if not executemany:
+                statements.append((statement, parameters))
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.request(method, path, headers=self.headers, **kwargs)
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        self.assertLess(response.status_code, 400, response.text)
+        return statements
+
+    def assertNoFullScans(self, method, path, **kwargs):
+        statements = [
+            (statement, parameters) for statement, parameters in self.capture(method, path, **kwargs)
+            if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH'))
+        ]
+        self.assertTrue(statements, f"{method} {path} ran no queries")
+        scan = POSTGRES_SCAN if engine.dialect.name == 'postgresql' else SQLITE_SCAN
+        connection = engine.raw_connection()
+        try:
+            for statement, parameters in statements:
+                plan = explain(connection, statement, parameters)
+                scans = [line for line in plan if scan.search(line)]
+                self.assertFalse(scans, f"{method} {path} scans a whole table:\n{statement}\n" + "\n".join(plan))
+        finally:
+            connection.close()
+
+    def test_detects_full_scan(self):
+        # Guards the harness itself: an unindexed filter must be reported
+        if engine.dialect.name == 'postgresql':
+            statement, parameters = 'SELECT id FROM tasks WHERE title = %(title)s', {'title': 'x'}
+        else:
+            statement, parameters = 'SELECT id FROM tasks WHERE title = ?', ('x',)
+        connection = engine.raw_connection()
+        try:
+            plan = explain(connection, statement, parameters)
+        finally:
+            connection.close()
+        scan = POSTGRES_SCAN if engine.dialect.name == 'postgresql' else SQLITE_SCAN
+        self.assertTrue(any(scan.search(line) for line in plan), plan)
+
+    # Auth routes
+
+    def test_login(self):
+        self.assertNoFullScans('POST', '/api/auth/login', json={'email': 'plans@example.com', 'password': 'secret'})
+
+    def test_register(self):
+        self.assertNoFullScans('POST', '/api/auth/register', json={'email': 'new@example.com', 'password': 'secret'})
+
+    def test_me(self):
+        self.assertNoFullScans('GET', '/api/auth/me')
+
+    # Task reads
+
+    def test_list_tasks(self):
+        base = f'/api/{self.user_id}/tasks'
+        self.assertNoFullScans('GET', base)
+        self.assertNoFullScans('GET', base, params={'status': 'pending', 'priority': 'medium'})
+        self.assertNoFullScans('GET', base, params={'tag': 'work', 'fields': 'id,title'})
+        self.assertNoFullScans('GET', base, params={'include_archived': 'true', 'limit': 20, 'offset': 40})
+
+    def test_get_task(self):
+        self.assertNoFullScans('GET', f'/api/{self.user_id}/tasks/{self.task_id}')
+        self.assertNoFullScans('GET', f'/api/{self.user_id}/tasks/{1_000_000 + self.user_id * 100}',
+                               params={'include_archived': 'true'})
+
+    def test_sync(self):
+        since = (datetime.utcnow() - timedelta(days=5)).isoformat()
+        self.assertNoFullScans('GET', f'/api/{self.user_id}/tasks/sync', params={'since': since})
+
+    def test_search(self):
+        self.assertNoFullScans('GET', f'/api/{self.user_id}/tasks/search', params={'q': 'task'})
+
+    def test_occurrences(self):
+        self.assertNoFullScans('GET', f'/api/{self.user_id}/tasks/occurrences')
+
+    # Task writes
+
+    def test_create_update_toggle_delete(self):
+        base = f'/api/{self.user_id}/tasks'
+        self.assertNoFullScans('POST', base, json={'title': 'Plan check'})
+        self.assertNoFullScans('PUT', f'{base}/{self.task_id}', json={'title': 'Renamed'})
+        self.assertNoFullScans('PATCH', f'{base}/{self.task_id}/complete')
+        self.assertNoFullScans('DELETE', f'{base}/{self.task_id + 1}')
+
+
+if __name__ == '__main__':
+    unittest.main()
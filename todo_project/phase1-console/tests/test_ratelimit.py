@@ -0,0 +1,109 @@
+# Phase 2: API - Test for Rate Limiting and Load Shedding
+
+import unittest
+from unittest import mock
+
+from api_support import ApiTestCase
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src import ratelimit
+from src.config import settings
+
+
+class TestRateLimit(ApiTestCase):
+
+    def setUp(self):
+        # Fresh buckets, and a limit of two requests per bucket for the test
+        patches = [
+            mock.patch.object(ratelimit, '_shared_limiter', ratelimit.InMemoryRateLimiter()),
+            mock.patch.object(settings, 'rate_limit_per_second', 0.001),
+            mock.patch.object(settings, 'rate_limit_burst', 2),
+            mock.patch.object(settings, 'auth_rate_limit_per_second', 0.001),
+            mock.patch.object(settings, 'auth_rate_limit_burst', 2),
+        ]
+        self.user_id, self.headers, self.email = self.register()
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def assertTooManyRequests(self, response):
+        self.assertEqual(response.status_code, 429, response.text)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+
+    def test_login_is_limited_per_ip(self):
+        login = {'email': self.email, 'password': 'secret'}
+        for _ in range(2):
+            self.assertEqual(self.client.post('/api/auth/login', json=login).status_code, 200)
+        self.assertTooManyRequests(self.client.post('/api/auth/login', json=login))
+        self.assertTooManyRequests(self.client.post('/api/auth/register', json=login))
+
+    def test_me_uses_the_user_bucket(self):
+        login = {'email': self.email, 'password': 'secret'}
+        for _ in range(3):
+            self.client.post('/api/auth/login', json=login)
+        # The login bucket is empty, but /me and /logout are ordinary user requests
+        self.assertEqual(self.client.get('/api/auth/me', headers=self.headers).status_code, 200)
+        self.assertEqual(self.client.post('/api/auth/logout', headers=self.headers).status_code, 200)
+        self.assertTooManyRequests(self.client.get('/api/auth/me', headers=self.headers))
+
+    def test_users_have_separate_buckets(self):
+        with mock.patch.object(settings, 'auth_rate_limit_per_second', 0):
+            other_id, other_headers, _ = self.register()
+        for _ in range(2):
+            self.assertEqual(self.client.get(f'/api/{self.user_id}/tasks', headers=self.headers).status_code, 200)
+        self.assertTooManyRequests(self.client.get(f'/api/{self.user_id}/tasks', headers=self.headers))
+        self.assertEqual(self.client.get(f'/api/{other_id}/tasks', headers=other_headers).status_code, 200)
+
+    def test_invalid_tokens_are_limited_per_ip(self):
+        headers = {'Authorization': 'Bearer not-a-token'}
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 401)
+        self.assertTooManyRequests(self.client.get('/api/auth/me', headers=headers))
+
+    def test_invalid_tokens_are_limited_before_routing(self):
+        headers = {'Authorization': 'Bearer not-a-token'}
+        # No route, so no get_current_user: the middleware still takes the IP's tokens
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/no-such-route', headers=headers).status_code, 404)
+        self.assertTooManyRequests(self.client.get('/api/no-such-route', headers=headers))
+        self.assertTooManyRequests(self.client.get('/api/no-such-route'))
+        # A verified user keeps their own bucket
+        self.assertEqual(self.client.get(f'/api/{self.user_id}/tasks', headers=self.headers).status_code, 200)
+
+    def test_health_is_never_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get('/health').status_code, 200)
+
+
+class TestLoadShedding(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get('/work')
+        async def work():
+            return {'done': True}
+
+        self.middleware = ratelimit.AdmissionControlMiddleware(app, limiter=ratelimit.InMemoryRateLimiter())
+        self.client = TestClient(self.middleware)
+        patch = mock.patch.object(settings, 'max_in_flight_requests', 2)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_rejects_requests_over_the_in_flight_cap(self):
+        self.assertEqual(self.client.get('/work').status_code, 200)
+        self.middleware.in_flight = 2  # two slow requests still running
+        response = self.client.get('/work')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.middleware.in_flight = 1
+        self.assertEqual(self.client.get('/work').status_code, 200)
+        self.assertEqual(self.middleware.in_flight, 1)
+
+    def test_streams_are_not_counted(self):
+        self.middleware.in_flight = 2
+        self.assertEqual(self.client.get('/api/1/tasks/events').status_code, 404)  # reached the app
+
+
+if __name__ == '__main__':
+    unittest.main()
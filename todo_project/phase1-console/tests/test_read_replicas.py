@@ -0,0 +1,82 @@
+# Phase 2: API - Test for Read Replicas and Read-Your-Writes
+
+import itertools
+import os
+import time
+import unittest
+from unittest import mock
+
+from api_support import TEMP_DIR, ApiTestCase
+from sqlmodel import Session, SQLModel
+from src import database
+from src.models import Task, User
+
+
+class TestReadReplicas(ApiTestCase):
+    """The primary is the shared test database; the replica is a second SQLite file that never catches up"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica = database.make_engine(f"sqlite:///{os.path.join(TEMP_DIR, 'replica.db')}")
+        SQLModel.metadata.create_all(cls.replica)
+
+    def setUp(self):
+        for patch in [
+            mock.patch.object(database, 'replica_engines', [self.replica]),
+            mock.patch.object(database, '_replica_cycle', itertools.cycle([self.replica])),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client.cookies.clear()
+        self.user_id, self.headers, _ = self.register()
+        # Replicate the account, but none of the tasks created later
+        with Session(database.engine) as primary, Session(self.replica) as replica:
+            replica.add(User(**primary.get(User, self.user_id).model_dump()))
+            replica.commit()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def titles(self):
+        response = self.client.get(self.base, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        return [task['title'] for task in response.json()]
+
+    def test_reads_go_to_the_replica(self):
+        self.client.cookies.clear()
+        with Session(database.engine) as primary:
+            primary.add(Task(user_id=self.user_id, title='On primary'))
+            primary.commit()
+        self.assertEqual(self.titles(), [])
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        response = self.client.post(self.base, headers=self.headers, json={'title': 'Fresh'})
+        self.assertIn(database.READ_PRIMARY_COOKIE, response.cookies)
+        self.assertEqual(self.titles(), ['Fresh'])
+        # Another worker would see the same cookie; without it the replica is read
+        self.client.cookies.clear()
+        self.assertEqual(self.titles(), [])
+
+    def test_failed_writes_do_not_stick_to_the_primary(self):
+        self.client.cookies.clear()
+        response = self.client.post(self.base, headers=self.headers, json={'title': 'Bad', 'priority': 'urgent'})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(database.READ_PRIMARY_COOKIE, response.cookies)
+        response = self.client.post(f'/api/{self.user_id + 1000}/tasks', headers=self.headers, json={'title': 'Not mine'})
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn(database.READ_PRIMARY_COOKIE, response.cookies)
+
+    def test_stickiness_expires(self):
+        self.client.post(self.base, headers=self.headers, json={'title': 'Fresh'})
+        self.client.cookies.clear()
+        self.client.cookies.set(database.READ_PRIMARY_COOKIE, str(time.time() - 1))
+        self.assertEqual(self.titles(), [])
+
+    def test_ignores_deadlines_beyond_the_window(self):
+        self.client.post(self.base, headers=self.headers, json={'title': 'Fresh'})
+        self.client.cookies.clear()
+        self.client.cookies.set(database.READ_PRIMARY_COOKIE, str(time.time() + 3600))
+        self.assertEqual(self.titles(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# Phase 1: Console Application - Test for Repeating Tasks
+
+import unittest
+from datetime import datetime
+from itertools import islice
+from src.recurrence import parse_rule
+from src.tasks import TaskManager
+import os
+
+class TestRecurrenceRules(unittest.TestCase):
+
+    def test_parse_and_normalize(self):
+        self.assertEqual(str(parse_rule("Weekly")), "weekly")
+        self.assertEqual(str(parse_rule("every 1 week on mon,tue,wed,thu,fri")), "weekdays")
+        self.assertEqual(str(parse_rule("every 2 weeks on fri, mon until 2030-06-30")),
+                         "every 2 weeks on mon,fri until 2030-06-30")
+        for rule in ("hourly", "every 0 days", "monthly on mon", "weekly on xyz", "daily on day 3"):
+            with self.assertRaises(ValueError):
+                parse_rule(rule)
+
+    def test_occurrences_in_window(self):
+        rule = parse_rule("every 2 weeks on mon,fri")
+        start = datetime(2024, 1, 3, 9)  # a Wednesday: the stored occurrence comes first
+        self.assertEqual([moment.day for moment in islice(rule.occurrences(start), 4)], [3, 5, 15, 19])
+        window = list(rule.occurrences(start, datetime(2024, 3, 1), datetime(2024, 3, 20)))
+        self.assertEqual([moment.day for moment in window], [1, 11, 15])
+
+    def test_window_far_from_start(self):
+        rule = parse_rule("daily")
+        window = list(rule.occurrences(datetime(2000, 1, 1, 8), datetime(2030, 1, 1), datetime(2030, 1, 3, 23)))
+        self.assertEqual(window, [datetime(2030, 1, d, 8) for d in (1, 2, 3)])
+
+    def test_month_end_is_kept(self):
+        rule = parse_rule("monthly").anchored(datetime(2024, 1, 31))
+        self.assertEqual(str(rule), "monthly on day 31")
+        due = datetime(2024, 1, 31)
+        days = []
+        for _ in range(3):
+            due = parse_rule(str(rule)).next_after(due, due)
+            days.append(due.day)
+        self.assertEqual(days, [29, 31, 30])
+
+    def test_until_ends_rule(self):
+        rule = parse_rule("daily until 2024-01-03")
+        self.assertEqual(len(list(rule.occurrences(datetime(2024, 1, 1, 9)))), 3)
+        self.assertIsNone(rule.next_after(datetime(2024, 1, 3, 9), datetime(2024, 1, 3, 9)))
+
+    def test_interval_is_capped(self):
+        for rule in ("every 100 years", "every 120 months", "every 520 weeks on mon", "every 1000 days"):
+            parse_rule(rule)
+        for rule in ("every 101 years", "every 121 months", "every 521 weeks", "every 99999999999 days"):
+            with self.assertRaises(ValueError):
+                parse_rule(rule)
+
+    def test_rule_ends_at_the_last_representable_date(self):
+        self.assertIsNone(parse_rule("every 100 years").next_after(datetime(9950, 1, 1), datetime(9950, 1, 1)))
+        self.assertIsNone(parse_rule("every 1000 days").next_after(datetime(9998, 1, 1), datetime(9998, 1, 1)))
+        rule = parse_rule("every 520 weeks on mon")
+        self.assertEqual(list(rule.occurrences(datetime(9990, 1, 1))), [datetime(9990, 1, 1), datetime(9999, 12, 20)])
+
+class TestRepeatingTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_file = 'test_tasks_recurrence.json'
+        self.tearDown()
+        self.task_manager = TaskManager(storage_file=self.storage_file)
+
+    def tearDown(self):
+        for path in (self.storage_file, self.storage_file + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_add_requires_due_date_and_valid_rule(self):
+        self.assertIsNone(self.task_manager.add_task("No date", recurrence="daily"))
+        self.assertIsNone(self.task_manager.add_task("Bad rule", due_date="2030-01-01", recurrence="hourly"))
+        task = self.task_manager.add_task("Rent", due_date="2030-01-31", recurrence="monthly")
+        self.assertEqual(task['recurrence'], "monthly on day 31")
+        self.assertEqual(len(self.task_manager.tasks), 1)
+
+    def test_upcoming_expands_occurrences(self):
+        self.task_manager.add_task("Standup", due_date="2030-01-07T09:30:00", recurrence="weekdays")
+        self.task_manager.add_task("Review", due_date="2030-01-08T12:00:00")
+        upcoming = self.task_manager.get_upcoming_tasks(hours=24 * 7, now=datetime(2030, 1, 7))
+        self.assertEqual([(task['id'], task['due_date'][:10]) for task in upcoming], [
+            (1, '2030-01-07'), (1, '2030-01-08'), (2, '2030-01-08'),
+            (1, '2030-01-09'), (1, '2030-01-10'), (1, '2030-01-11'),
+        ])
+        self.assertEqual(len(self.task_manager.tasks), 2)
+        self.assertEqual(self.task_manager.find_task_by_id(1)['due_date'], "2030-01-07T09:30:00")
+
+    def test_completing_moves_to_next_occurrence(self):
+        self.task_manager.add_task("Plants", due_date="2030-01-01", recurrence="every 3 days")
+        self.assertTrue(self.task_manager.mark_task_complete(1))
+        task = self.task_manager.find_task_by_id(1)
+        self.assertEqual((task['status'], task['due_date']), ('pending', '2030-01-04'))
+
+        self.task_manager.set_task_recurrence(1, None)
+        self.task_manager.mark_task_complete(1)
+        self.assertEqual(self.task_manager.find_task_by_id(1)['status'], 'completed')
+
+    def test_missed_occurrences_are_skipped(self):
+        self.task_manager.add_task("Backup", due_date="2020-01-01T02:00:00", recurrence="daily")
+        self.task_manager.mark_task_complete(1)
+        due = datetime.fromisoformat(self.task_manager.find_task_by_id(1)['due_date'])
+        self.assertGreater(due, datetime.now())
+        self.assertEqual(self.task_manager.get_overdue_tasks(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# Phase 2: API - Test for Repeating Tasks
+
+import unittest
+from datetime import datetime
+
+from api_support import ApiTestCase
+from sqlmodel import Session
+from src.database import engine
+from src.models import Task
+
+
+class TestRepeatingTasksApi(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def create(self, **fields):
+        return self.client.post(self.base, headers=self.headers, json={'title': 'Repeats', **fields})
+
+    def occurrences(self, start, end):
+        response = self.client.get(f'{self.base}/occurrences', headers=self.headers,
+                                   params={'start': start, 'end': end})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_rejects_oversized_intervals(self):
+        for rule in ('every 9999 years', 'every 99999999999 days'):
+            response = self.create(due_date='2030-01-01T09:00:00', recurrence=rule)
+            self.assertEqual(response.status_code, 400, rule)
+            self.assertIn('at most', response.json()['detail'])
+
+    def test_completing_the_last_representable_occurrence_completes_the_task(self):
+        task = self.create(due_date='9950-01-01T09:00:00', recurrence='every 100 years').json()
+        response = self.client.patch(f"{self.base}/{task['id']}/complete", headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()['status'], 'completed')
+
+    def test_occurrences_stop_at_the_last_representable_date(self):
+        self.create(due_date='9999-12-30T09:00:00', recurrence='daily')
+        days = [occurrence['due_date'][:10] for occurrence in self.occurrences('9999-12-29T00:00:00', '9999-12-31T23:00:00')]
+        self.assertEqual(days, ['9999-12-30', '9999-12-31'])
+
+    def test_stored_oversized_rule_does_not_break_listings(self):
+        # Saved before intervals were capped
+        with Session(engine) as session:
+            task = Task(user_id=self.user_id, title='Legacy', due_date=datetime(2030, 1, 1),
+                        recurrence='every 9999 years')
+            session.add(task)
+            session.commit()
+            task_id = task.id
+        self.occurrences('2029-12-31T00:00:00', '2030-01-02T00:00:00')
+        response = self.client.patch(f'{self.base}/{task_id}/complete', headers=self.headers)
+        self.assertEqual(response.json()['status'], 'completed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# Phase 2: API - Test for the Due-Date Scheduler
+
+import asyncio
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from api_support import TEMP_DIR
+from sqlmodel import Session, SQLModel, delete, select
+from src import database, scheduler
+from src.models import SchedulerLease, Task, TaskNotification
+from src.scheduler import NotificationSink, TaskScheduler, acquire_lease, find_due_tasks
+
+NOW = datetime(2030, 1, 1, 12, 0, 0)
+HOUR = timedelta(hours=1)
+
+
+class RecordingSink(NotificationSink):
+
+    def __init__(self):
+        self.batches = []
+
+    async def send(self, notifications):
+        self.batches.append(notifications)
+
+
+class SchedulerTestCase(unittest.TestCase):
+    """Two shard databases of their own; the first also holds the lease"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.shards = [
+            database.make_engine(f"sqlite:///{os.path.join(TEMP_DIR, f'scheduler{number}.db')}")
+            for number in range(2)
+        ]
+        for shard in cls.shards:
+            SQLModel.metadata.create_all(shard)
+
+    def setUp(self):
+        for shard in self.shards:
+            with Session(shard) as session:
+                for model in (TaskNotification, Task, SchedulerLease):
+                    session.exec(delete(model))
+                session.commit()
+
+    def add_tasks(self, shard_number, due_dates, user_id=None, status='pending'):
+        """Add one task per due date to a shard; users 1000+ live on shard 1"""
+        user_id = user_id if user_id is not None else 1 + 1000 * shard_number
+        with Session(self.shards[shard_number]) as session:
+            tasks = [Task(user_id=user_id, title=f'Due {due}', due_date=due, status=status) for due in due_dates]
+            session.add_all(tasks)
+            session.commit()
+            return [task.id for task in tasks]
+
+
+class TestLease(SchedulerTestCase):
+
+    def acquire(self, holder, now):
+        with Session(self.shards[0]) as session:
+            return acquire_lease(session, 'test-lease', holder, timedelta(minutes=3), now)
+
+    def test_one_holder_at_a_time(self):
+        self.assertTrue(self.acquire('a', NOW))
+        self.assertFalse(self.acquire('b', NOW + timedelta(minutes=1)))
+        # The holder renews, which pushes the expiry out
+        self.assertTrue(self.acquire('a', NOW + timedelta(minutes=2)))
+        self.assertFalse(self.acquire('b', NOW + timedelta(minutes=4)))
+
+    def test_expired_lease_is_taken_over(self):
+        self.assertTrue(self.acquire('a', NOW))
+        self.assertTrue(self.acquire('b', NOW + timedelta(minutes=4)))
+        self.assertFalse(self.acquire('a', NOW + timedelta(minutes=5)))
+
+
+class TestFindDueTasks(SchedulerTestCase):
+
+    def find(self, kind='due_soon', limit=10):
+        with Session(self.shards[0]) as session:
+            return [task.id for task in find_due_tasks(session, kind, NOW, NOW + HOUR, limit)]
+
+    def test_selects_pending_tasks_in_the_window_by_due_date(self):
+        later, sooner = self.add_tasks(0, [NOW + 50 * timedelta(minutes=1), NOW + 10 * timedelta(minutes=1)])
+        self.add_tasks(0, [NOW, NOW + 2 * HOUR, NOW - HOUR])  # the window is (now, now + lead]
+        self.add_tasks(0, [NOW + HOUR / 2], status='completed')
+        self.assertEqual(self.find(), [sooner, later])
+        self.assertEqual(self.find(limit=1), [sooner])
+
+    def test_skips_tasks_already_notified_for_their_due_date(self):
+        sent, moved = self.add_tasks(0, [NOW + HOUR / 2, NOW + HOUR / 2])
+        with Session(self.shards[0]) as session:
+            for task_id in (sent, moved):
+                session.add(TaskNotification(task_id=task_id, user_id=1, kind='due_soon', due_date=NOW + HOUR / 2))
+            session.commit()
+            # Moving the due date makes the task due for a new notification
+            task = session.get(Task, moved)
+            task.due_date = NOW + HOUR / 4
+            session.add(task)
+            session.commit()
+        self.assertEqual(self.find(), [moved])
+        # Each kind is notified separately
+        self.assertEqual(self.find(kind='overdue'), [moved, sent])
+
+
+class TestTick(SchedulerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for patch in [
+            mock.patch.object(scheduler, 'engine', self.shards[0]),
+            mock.patch.object(scheduler, 'task_engines', lambda: self.shards),
+            mock.patch.object(scheduler, 'task_engine', lambda user_id: self.shards[user_id // 1000]),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.sink = RecordingSink()
+        self.scheduler = TaskScheduler([self.sink], interval=60, batch_size=4,
+                                       reminder_lead=HOUR, overdue_lookback=HOUR)
+
+    def tick(self):
+        asyncio.run(self.scheduler.tick(NOW))
+        return [(n['user_id'], n['task_id']) for n in self.sink.batches.pop()] if self.sink.batches else []
+
+    def test_backlog_on_one_shard_does_not_starve_the_others(self):
+        self.add_tasks(0, [NOW + timedelta(minutes=n) for n in range(1, 11)])
+        quiet = self.add_tasks(1, [NOW + HOUR])
+        sent = self.tick()
+        self.assertEqual(len(sent), 4)
+        self.assertIn((1000 + 1, quiet[0]), sent)
+
+    def test_unused_share_passes_to_other_shards(self):
+        self.add_tasks(0, [NOW + timedelta(minutes=n) for n in range(1, 13)])
+        self.add_tasks(1, [NOW + HOUR])
+        self.tick()
+        # Shard 1 is done, so shard 0 gets the whole batch, whichever shard goes first
+        for _ in range(2):
+            self.assertEqual([user_id for user_id, _ in self.tick()], [1] * 4)
+
+    def test_first_shard_rotates(self):
+        self.scheduler.batch_size = 3
+        self.add_tasks(0, [NOW + timedelta(minutes=n) for n in range(1, 11)])
+        self.add_tasks(1, [NOW + timedelta(minutes=n) for n in range(1, 11)])
+        self.assertEqual([user_id for user_id, _ in self.tick()], [1, 1001, 1])
+        self.assertEqual([user_id for user_id, _ in self.tick()], [1001, 1, 1001])
+
+    def test_sends_each_notification_once(self):
+        self.add_tasks(0, [NOW + HOUR / 2])
+        overdue = self.add_tasks(1, [NOW - HOUR / 2])
+        self.assertEqual(len(self.tick()), 2)
+        # Recorded on the task's own shard
+        with Session(self.shards[1]) as session:
+            recorded = session.exec(select(TaskNotification.task_id, TaskNotification.kind)).all()
+        self.assertEqual(recorded, [(overdue[0], 'overdue')])
+        self.assertEqual(self.tick(), [])
+
+    def test_skips_the_sweep_without_the_lease(self):
+        self.add_tasks(0, [NOW + HOUR / 2])
+        with Session(self.shards[0]) as session:
+            acquire_lease(session, scheduler.LEASE_NAME, 'other-worker', timedelta(minutes=3), NOW)
+        self.assertEqual(self.tick(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
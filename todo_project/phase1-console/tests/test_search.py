@@ -0,0 +1,81 @@
+# Phase 2: API - Test for Full-Text Search
+
+import os
+import unittest
+
+from api_support import TEMP_DIR, ApiTestCase
+from sqlmodel import Session, SQLModel
+from src import database
+from src.models import Task
+from src.search import create_search_index, search_tasks
+
+
+class TestSearch(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def create(self, title, description=None):
+        task = {'title': title, 'description': description}
+        return self.client.post(self.base, headers=self.headers, json=task).json()['id']
+
+    def search(self, q, headers=None, base=None):
+        response = self.client.get(f'{base or self.base}/search', headers=headers or self.headers, params={'q': q})
+        self.assertEqual(response.status_code, 200, response.text)
+        return [task['id'] for task in response.json()]
+
+    def test_ranks_the_best_match_first(self):
+        mention = self.create('Groceries', 'bread eggs cheese apples butter milk')
+        focused = self.create('Milk', 'milk for the week')
+        self.assertEqual(self.search('milk'), [focused, mention])
+
+    def test_every_word_must_match_and_the_last_as_a_prefix(self):
+        report = self.create('Write quarterly report', 'numbers for finance')
+        self.create('Write letter')
+        self.assertEqual(self.search('write rep'), [report])
+        self.assertEqual(self.search('report finance'), [report])
+        # Search syntax is read as plain words
+        self.assertEqual(self.search('report OR letter'), [])
+        self.assertEqual(self.search('"report*'), [report])
+
+    def test_only_the_users_tasks_match(self):
+        self.create('Shared word')
+        other_id, other_headers, _ = self.register()
+        self.assertEqual(self.search('shared', other_headers, f'/api/{other_id}/tasks'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        task_id = self.create('Paint the fence')
+        self.client.put(f'{self.base}/{task_id}', headers=self.headers, json={'title': 'Paint the shed'})
+        self.assertEqual(self.search('fence'), [])
+        self.assertEqual(self.search('shed'), [task_id])
+        # Changing other columns leaves the entry alone
+        self.client.patch(f'{self.base}/{task_id}/complete', headers=self.headers)
+        self.assertEqual(self.search('shed'), [task_id])
+
+        self.client.delete(f'{self.base}/{task_id}', headers=self.headers)
+        self.assertEqual(self.search('shed'), [])
+
+
+class TestCreateSearchIndex(unittest.TestCase):
+
+    def test_backfills_existing_tasks(self):
+        engine = database.make_engine(f"sqlite:///{os.path.join(TEMP_DIR, 'search_backfill.db')}")
+        self.addCleanup(engine.dispose)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all([Task(user_id=1, title='Renew passport'), Task(user_id=1, title='Book passport photo')])
+            session.commit()
+
+        create_search_index(engine)
+        create_search_index(engine)  # already there: nothing is indexed twice
+        with Session(engine) as session:
+            self.assertEqual([task.title for task in search_tasks(session, 1, 'passport')],
+                             ['Renew passport', 'Book passport photo'])
+            session.add(Task(user_id=1, title='Passport fees'))
+            session.commit()
+            self.assertEqual(len(search_tasks(session, 1, 'passport')), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# Phase 2: API - Test for User-Based Sharding
+
+import os
+import unittest
+from unittest import mock
+
+from api_support import TEMP_DIR, ApiTestCase
+from sqlmodel import Session, select
+from src import database
+from src.models import Task
+from src.sharding import ShardRouter, move_user
+
+
+class TestSharding(ApiTestCase):
+    """Two shards: the primary (which also holds the users directory) and a second SQLite file"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.shard1 = database.make_engine(f"sqlite:///{os.path.join(TEMP_DIR, 'shard1.db')}")
+        cls.shards = [database.engine, cls.shard1]
+        with mock.patch.object(database, 'shard_engines', cls.shards):
+            database.create_db_and_tables()
+
+    def setUp(self):
+        for patch in [
+            mock.patch.object(database, 'shard_engines', self.shards),
+            mock.patch.object(database, 'shard_router', ShardRouter(len(self.shards))),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def register_on(self, shard):
+        """Register users until one maps to shard; returns (user_id, auth headers)"""
+        for _ in range(50):
+            user_id, headers, _ = self.register()
+            if database.task_engine(user_id) is shard:
+                return user_id, headers
+        self.fail('no user mapped to the shard')
+
+    def create_tasks(self, user_id, headers, count):
+        return [
+            self.client.post(f'/api/{user_id}/tasks', headers=headers, json={'title': f'Task {n}'}).json()['id']
+            for n in range(count)
+        ]
+
+    def list_ids(self, user_id, headers):
+        response = self.client.get(f'/api/{user_id}/tasks', headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        return [task['id'] for task in response.json()]
+
+    def task_ids_on(self, shard, user_id):
+        with Session(shard) as session:
+            return sorted(session.exec(select(Task.id).where(Task.user_id == user_id)).all())
+
+    def test_tasks_live_on_the_users_shard(self):
+        user_id, headers = self.register_on(self.shard1)
+        ids = self.create_tasks(user_id, headers, 2)
+        self.assertEqual(self.task_ids_on(self.shard1, user_id), ids)
+        self.assertEqual(self.task_ids_on(database.engine, user_id), [])
+        self.assertEqual(self.list_ids(user_id, headers), ids)
+
+    def test_other_users_tasks_are_forbidden(self):
+        primary_user, primary_headers = self.register_on(database.engine)
+        shard_user, shard_headers = self.register_on(self.shard1)
+        for user_id, headers in [(shard_user, primary_headers), (primary_user, shard_headers)]:
+            response = self.client.get(f'/api/{user_id}/tasks', headers=headers)
+            self.assertEqual(response.status_code, 403, response.text)
+            response = self.client.post(f'/api/{user_id}/tasks', headers=headers, json={'title': 'Not mine'})
+            self.assertEqual(response.status_code, 403, response.text)
+
+    def register_unsharded(self, task_count):
+        """A user (mapped to shard 1) whose tasks were created before sharding was turned on"""
+        user_id, headers = self.register_on(self.shard1)
+        with mock.patch.object(database, 'shard_router', None):
+            ids = self.create_tasks(user_id, headers, task_count)
+            watermark = self.client.get(f'/api/{user_id}/tasks/sync', headers=headers).json()['watermark']
+        return user_id, headers, ids, watermark
+
+    def test_move_user_keeps_task_ids(self):
+        user_id, headers, ids, _ = self.register_unsharded(3)
+        self.assertEqual(self.list_ids(user_id, headers), [])  # still on the primary
+
+        self.assertEqual(move_user(user_id, database.engine, self.shard1, keep_user_row=True), (3, 0))
+        self.assertEqual(self.list_ids(user_id, headers), ids)
+        self.assertEqual(self.task_ids_on(database.engine, user_id), [])
+
+    def test_move_user_renumbers_clashing_ids(self):
+        other_id, _ = self.register_on(self.shard1)
+        user_id, headers, ids, watermark = self.register_unsharded(2)
+        with Session(self.shard1) as session:
+            if session.get(Task, ids[0]) is None:
+                session.add(Task(id=ids[0], user_id=other_id, title='Already here'))
+                session.commit()
+            clashing = [task_id for task_id in ids if session.get(Task, task_id) is not None]
+
+        self.assertEqual(move_user(user_id, database.engine, self.shard1, keep_user_row=True), (2, len(clashing)))
+        moved = self.list_ids(user_id, headers)
+        renumbered = [task_id for task_id in moved if task_id not in ids]
+        self.assertEqual(len(moved), 2)
+        self.assertEqual(len(renumbered), len(clashing))
+        self.assertFalse(set(clashing) & set(moved))
+
+        # Sync clients drop the old ids and receive the tasks under their new ones
+        response = self.client.get(f'/api/{user_id}/tasks/sync', headers=headers, params={'since': watermark})
+        body = response.json()
+        self.assertEqual(sorted(body['deleted']), clashing)
+        self.assertEqual([task['id'] for task in body['tasks']], renumbered)
+
+
+if __name__ == '__main__':
+    unittest.main()
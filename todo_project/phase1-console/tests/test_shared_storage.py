@@ -0,0 +1,101 @@
+# Phase 1: Console Application - Test for Sharing a Task File Between Processes
+
+import unittest
+import multiprocessing
+from src.tasks import TaskManager
+from src import storage
+import os
+
+
+def _add_tasks(storage_file, worker, count):
+    task_manager = TaskManager(storage_file=storage_file)
+    for i in range(count):
+        task_manager.add_task(f"Worker {worker} task {i}")
+
+
+class TestSharedStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_file = 'test_tasks_shared.json'
+        self._cleanup()
+
+    def tearDown(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        for path in (self.storage_file, self.storage_file + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_sees_changes_from_other_manager(self):
+        first = TaskManager(storage_file=self.storage_file)
+        second = TaskManager(storage_file=self.storage_file)
+        first.add_task("From first")
+        second.add_task("From second")
+        first.mark_task_complete(2)
+
+        self.assertEqual([task['id'] for task in first.sort_tasks('status')], [2, 1])
+        self.assertEqual(second.find_task_by_id(2)['status'], 'completed')
+        self.assertEqual(len(TaskManager(storage_file=self.storage_file).tasks), 2)
+
+    def test_refresh_only_reloads_when_file_changed(self):
+        first = TaskManager(storage_file=self.storage_file)
+        second = TaskManager(storage_file=self.storage_file)
+        first.add_task("Task")
+        self.assertTrue(second.refresh())
+        self.assertFalse(second.refresh())
+        self.assertEqual(second.next_id, 2)
+
+    def test_save_is_atomic_replace(self):
+        task_manager = TaskManager(storage_file=self.storage_file)
+        task_manager.add_task("Task")
+        before = storage.file_signature(self.storage_file)
+        task_manager.add_task("Another task")
+        self.assertNotEqual(storage.file_signature(self.storage_file), before)
+        leftovers = [name for name in os.listdir('.') if name.startswith('.' + self.storage_file)]
+        self.assertEqual(leftovers, [])
+
+    def test_concurrent_processes_do_not_lose_writes(self):
+        workers = [multiprocessing.Process(target=_add_tasks, args=(self.storage_file, worker, 25))
+                   for worker in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+
+        task_manager = TaskManager(storage_file=self.storage_file)
+        self.assertEqual(len(task_manager.tasks), 100)
+        self.assertEqual(sorted(task['id'] for task in task_manager.tasks), list(range(1, 101)))
+
+    def test_autosave_merges_changes_saved_meanwhile(self):
+        first = TaskManager(storage_file=self.storage_file, autosave_interval=60)
+        second = TaskManager(storage_file=self.storage_file)
+        first.add_task("Saved right away")
+        first.add_task("Waiting for autosave")
+        first.mark_task_complete(1)
+        # Saved by the other manager before the autosave, under the same new id
+        second.add_task("From second")
+        second.update_task_priority(2, 'high')
+        first.close()
+
+        tasks = TaskManager(storage_file=self.storage_file).tasks
+        self.assertEqual([(task['id'], task['description']) for task in tasks],
+                         [(1, "Saved right away"), (2, "From second"), (3, "Waiting for autosave")])
+        self.assertEqual([task['status'] for task in tasks], ['completed', 'pending', 'pending'])
+        self.assertEqual(tasks[1]['priority'], 'high')
+        self.assertEqual(first.next_id, 4)
+
+    def test_autosave_keeps_deletions_from_either_manager(self):
+        first = TaskManager(storage_file=self.storage_file, autosave_interval=60)
+        second = TaskManager(storage_file=self.storage_file)
+        for title in ("One", "Two", "Three"):
+            second.add_task(title)
+        first.refresh()
+        first.delete_task(1)
+        first.delete_task(2)
+        second.delete_task(3)
+        first.flush()
+        self.assertEqual(TaskManager(storage_file=self.storage_file).tasks, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# Phase 1: Console Application - Test for Sort Tasks
+
+import unittest
+from src.tasks import TaskManager
+import os
+
+class TestSortTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_file = 'test_tasks_sort.json'
+        if os.path.exists(self.storage_file):
+            os.remove(self.storage_file)
+        self.task_manager = TaskManager(storage_file=self.storage_file)
+        self.task_manager.add_task("banana", 'low', due_date='2026-03-01')
+        self.task_manager.add_task("Apple", 'high')
+        self.task_manager.add_task("cherry", 'medium', due_date='2026-01-15')
+        self.task_manager.add_task("date", 'high', due_date='2026-02-01')
+
+    def tearDown(self):
+        if os.path.exists(self.storage_file):
+            os.remove(self.storage_file)
+        if os.path.exists(self.storage_file + '.lock'):
+            os.remove(self.storage_file + '.lock')
+
+    def ids(self, tasks):
+        return [task['id'] for task in tasks]
+
+    def test_sort_by_each_field(self):
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('id')), [1, 2, 3, 4])
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('description')), [2, 1, 3, 4])
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('due_date')), [3, 4, 1, 2])
+        # Ties keep ascending id order, matching a stable sort
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('priority', reverse=True)), [2, 4, 3, 1])
+
+    def test_sorted_views_follow_mutations(self):
+        self.task_manager.sort_tasks('priority')
+        self.task_manager.sort_tasks('due_date')
+        self.task_manager.sort_tasks('status')
+
+        self.task_manager.update_task_priority(1, 'high')
+        self.task_manager.set_task_due_date(2, '2025-12-31')
+        self.task_manager.mark_task_complete(3)
+        self.task_manager.delete_task(4)
+        self.task_manager.add_task("elderberry", 'low', due_date='2026-01-01')
+
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('priority', reverse=True)), [1, 2, 3, 5])
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('due_date')), [2, 5, 3, 1])
+        self.assertEqual(self.ids(self.task_manager.sort_tasks('status')), [3, 1, 2, 5])
+
+    def test_sort_with_limit_returns_copies(self):
+        top = self.task_manager.sort_tasks('due_date', limit=2)
+        self.assertEqual(self.ids(top), [3, 4])
+        top[0]['description'] = 'changed'
+        self.assertEqual(self.task_manager.find_task_by_id(3)['description'], 'cherry')
+
+    def test_replacing_task_list_resets_views(self):
+        self.task_manager.sort_tasks('description')
+        self.task_manager.tasks = []
+        self.assertEqual(self.task_manager.sort_tasks('description'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# Phase 2: API - Test for SQLite Connection Tuning
+
+import os
+import unittest
+from unittest import mock
+
+from api_support import TEMP_DIR
+from sqlalchemy.pool import QueuePool
+from sqlmodel import Session, SQLModel
+from src import database
+from src.config import settings
+from src.models import Task
+
+PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout')
+
+
+class TestSqliteTuning(unittest.TestCase):
+
+    def make_engine(self, name):
+        path = os.path.join(TEMP_DIR, name)
+        engine = database.make_engine(f'sqlite:///{path}')
+        self.addCleanup(engine.dispose)
+        return engine, path
+
+    def pragmas(self, connection):
+        return {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in PRAGMAS}
+
+    def test_pooled_connections_are_tuned(self):
+        engine, _ = self.make_engine('tuning.db')
+        self.assertIsInstance(engine.pool, QueuePool)
+        # Two connections checked out at once: each was tuned when opened
+        with engine.connect() as first, engine.connect() as second:
+            for connection in (first, second):
+                self.assertEqual(self.pragmas(connection), {
+                    'journal_mode': settings.sqlite_journal_mode,
+                    'synchronous': 1,  # NORMAL
+                    'mmap_size': settings.sqlite_mmap_size,
+                    'cache_size': -settings.sqlite_cache_size_kb,
+                    'busy_timeout': settings.sqlite_busy_timeout_ms,
+                })
+
+    def test_tuning_can_be_turned_off(self):
+        with mock.patch.object(settings, 'sqlite_tuning', False):
+            engine, _ = self.make_engine('untuned.db')
+        with engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql('PRAGMA journal_mode').scalar(), 'delete')
+
+    def test_maintenance_checkpoints_the_wal(self):
+        engine, path = self.make_engine('maintenance.db')
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all([Task(user_id=1, title=f'Task {n}') for n in range(50)])
+            session.commit()
+        self.assertGreater(os.path.getsize(path + '-wal'), 0)
+
+        with mock.patch.multiple(database, engine=engine, replica_engines=[], shard_engines=[]):
+            database.sqlite_maintenance()
+        self.assertEqual(os.path.getsize(path + '-wal'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+# Phase 2: API - Test for the Compiled Statement Cache
+
+import unittest
+
+from api_support import ApiTestCase
+from src.statements import statement_cache_stats
+
+
+class TestStatementCache(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+        self.task_id = self.client.post(self.base, headers=self.headers, json={'title': 'Cached'}).json()['id']
+
+    def test_repeated_reads_hit_the_cache(self):
+        for path in (self.base, f'{self.base}/{self.task_id}'):
+            with self.subTest(path=path):
+                self.client.get(path, headers=self.headers)  # compiled on first use
+                before = statement_cache_stats()
+                for _ in range(5):
+                    self.assertEqual(self.client.get(path, headers=self.headers).status_code, 200)
+                after = statement_cache_stats()
+                # The user lookup and the task query, once per request
+                self.assertEqual(after['hits'] - before['hits'], 10)
+                self.assertEqual(after['misses'], before['misses'])
+
+    def test_health_reports_the_cache(self):
+        self.client.get(self.base, headers=self.headers)
+        reported = self.client.get('/health').json()['statement_cache']
+        stats = statement_cache_stats()
+        self.assertEqual(reported, stats)
+        self.assertGreater(stats['hits'], 0)
+        self.assertEqual(stats['hit_ratio'], round(stats['hits'] / (stats['hits'] + stats['misses']), 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# Phase 1: Console Application - Test for Binary Snapshot Storage
+
+import unittest
+from src.tasks import TaskManager
+from src import storage
+import json
+import os
+
+class TestStorageFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.json_file = 'test_tasks_format.json'
+        self.snapshot_file = 'test_tasks_format.snap'
+        self._cleanup()
+
+    def tearDown(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        for path in (self.json_file, self.snapshot_file, self.json_file + '.lock', self.snapshot_file + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_format_detected_from_extension(self):
+        self.assertEqual(TaskManager(storage_file=self.snapshot_file).storage_format, 'binary')
+        self.assertEqual(TaskManager(storage_file=self.json_file).storage_format, 'json')
+        self.assertEqual(TaskManager(storage_file=self.json_file, storage_format='binary').storage_format, 'binary')
+        with self.assertRaises(ValueError):
+            TaskManager(storage_file=self.json_file, storage_format='xml')
+
+    def test_snapshot_round_trip_through_task_manager(self):
+        task_manager = TaskManager(storage_file=self.snapshot_file)
+        task_manager.add_task("Write report", 'high', ['work', 'urgent'], '2026-01-15')
+        task_manager.add_task("Buy milk ü", 'low', ['home'])
+        task_manager.mark_task_complete(2)
+
+        reloaded = TaskManager(storage_file=self.snapshot_file)
+        self.assertEqual(reloaded.tasks, task_manager.tasks)
+        self.assertEqual(reloaded.next_id, 3)
+        with open(self.snapshot_file, 'rb') as f:
+            self.assertTrue(f.read().startswith(storage.SNAPSHOT_MAGIC))
+
+    def test_conversion_is_lossless(self):
+        tasks = [
+            {'id': 1, 'description': 'Legacy task', 'status': 'pending'},
+            {'id': 2, 'description': 'Full task', 'status': 'completed', 'priority': 'high',
+             'tags': ['a', 'b', 'a'], 'due_date': None, 'created_at': '2026-01-01T10:00:00'},
+            {'id': 3, 'description': 'Odd task', 'status': 'pending', 'due_date': 20260101,
+             'tags': 'not-a-list', 'notes': {'nested': [1, 2]}},
+        ]
+        with open(self.json_file, 'w') as f:
+            json.dump(tasks, f)
+
+        self.assertEqual(storage.convert_storage(self.json_file, self.snapshot_file), 3)
+        self.assertEqual(storage.read_tasks(self.snapshot_file), tasks)
+        os.remove(self.json_file)
+        storage.convert_storage(self.snapshot_file, self.json_file)
+        with open(self.json_file) as f:
+            self.assertEqual(json.load(f), tasks)
+
+    def test_corrupt_snapshot_starts_empty(self):
+        with open(self.snapshot_file, 'wb') as f:
+            f.write(b'not a snapshot at all')
+        task_manager = TaskManager(storage_file=self.snapshot_file)
+        self.assertEqual(task_manager.tasks, [])
+
+    def test_truncated_snapshot_raises(self):
+        data = storage.encode_snapshot([{'id': 1, 'description': 'Task', 'status': 'pending'}])
+        with self.assertRaises(storage.SnapshotError):
+            storage.decode_snapshot(data[:-3])
+
+if __name__ == '__main__':
+    unittest.main()
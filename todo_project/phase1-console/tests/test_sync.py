@@ -0,0 +1,112 @@
+# Phase 2: API - Test for Delta Sync Paging
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from api_support import ApiTestCase
+from sqlmodel import Session, select
+from src.config import settings
+from src.database import engine
+from src.models import Task, TaskDeletion
+from src.routes.tasks import encode_sync_cursor
+
+
+class TestSync(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def create_tasks(self, count):
+        return [
+            self.client.post(self.base, headers=self.headers, json={'title': f'Task {n}'}).json()['id']
+            for n in range(count)
+        ]
+
+    def stamp(self, model, column, moment):
+        """Give all of this user's rows in a table one timestamp, like a bulk edit"""
+        with Session(engine) as session:
+            for row in session.exec(select(model).where(model.user_id == self.user_id)).all():
+                setattr(row, column, moment)
+                session.add(row)
+            session.commit()
+
+    def sync_all(self, since=None, limit=2):
+        """Follow has_more to the end; returns (task ids, deleted ids, pages, last watermark)"""
+        task_ids, deleted, pages = [], [], 0
+        while True:
+            params = {'limit': limit}
+            if since is not None:
+                params['since'] = since
+            response = self.client.get(f'{self.base}/sync', headers=self.headers, params=params)
+            self.assertEqual(response.status_code, 200, response.text)
+            body = response.json()
+            task_ids += [task['id'] for task in body['tasks']]
+            deleted += body['deleted']
+            since = body['watermark']
+            pages += 1
+            if not body['has_more']:
+                return task_ids, deleted, pages, since
+
+    def test_pages_through_tasks_sharing_a_timestamp(self):
+        ids = self.create_tasks(5)
+        self.stamp(Task, 'updated_at', datetime(2030, 1, 1, 12, 0, 0))
+        task_ids, _, pages, _ = self.sync_all()
+        self.assertEqual(task_ids, ids)
+        self.assertEqual(pages, 3)
+
+    def test_incremental_sync_after_bulk_edit(self):
+        self.create_tasks(2)
+        _, _, _, watermark = self.sync_all()
+        ids = self.create_tasks(5)
+        self.stamp(Task, 'updated_at', datetime(2030, 1, 1, 12, 0, 0))
+        # Earlier tasks were stamped too, so they come again; none go missing
+        task_ids, _, _, watermark = self.sync_all(watermark)
+        self.assertTrue(set(ids) <= set(task_ids))
+        self.assertEqual(len(task_ids), len(set(task_ids)))
+        self.assertEqual(self.sync_all(watermark)[:2], ([], []))
+
+    def test_pages_through_deletions_sharing_a_timestamp(self):
+        ids = self.create_tasks(5)
+        _, _, _, watermark = self.sync_all()
+        for task_id in ids:
+            self.client.delete(f'{self.base}/{task_id}', headers=self.headers)
+        self.stamp(TaskDeletion, 'deleted_at', datetime(2030, 1, 1, 12, 0, 0))
+        self.create_tasks(3)
+        self.stamp(Task, 'updated_at', datetime(2030, 1, 1, 12, 0, 0))
+        _, deleted, _, watermark = self.sync_all(watermark, limit=1)
+        self.assertEqual(sorted(deleted), ids)
+        self.assertEqual(self.sync_all(watermark)[:2], ([], []))
+
+    def test_accepts_a_datetime_watermark(self):
+        ids = self.create_tasks(2)
+        task_ids, _, _, _ = self.sync_all((datetime.utcnow() - timedelta(minutes=1)).isoformat() + 'Z')
+        self.assertEqual(task_ids, ids)
+
+    def test_quiet_client_is_not_reset(self):
+        self.create_tasks(1)
+        # Last saw a tombstone 20 days ago and has synced since without any
+        watermark = encode_sync_cursor(None, (datetime.utcnow() - timedelta(days=20), None))
+        with mock.patch.object(settings, 'tombstone_retention_days', 30):
+            task_ids, _, _, watermark = self.sync_all(watermark)
+        self.assertEqual(len(task_ids), 1)
+        # A shorter retention stands in for 20 more quiet days: the last sync still counts
+        with mock.patch.object(settings, 'tombstone_retention_days', 10):
+            response = self.client.get(f'{self.base}/sync', headers=self.headers, params={'since': watermark})
+        self.assertFalse(response.json()['reset'])
+        self.assertEqual(response.json()['tasks'], [])
+
+    def test_accepts_a_timezone_aware_watermark(self):
+        ids = self.create_tasks(2)
+        moment = datetime.now(timezone.utc) - timedelta(minutes=1)
+        task_ids, _, _, _ = self.sync_all(encode_sync_cursor((moment, 0), (moment, None)))
+        self.assertEqual(task_ids, ids)
+
+    def test_rejects_an_invalid_watermark(self):
+        response = self.client.get(f'{self.base}/sync', headers=self.headers, params={'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# Phase 2: API - Test for Archiving Completed Tasks
+
+import os
+import unittest
+from datetime import datetime, timedelta
+
+from api_support import TEMP_DIR, ApiTestCase
+from sqlmodel import Session, SQLModel
+from src import database
+from src.archive import archive_completed_tasks
+from src.models import ArchivedTask, Task
+from src.search import create_search_index, search_tasks
+
+
+class TestTaskArchive(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def create(self, title):
+        return self.client.post(self.base, headers=self.headers, json={'title': title}).json()['id']
+
+    def archive_completed(self, task_id):
+        self.client.patch(f'{self.base}/{task_id}/complete', headers=self.headers)
+        with Session(database.engine) as session:
+            archive_completed_tasks(session, 0, now=datetime.utcnow() + timedelta(minutes=1))
+
+    def get(self, task_id):
+        return self.client.get(f'{self.base}/{task_id}', headers=self.headers, params={'include_archived': True})
+
+    def test_archived_ids_are_not_reissued(self):
+        self.create('Stays')
+        archived = self.create('Archived last')
+        self.archive_completed(archived)
+
+        self.assertGreater(self.create('New'), archived)
+        response = self.get(archived)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()['title'], 'Archived last')
+
+    def test_sync_reports_archived_tasks_as_deleted(self):
+        self.create('Stays')
+        archived = self.create('Archived')
+        watermark = self.client.get(f'{self.base}/sync', headers=self.headers).json()['watermark']
+        self.archive_completed(archived)
+
+        body = self.client.get(f'{self.base}/sync', headers=self.headers, params={'since': watermark}).json()
+        self.assertEqual(body['deleted'], [archived])
+        self.assertEqual(body['tasks'], [])
+        # Still there for clients that ask for the archive
+        self.assertEqual(self.get(archived).json()['status'], 'completed')
+
+
+class TestAutoincrementMigration(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = database.make_engine(f"sqlite:///{os.path.join(TEMP_DIR, 'archive_migration.db')}")
+        self.addCleanup(self.engine.dispose)
+        SQLModel.metadata.drop_all(self.engine)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql('DROP TABLE IF EXISTS tasks_fts')
+        SQLModel.metadata.create_all(self.engine)
+        # A tasks table from before AUTOINCREMENT, with a search index
+        with self.engine.begin() as connection:
+            sql = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'tasks'").scalar()
+            connection.exec_driver_sql('DROP TABLE tasks')
+            connection.exec_driver_sql(sql.replace('AUTOINCREMENT', ''))
+        create_search_index(self.engine)
+        with Session(self.engine) as session:
+            session.add_all([Task(id=1, user_id=1, title='Water the plants'), Task(id=2, user_id=1, title='Call mom')])
+            session.add(ArchivedTask(id=5, user_id=1, title='Archived', created_at=datetime.utcnow(),
+                                     updated_at=datetime.utcnow(), archive_month='2030-01'))
+            session.commit()
+
+    def migrate(self):
+        database.add_sqlite_autoincrement(self.engine)
+        create_search_index(self.engine)
+
+    def test_rebuild_keeps_rows_and_starts_above_the_archive(self):
+        self.migrate()
+        self.migrate()  # a second run finds AUTOINCREMENT and does nothing
+        with Session(self.engine) as session:
+            new = Task(user_id=1, title='Water the garden')
+            session.add(new)
+            session.commit()
+            self.assertEqual(new.id, 6)
+            self.assertEqual(session.get(Task, 2).title, 'Call mom')
+            # The search index still covers the copied rows and follows new ones
+            self.assertEqual([task.id for task in search_tasks(session, 1, 'water')], [1, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
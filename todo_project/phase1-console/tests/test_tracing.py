@@ -0,0 +1,77 @@
+# Phase 2: API - Test for Request Tracing
+
+import time
+import unittest
+from unittest import mock
+
+from api_support import ApiTestCase
+from src.config import settings
+from src.routes import tasks as task_routes
+from src.tracing import parse_traceparent
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+def timings(response):
+    """Server-Timing header as {metric: duration in ms}"""
+    metrics = {}
+    for metric in response.headers['server-timing'].split(','):
+        name, _, duration = metric.strip().partition(';dur=')
+        metrics[name] = float(duration)
+    return metrics
+
+
+class TestTracing(ApiTestCase):
+
+    def setUp(self):
+        self.user_id, self.headers, _ = self.register()
+        self.base = f'/api/{self.user_id}/tasks'
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers={**self.headers, **headers})
+
+    def test_continues_the_callers_trace(self):
+        response = self.get(self.base, traceparent=f'00-{TRACE_ID}-{PARENT_ID}-01')
+        trace_id, span_id, sampled = parse_traceparent(response.headers['traceparent'])
+        self.assertEqual(trace_id, TRACE_ID)
+        self.assertNotEqual(span_id, PARENT_ID)  # this request's own span
+        self.assertTrue(sampled)
+
+    def test_keeps_the_callers_sampling_decision(self):
+        response = self.get(self.base, traceparent=f'00-{TRACE_ID}-{PARENT_ID}-00')
+        self.assertEqual(parse_traceparent(response.headers['traceparent'])[::2], (TRACE_ID, False))
+
+    def test_starts_a_new_trace_without_a_valid_traceparent(self):
+        first = parse_traceparent(self.get(self.base).headers['traceparent'])
+        second = parse_traceparent(self.get(self.base, traceparent=f'00-{"0" * 32}-{PARENT_ID}-01').headers['traceparent'])
+        self.assertNotEqual(first[0], second[0])
+        self.assertNotEqual(second[0], '0' * 32)
+        self.assertTrue(first[2] and second[2])
+
+    def test_server_timing_lists_each_stage(self):
+        self.client.post(self.base, headers=self.headers, json={'title': 'Timed'})
+        metrics = timings(self.get(self.base))
+        self.assertEqual(set(metrics), {'decode_token', 'user_fetch', 'task_query', 'serialize', 'total'})
+        self.assertGreaterEqual(metrics['total'], metrics['task_query'] + metrics['serialize'])
+
+    def test_serialize_covers_encoding_the_response(self):
+        encode = task_routes.json_response
+
+        def slow_encode(adapter, value):
+            time.sleep(0.05)
+            return encode(adapter, value)
+
+        with mock.patch.object(task_routes, 'json_response', slow_encode):
+            metrics = timings(self.get(self.base))
+        self.assertGreaterEqual(metrics['serialize'], 50)
+
+    def test_server_timing_can_be_turned_off(self):
+        with mock.patch.object(settings, 'server_timing', False):
+            response = self.get(self.base)
+        self.assertNotIn('server-timing', response.headers)
+        self.assertIn('traceparent', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,8 @@ class TestUpdateTask(unittest.TestCase):
     def tearDown(self):
         if os.path.exists(self.storage_file):
             os.remove(self.storage_file)
+        if os.path.exists(self.storage_file + '.lock'):
+            os.remove(self.storage_file + '.lock')
 
     def test_update_task_successfully(self):
         task_id_to_update = 1
@@ -1,10 +1,39 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { api } from '@/lib/api';
-import type { Task, CreateTaskRequest, TaskPriority } from '@/lib/types';
+import type { Task, CreateTaskRequest, TaskPriority, TaskEvent, TaskSyncResponse } from '@/lib/types';
 import TaskItem from './TaskItem';
 
+// Live updates reconnect after 1s, doubling up to 30s while the server is unreachable
+const RECONNECT_MIN_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
+// Replace the task with the same id, or append it (a live event may have added it already)
+function upsertTask(tasks: Task[], task: Task): Task[] {
+  return tasks.some(t => t.id === task.id)
+    ? tasks.map(t => t.id === task.id ? task : t)
+    : [...tasks, task];
+}
+
+// Apply a live change event to the current task list
+function applyTaskEvent(tasks: Task[], event: TaskEvent): Task[] {
+  if (event.type === 'deleted') {
+    return tasks.filter(t => t.id !== event.task_id);
+  }
+  return event.task ? upsertTask(tasks, event.task) : tasks;
+}
+
+// Apply one delta sync page; with replace (a reset or a full sync) it is the whole list
+function applySyncPage(tasks: Task[], page: TaskSyncResponse, replace: boolean): Task[] {
+  const deleted = new Set(page.deleted);
+  const byId = new Map<number, Task>((replace ? [] : tasks).filter(t => !deleted.has(t.id)).map(t => [t.id, t]));
+  for (const task of page.tasks) {
+    byId.set(task.id, task);
+  }
+  return [...byId.values()].sort((a, b) => a.id - b.id);
+}
+
 interface TaskListProps {
   onTaskUpdate?: () => void;
   externalFilter?: 'all' | 'active' | 'completed';
@@ -18,6 +47,8 @@ export default function TaskList({ onTaskUpdate, externalFilter, onFilterChange
   const [newTaskTitle, setNewTaskTitle] = useState('');
   const [newTaskDescription, setNewTaskDescription] = useState('');
   const [creating, setCreating] = useState(false);
+  const watermark = useRef<string | null>(null);
+  const syncing = useRef<Promise<void>>(Promise.resolve());
 
   // Use external filter if provided, otherwise use internal state
   const filter = externalFilter || 'all';
@@ -27,12 +58,76 @@ export default function TaskList({ onTaskUpdate, externalFilter, onFilterChange
     loadTasks();
   }, []);
 
+  // Keep the list in sync with changes made in other tabs or devices
+  useEffect(() => {
+    const controller = new AbortController();
+    let retryDelay = RECONNECT_MIN_MS;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    function catchUp() {
+      syncChanges().then(() => onTaskUpdate?.()).catch(() => {
+        // The next reconnect or resync tries again
+      });
+    }
+
+    async function connect() {
+      try {
+        await api.subscribeToTaskEvents((event) => {
+          if (event.type === 'resync') {
+            catchUp();
+            return;
+          }
+          setTasks(current => applyTaskEvent(current, event));
+          onTaskUpdate?.();
+        }, controller.signal, () => {
+          // Subscribed: fetch what changed while we were not
+          retryDelay = RECONNECT_MIN_MS;
+          catchUp();
+        });
+      } catch {
+        // Live updates are best-effort; the list still works without them
+      }
+      if (controller.signal.aborted) {
+        return;
+      }
+      // Jittered, so clients dropped together do not all reconnect at once
+      retryTimer = setTimeout(connect, retryDelay * (0.5 + Math.random() / 2));
+      retryDelay = Math.min(retryDelay * 2, RECONNECT_MAX_MS);
+    }
+
+    connect();
+    return () => {
+      controller.abort();
+      clearTimeout(retryTimer);
+    };
+  }, []);
+
+  // Fetch changes since the watermark (all tasks when there is none), one sync at a time
+  function syncChanges(full = false): Promise<void> {
+    async function run() {
+      if (full) {
+        watermark.current = null;
+      }
+      let replace = watermark.current === null;
+      let hasMore = true;
+      while (hasMore) {
+        const page = await api.syncTasks(watermark.current);
+        const replacePage = replace || page.reset;
+        setTasks(current => applySyncPage(current, page, replacePage));
+        watermark.current = page.watermark;
+        hasMore = page.has_more;
+        replace = false;
+      }
+    }
+    syncing.current = syncing.current.catch(() => {}).then(run);
+    return syncing.current;
+  }
+
   async function loadTasks() {
     try {
       setLoading(true);
       setError(null);
-      const data = await api.getTasks();
-      setTasks(data);
+      await syncChanges(true);
       onTaskUpdate?.();
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load tasks');
@@ -57,7 +152,7 @@ export default function TaskList({ onTaskUpdate, externalFilter, onFilterChange
       };
 
       const newTask = await api.createTask(taskData);
-      setTasks([...tasks, newTask]);
+      setTasks(current => upsertTask(current, newTask));
       setNewTaskTitle('');
       setNewTaskDescription('');
       onTaskUpdate?.();
@@ -71,7 +166,7 @@ export default function TaskList({ onTaskUpdate, externalFilter, onFilterChange
   async function handleDeleteTask(taskId: number) {
     try {
       await api.deleteTask(taskId);
-      setTasks(tasks.filter(t => t.id !== taskId));
+      setTasks(current => current.filter(t => t.id !== taskId));
       onTaskUpdate?.();
     } catch (err) {
       alert(err instanceof Error ? err.message : 'Failed to delete task');
@@ -81,7 +176,7 @@ export default function TaskList({ onTaskUpdate, externalFilter, onFilterChange
   async function handleToggleComplete(taskId: number) {
     try {
       const updatedTask = await api.toggleTaskComplete(taskId);
-      setTasks(tasks.map(t => t.id === taskId ? updatedTask : t));
+      setTasks(current => current.map(t => t.id === taskId ? updatedTask : t));
       onTaskUpdate?.();
     } catch (err) {
       alert(err instanceof Error ? err.message : 'Failed to toggle task');
@@ -91,7 +186,7 @@ export default function TaskList({ onTaskUpdate, externalFilter, onFilterChange
   async function handleUpdateTask(taskId: number, title: string, description: string, priority: TaskPriority) {
     try {
       const updatedTask = await api.updateTask(taskId, { title, description, priority });
-      setTasks(tasks.map(t => t.id === taskId ? updatedTask : t));
+      setTasks(current => current.map(t => t.id === taskId ? updatedTask : t));
       onTaskUpdate?.();
     } catch (err) {
       alert(err instanceof Error ? err.message : 'Failed to update task');
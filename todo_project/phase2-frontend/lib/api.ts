@@ -19,6 +19,9 @@ import type {
   AuthResponse,
   ApiError,
   ListTasksParams,
+  TaskEvent,
+  TaskSyncResponse,
+  TaskOccurrence,
 } from "./types";
 
 /**
@@ -95,6 +98,8 @@ class ApiClient {
 
     const response = await fetch(url, {
       ...options,
+      // Sends the read-your-writes cookie, so reads right after a write see it
+      credentials: "include",
       headers: {
         ...this.getHeaders(),
         ...options.headers,
@@ -221,6 +226,8 @@ class ApiClient {
       if (params.tag) searchParams.append("tag", params.tag);
       if (params.limit) searchParams.append("limit", params.limit.toString());
       if (params.offset) searchParams.append("offset", params.offset.toString());
+      if (params.fields?.length) searchParams.append("fields", params.fields.join(","));
+      if (params.include_archived) searchParams.append("include_archived", "true");
 
       const queryString = searchParams.toString();
       if (queryString) {
@@ -281,6 +288,108 @@ class ApiClient {
     }
     return this.patch<Task>(config.api.tasks.complete(this.userId, id));
   }
+
+  /**
+   * Get task changes since a watermark (delta sync)
+   * Omit `since` for a full sync; store the returned watermark for next time.
+   */
+  async syncTasks(since?: string | null, limit?: number): Promise<TaskSyncResponse> {
+    if (!this.userId) {
+      throw new Error("User not authenticated");
+    }
+    const searchParams = new URLSearchParams();
+    if (since) searchParams.append("since", since);
+    if (limit) searchParams.append("limit", limit.toString());
+    const queryString = searchParams.toString();
+    const endpoint = config.api.tasks.sync(this.userId);
+    return this.get<TaskSyncResponse>(queryString ? `${endpoint}?${queryString}` : endpoint);
+  }
+
+  /**
+   * Search tasks by title and description, best match first
+   */
+  async searchTasks(query: string, limit?: number): Promise<Task[]> {
+    if (!this.userId) {
+      throw new Error("User not authenticated");
+    }
+    const searchParams = new URLSearchParams({ q: query });
+    if (limit) searchParams.append("limit", limit.toString());
+    return this.get<Task[]>(`${config.api.tasks.search(this.userId)}?${searchParams.toString()}`);
+  }
+
+  /**
+   * Tasks due between start and end (ISO datetimes), repeating tasks expanded
+   */
+  async getOccurrences(start?: string, end?: string, limit?: number): Promise<TaskOccurrence[]> {
+    if (!this.userId) {
+      throw new Error("User not authenticated");
+    }
+    const searchParams = new URLSearchParams();
+    if (start) searchParams.append("start", start);
+    if (end) searchParams.append("end", end);
+    if (limit) searchParams.append("limit", limit.toString());
+    const queryString = searchParams.toString();
+    const endpoint = config.api.tasks.occurrences(this.userId);
+    return this.get<TaskOccurrence[]>(queryString ? `${endpoint}?${queryString}` : endpoint);
+  }
+
+  /**
+   * Subscribe to live task changes (Server-Sent Events)
+   * Calls onEvent for every create/update/delete/toggle of the user's tasks.
+   * onReady runs once the subscription is live; changes made before then
+   * (e.g. while disconnected) come from syncTasks() with the last watermark.
+   * On a "resync" event the client missed changes and should catch up the same way.
+   * Uses fetch() instead of EventSource so the JWT can be sent in the Authorization header.
+   * Resolves when the server ends the stream; abort the signal to unsubscribe.
+   */
+  async subscribeToTaskEvents(
+    onEvent: (event: TaskEvent) => void,
+    signal?: AbortSignal,
+    onReady?: () => void
+  ): Promise<void> {
+    if (!this.userId) {
+      throw new Error("User not authenticated");
+    }
+
+    const response = await fetch(`${this.baseUrl}${config.api.tasks.events(this.userId)}`, {
+      headers: { ...this.getHeaders(), Accept: "text/event-stream" },
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    try {
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        // SSE messages are separated by a blank line
+        let boundary = buffer.indexOf("\n\n");
+        while (boundary !== -1) {
+          const message = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const lines = message.split("\n");
+          const data = lines
+            .filter((line) => line.startsWith("data: "))
+            .map((line) => line.slice(6))
+            .join("\n");
+          const parsed = data ? JSON.parse(data) : null;
+          if (lines.includes("event: ready")) {
+            onReady?.();
+          } else if (parsed && parsed.type) {
+            onEvent(parsed as TaskEvent);
+          }
+          boundary = buffer.indexOf("\n\n");
+        }
+      }
+    } catch (error) {
+      if (!signal?.aborted) throw error;
+    }
+  }
 }
 
 // ==================== SINGLETON INSTANCE ====================
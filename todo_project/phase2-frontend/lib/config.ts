@@ -19,6 +19,10 @@ export const config = {
       base: (userId: number) => `/api/${userId}/tasks`,
       byId: (userId: number, taskId: number) => `/api/${userId}/tasks/${taskId}`,
       complete: (userId: number, taskId: number) => `/api/${userId}/tasks/${taskId}/complete`,
+      events: (userId: number) => `/api/${userId}/tasks/events`,
+      sync: (userId: number) => `/api/${userId}/tasks/sync`,
+      search: (userId: number) => `/api/${userId}/tasks/search`,
+      occurrences: (userId: number) => `/api/${userId}/tasks/occurrences`,
     },
   },
 } as const;
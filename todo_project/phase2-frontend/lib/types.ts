@@ -19,10 +19,16 @@ export interface Task {
   priority: TaskPriority;
   tags: string[];
   due_date: string | null; // ISO datetime string
+  recurrence?: string | null; // repeat rule; due_date is the next occurrence
   created_at: string; // ISO datetime string
   updated_at: string; // ISO datetime string
 }
 
+// One occurrence in a date window (GET /api/{user_id}/tasks/occurrences)
+export interface TaskOccurrence extends Task {
+  occurrence: boolean; // a later occurrence of a repeating task, not stored
+}
+
 // Task creation request
 export interface CreateTaskRequest {
   title: string;
@@ -30,6 +36,7 @@ export interface CreateTaskRequest {
   priority?: TaskPriority;
   tags?: string[];
   due_date?: string; // ISO datetime string
+  recurrence?: string; // e.g. "daily", "weekdays", "every 2 weeks on mon" (needs due_date)
 }
 
 // Task update request
@@ -39,6 +46,7 @@ export interface UpdateTaskRequest {
   priority?: TaskPriority;
   tags?: string[];
   due_date?: string | null; // ISO datetime string
+  recurrence?: string; // "" stops the task repeating
   status?: TaskStatus;
 }
 
@@ -84,4 +92,25 @@ export interface ListTasksParams {
   tag?: string;
   limit?: number;
   offset?: number;
+  fields?: (keyof Task)[]; // return only these fields (id is always included)
+  include_archived?: boolean; // also return archived (long-completed) tasks
+}
+
+// Delta sync response (GET /api/{user_id}/tasks/sync)
+export interface TaskSyncResponse {
+  tasks: Task[]; // created or updated since the watermark
+  deleted: number[]; // ids of deleted tasks; apply before upserting tasks
+  watermark: string | null; // opaque cursor; pass as `since` on the next sync
+  has_more: boolean; // sync again immediately to fetch the rest
+  reset: boolean; // watermark expired: tasks is a full list, drop local state
+}
+
+// Real-time task change event (GET /api/{user_id}/tasks/events)
+export type TaskEventType = "created" | "updated" | "deleted" | "toggled" | "resync";
+
+export interface TaskEvent {
+  id: number;
+  type: TaskEventType;
+  task_id: number | null;
+  task: Task | null; // null for "deleted" and "resync"
 }